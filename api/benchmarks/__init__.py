@@ -0,0 +1,3 @@
+"""
+Performance benchmarks (not run by the test suite)
+"""
@@ -0,0 +1,106 @@
+"""
+Benchmark JSON rendering and response compression on the largest payloads.
+
+Run from the repository root:
+    python -m api.benchmarks.bench_responses
+"""
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from ..utils.responses import dumps
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+def _list_clients_payload(n: int = 5000) -> dict:
+    """Shape of /api/clients after classify()"""
+    now = datetime.utcnow()
+    cities = ["Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad", "Pune"]
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "name": f"Client {i}",
+            "member_id": f"MEM{str(i).zfill(5)}",
+            "city": random.choice(cities),
+            "products_posted": random.randint(50, 500),
+            "expiry_date": (now + timedelta(days=random.randint(-60, 365))).date().isoformat(),
+            "contact_email": f"client{i}@example.com",
+            "contact_phone": f"+91-{random.randint(7000000000, 9999999999)}",
+            "assigned_employee_id": str(uuid.uuid4()),
+            "status": random.choice(["good", "due_soon", "overdue"]),
+            "last_contact_date": (now - timedelta(days=random.randint(0, 40))).isoformat(),
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+            "days_since_contact": random.randint(0, 40),
+            "days_until_expiry": random.randint(-60, 365),
+            "is_overdue": False
+        })
+    return {"data": rows, "total": n}
+
+def _activity_feed_payload(n: int = 500) -> dict:
+    """Shape of /api/activity-feed with client names"""
+    now = datetime.utcnow()
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "client_id": str(uuid.uuid4()),
+            "employee_id": str(uuid.uuid4()),
+            "category": "contact_attempt",
+            "outcome": random.choice(["connected", "no_answer", "callback"]),
+            "notes": "Discussed renewal options and pricing for next quarter " * 2,
+            "attachments": [{"type": "contact_meta", "method": "phone", "follow_up_required": False, "due_date": None}],
+            "quantity": 1,
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+            "client_name": f"Client {i}"
+        })
+    return {"data": rows, "total": n, "limit": n, "offset": 0}
+
+def _stdlib_render(payload: dict) -> bytes:
+    """FastAPI default path: jsonable_encoder + starlette JSONResponse.render"""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+def _timeit(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    random.seed(7)
+    payloads = {
+        "list_clients (5000 rows)": _list_clients_payload(),
+        "activity_feed (500 rows)": _activity_feed_payload()
+    }
+    for name, payload in payloads.items():
+        body = dumps(payload)
+        print(f"\n{name}: {len(body) / 1024:.0f} KiB")
+        print(f"  jsonable_encoder+json  {_timeit(_stdlib_render, payload):8.2f} ms")
+        print(f"  orjson                 {_timeit(dumps, payload):8.2f} ms")
+
+        gz = gzip.compress(body, compresslevel=6)
+        print(f"  gzip-6                 {_timeit(gzip.compress, body, 6):8.2f} ms  {len(gz) / 1024:7.0f} KiB")
+        if brotli is not None:
+            br = brotli.compress(body, quality=4)
+            t = _timeit(lambda b: brotli.compress(b, quality=4), body)
+            print(f"  brotli-4               {t:8.2f} ms  {len(br) / 1024:7.0f} KiB")
+
+if __name__ == "__main__":
+    main()
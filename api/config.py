@@ -49,7 +49,57 @@ class Settings:
     
     # Cache
     CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "0"))
-    
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    # "memory" (per process) or "shared" (SQLite on tmpfs, shared by all workers on a node)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    SHARED_CACHE_PATH: str = os.getenv("SHARED_CACHE_PATH", "")
+    SHARED_CACHE_MAX_BYTES: int = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Conditional GET (ETag) - how long a version-validated ETag may skip the handler
+    ETAG_REVALIDATE_SECONDS: int = int(os.getenv("ETAG_REVALIDATE_SECONDS", "5"))
+
+    # Response compression - minimum body size in bytes (0 disables)
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+    # Server-Sent Events
+    SSE_HEARTBEAT_SECONDS: int = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_QUEUE_SIZE: int = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+    SSE_REPLAY_SIZE: int = int(os.getenv("SSE_REPLAY_SIZE", "1000"))
+
+    # Unread notification counters - max age before reloading from the database
+    UNREAD_COUNTER_TTL_SECONDS: int = int(os.getenv("UNREAD_COUNTER_TTL_SECONDS", "60"))
+
+    # Coalesced dashboard queries - served as-is while fresh, then stale while one refresh runs
+    QUERY_FRESH_SECONDS: float = float(os.getenv("QUERY_FRESH_SECONDS", "5"))
+    QUERY_STALE_SECONDS: float = float(os.getenv("QUERY_STALE_SECONDS", "30"))
+
+    # Client status sweep interval for time-based transitions (0 disables, e.g. when pg_cron runs it)
+    CLIENT_STATUS_SWEEP_SECONDS: int = int(os.getenv("CLIENT_STATUS_SWEEP_SECONDS", "300"))
+
+    # Dashboard alert rules - how long each rule's result is reused
+    ALERTS_CACHE_SECONDS: int = int(os.getenv("ALERTS_CACHE_SECONDS", "60"))
+
+    # Follow-up / reminder scheduler
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+    SCHEDULER_HORIZON_SECONDS: int = int(os.getenv("SCHEDULER_HORIZON_SECONDS", "600"))
+    SCHEDULER_REFILL_SECONDS: int = int(os.getenv("SCHEDULER_REFILL_SECONDS", "60"))
+    SCHEDULER_LEASE_SECONDS: int = int(os.getenv("SCHEDULER_LEASE_SECONDS", "30"))
+
+    # User directory - max age before reloading even without a local users write
+    USER_DIRECTORY_TTL_SECONDS: int = int(os.getenv("USER_DIRECTORY_TTL_SECONDS", "300"))
+
+    # Delta sync - how far back a caught-up stream is re-read to catch late commits
+    SYNC_OVERLAP_SECONDS: int = int(os.getenv("SYNC_OVERLAP_SECONDS", "10"))
+
+    # Batch endpoint - max operations per request
+    BATCH_MAX_OPERATIONS: int = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+
+    # Bulk activity ingestion - max activities per upload
+    ACTIVITY_BULK_MAX: int = int(os.getenv("ACTIVITY_BULK_MAX", "500"))
+
+    # Bulk client PATCH - max per-client entries per request
+    CLIENT_BULK_UPDATE_MAX: int = int(os.getenv("CLIENT_BULK_UPDATE_MAX", "1000"))
+
     @property
     def is_production(self) -> bool:
         return self.APP_ENV == "production"
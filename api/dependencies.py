@@ -1,7 +1,7 @@
 """
 Dependencies for FastAPI routes
 """
-from fastapi import Header, HTTPException, status, Depends
+from fastapi import Header, HTTPException, Query, status, Depends
 from typing import Optional
 from .utils.security import decode_token
 
@@ -37,6 +37,29 @@ async def verify_token(authorization: Optional[str] = Header(None)) -> dict:
             detail=str(e)
         )
 
+async def verify_stream_token(
+    authorization: Optional[str] = Header(None),
+    token: Optional[str] = Query(None)
+) -> dict:
+    """
+    Verify JWT for streaming endpoints.
+    EventSource cannot send headers, so a `token` query parameter is accepted too.
+    """
+    if authorization:
+        return await verify_token(authorization)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing authorization header"
+        )
+    try:
+        return decode_token(token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+
 # ============================================================================
 # Role-Based Authorization
 # ============================================================================
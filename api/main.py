@@ -3,7 +3,6 @@ Main FastAPI application with modular routers
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.responses import JSONResponse
@@ -18,6 +17,21 @@ from .routers import activities_router
 from .routers import reports_router
 from .routers import users_router
 from .routers import analytics_router
+from .routers import events_router
+from .routers import notifications_router
+from .routers import sync_router
+from .routers import batch_router
+from .utils.responses import FastJSONResponse
+from .utils.compression import CompressionMiddleware
+from .utils.http_cache import (
+    NotModified,
+    not_modified_response,
+    conditional_response_middleware
+)
+from .utils.database import supabase
+from .utils.periodic import register_periodic, start_periodic_tasks, stop_periodic_tasks
+from .utils.client_status import sweep_client_status
+from .utils.scheduler import scheduler, leader_only
 
 # Setup logging
 logging.basicConfig(
@@ -38,7 +52,8 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     docs_url="/docs" if settings.is_development else None,
-    redoc_url="/redoc" if settings.is_development else None
+    redoc_url="/redoc" if settings.is_development else None,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -46,14 +61,19 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    # Row versions for If-Match on client updates
+    expose_headers=["ETag"],
 )
 
 # ============================================================================
 # Middleware
 # ============================================================================
 
+# ETag / If-None-Match for routes using the conditional_get dependency
+app.middleware("http")(conditional_response_middleware)
+
 @app.middleware("http")
 async def performance_middleware(request: Request, call_next):
     """Add request ID and response time headers"""
@@ -78,16 +98,20 @@ async def performance_middleware(request: Request, call_next):
     
     return response
 
+# Negotiated brotli/gzip compression (outermost, so it sees final bodies)
+if settings.COMPRESSION_MIN_SIZE > 0:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # ============================================================================
 # Error Handlers
 # ============================================================================
 
-def _error_response(status_code: int, code: str, message: str, details: dict | None = None):
+def _error_response(status_code: int, code: str, message: str, details: dict | None = None, headers: dict | None = None):
     """Standard error response format"""
     payload = {"error": {"code": code, "message": message}}
     if details:
         payload["error"]["details"] = details
-    return JSONResponse(payload, status_code=status_code)
+    return JSONResponse(payload, status_code=status_code, headers=headers)
 
 @app.exception_handler(StarletteHTTPException)
 async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -95,10 +119,16 @@ async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPE
         404: "not_found",
         401: "unauthorized",
         403: "forbidden",
-        405: "method_not_allowed"
+        405: "method_not_allowed",
+        409: "conflict",
+        412: "precondition_failed"
     }
     code = code_map.get(exc.status_code, "http_error")
-    return _error_response(exc.status_code, code, str(exc.detail), {"path": request.url.path})
+    return _error_response(exc.status_code, code, str(exc.detail), {"path": request.url.path}, getattr(exc, "headers", None))
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return not_modified_response(exc.etag, exc.cache_control)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -125,6 +155,10 @@ app.include_router(activities_router)
 app.include_router(reports_router)
 app.include_router(users_router)
 app.include_router(analytics_router)
+app.include_router(events_router)
+app.include_router(notifications_router)
+app.include_router(sync_router)
+app.include_router(batch_router)
 
 # ============================================================================
 # Health Check
@@ -144,9 +178,17 @@ def health_check():
 # ============================================================================
 
 import os
-from starlette.responses import FileResponse
+from .utils.static import (
+    IndexedStaticFiles,
+    StaticIndex,
+    SpaShell,
+    IMMUTABLE_CACHE_CONTROL,
+    ASSET_CACHE_CONTROL
+)
 
-# 1. Mount Legacy Directories
+FRONTEND_DIST = "frontend/dist"
+
+# 1. Mount Legacy Directories (indexed once at startup)
 legacy_dirs = [
     "assets", "static", "employee_dashboard_page", 
     "daily_work_report", "activity_logging_page", 
@@ -156,36 +198,44 @@ legacy_dirs = [
 for dir_name in legacy_dirs:
     if os.path.exists(dir_name):
         print(f"MOUNTING: {dir_name}")
-        app.mount(f"/{dir_name}", StaticFiles(directory=dir_name, html=True), name=dir_name)
+        app.mount(f"/{dir_name}", IndexedStaticFiles(directory=dir_name, html=True), name=dir_name)
     else:
         print(f"SKIPPING: {dir_name} (not found)")
 
-# 1. Mount React Assets
-if os.path.exists("frontend/dist/react-assets"):
-    app.mount("/react-assets", StaticFiles(directory="frontend/dist/react-assets"), name="react-assets")
+# 1. Mount React Assets (content-hashed filenames, safe to cache forever)
+if os.path.exists(f"{FRONTEND_DIST}/react-assets"):
+    app.mount(
+        "/react-assets",
+        IndexedStaticFiles(directory=f"{FRONTEND_DIST}/react-assets", cache_control=IMMUTABLE_CACHE_CONTROL),
+        name="react-assets"
+    )
+
+# 2. SPA shell and top-level dist files, indexed once
+spa_shell = SpaShell(f"{FRONTEND_DIST}/index.html") if os.path.isfile(f"{FRONTEND_DIST}/index.html") else None
+dist_index = StaticIndex(FRONTEND_DIST, cache_control=ASSET_CACHE_CONTROL) if os.path.isdir(FRONTEND_DIST) else None
 
 # 2. Serve React App (SPA)
 @app.get("/")
-async def read_root():
-    if os.path.exists("frontend/dist/index.html"):
-        return FileResponse("frontend/dist/index.html")
+async def read_root(request: Request):
+    if spa_shell:
+        return spa_shell.response(request.headers)
     return JSONResponse({"error": "Frontend not built"}, status_code=404)
 
 # Catch-all for React Router (must be last)
 @app.get("/{full_path:path}")
-async def serve_react_app(full_path: str):
+async def serve_react_app(full_path: str, request: Request):
     # If path starts with api/, return 404 (handled by routers if matched, but here if not)
     if full_path.startswith("api/"):
         return JSONResponse({"error": "Not found"}, status_code=404)
     
-    # Check if file exists in frontend/dist (e.g. favicon.ico)
-    possible_file = os.path.join("frontend/dist", full_path)
-    if os.path.exists(possible_file) and os.path.isfile(possible_file):
-        return FileResponse(possible_file)
+    # Check if file exists in frontend/dist (e.g. favicon.ico); traversal is rejected by the index
+    asset = dist_index.lookup(full_path) if dist_index else None
+    if asset and asset.path != f"{FRONTEND_DIST}/index.html":
+        return dist_index.response(asset, request.headers)
 
     # Otherwise serve index.html for SPA routing
-    if os.path.exists("frontend/dist/index.html"):
-        return FileResponse("frontend/dist/index.html")
+    if spa_shell:
+        return spa_shell.response(request.headers)
     
     return JSONResponse({"error": "Frontend not built. Run 'npm run build' in frontend/ directory."}, status_code=404)
 
@@ -193,14 +243,26 @@ async def serve_react_app(full_path: str):
 # Startup / Shutdown Events
 # ============================================================================
 
+# Off-request-path maintenance; one worker per deployment sweeps, under its own lease
+register_periodic(
+    "client-status-sweep", settings.CLIENT_STATUS_SWEEP_SECONDS,
+    leader_only("client-status-sweep", settings.CLIENT_STATUS_SWEEP_SECONDS * 2, sweep_client_status)
+)
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
     logger.info(f"{settings.APP_NAME} v{settings.APP_VERSION} starting...")
     logger.info(f"Environment: {settings.APP_ENV}")
     logger.info(f"Demo mode: {settings.USE_DEMO}")
+    if supabase:
+        start_periodic_tasks()
+        if settings.SCHEDULER_ENABLED:
+            scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info(f"{settings.APP_NAME} shutting down...")
+    stop_periodic_tasks()
+    scheduler.stop()
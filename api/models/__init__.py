@@ -18,6 +18,8 @@ from .client import (
 )
 from .activity import (
     ActivityLog,
+    ActivityLogBulkItem,
+    ActivityLogBulk,
     ActivityLogResponse,
     DailyReport,
     DailyReportResponse
@@ -39,6 +41,8 @@ __all__ = [
     "Client",
     # Activity models
     "ActivityLog",
+    "ActivityLogBulkItem",
+    "ActivityLogBulk",
     "ActivityLogResponse",
     "DailyReport",
     "DailyReportResponse",
@@ -20,6 +20,15 @@ class ActivityLog(BaseModel):
     follow_up_required: Optional[bool] = False
     follow_up_due_date: Optional[str] = None
 
+class ActivityLogBulkItem(ActivityLog):
+    # Client-generated; resending the same key never creates a second row
+    idempotency_key: Optional[str] = None
+    # When the activity happened (offline capture); defaults to upload time
+    occurred_at: Optional[datetime] = None
+
+class ActivityLogBulk(BaseModel):
+    activities: List[ActivityLogBulkItem]
+
 class ActivityLogResponse(BaseModel):
     id: str
     client_id: str
@@ -7,6 +7,10 @@ from .activities import router as activities_router
 from .reports import router as reports_router
 from .users import router as users_router
 from .analytics import router as analytics_router
+from .events import router as events_router
+from .notifications import router as notifications_router
+from .sync import router as sync_router
+from .batch import router as batch_router
 
 # Export all routers
 __all__ = [
@@ -16,4 +20,8 @@ __all__ = [
     "reports_router",
     "users_router",
     "analytics_router",
+    "events_router",
+    "notifications_router",
+    "sync_router",
+    "batch_router",
 ]
@@ -3,63 +3,228 @@ Activities Router
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 import time
+import uuid
 
-from ..models import ActivityLog
+from postgrest.exceptions import APIError
+
+from ..models import ActivityLog, ActivityLogBulk
 from ..dependencies import verify_token
 from ..utils.database import supabase
+from ..utils.versions import bump_version
+from ..utils.responses import FastJSONResponse
+from ..utils.cache import cached_read
+from ..utils.http_cache import conditional_get
+from ..utils.events import event_bus, activity_channels, user_channel
+from ..utils.unread import unread_counters
+from ..utils.scheduler import scheduler, FOLLOW_UP
+from ..utils.pagination import decode_cursor, keyset_filter, next_cursor
+from ..utils.loaders import load_names, BATCH_SIZE
+from ..utils.client_status import recency_status, parse_datetime
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["activities"])  # prefix is /api because endpoints are /api/activity-log and /api/activity-feed
 
-@router.post("/activity-log")
-def log_activity(activity: ActivityLog, payload = Depends(verify_token)):
+def _follow_up_due_at(activity: ActivityLog) -> Optional[str]:
     """
-    Log a new activity for a client
+    follow_up_due_date as an explicit UTC timestamp for follow_up_due_at; 400
+    on a malformed value. Values without an offset (the legacy page sends
+    datetime-local input) are taken as UTC.
     """
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Database not configured")
+    if not activity.follow_up_required:
+        return None
+    due = parse_datetime(activity.follow_up_due_date)
+    if due is None:
+        raise HTTPException(status_code=400, detail="follow_up_due_date must be an ISO 8601 date or datetime")
+    return due.replace(tzinfo=timezone.utc).isoformat()
 
-    if activity.follow_up_required and not activity.follow_up_due_date:
-        raise HTTPException(status_code=400, detail="follow_up_due_date is required when follow_up_required is true")
-    
-    data = {
+def _activity_row(activity: ActivityLog, employee_id: str) -> dict:
+    """activity_logs row for a logged activity; 400 on a malformed follow-up date"""
+    return {
         "client_id": activity.client_id,
-        "employee_id": payload["sub"],
+        "employee_id": employee_id,
         "outcome": activity.outcome,
         "notes": activity.notes,
         "category": activity.category or "contact_attempt",
         "attachments": (activity.attachments or []) + ([{"type": "contact_meta", "method": activity.contact_method, "follow_up_required": activity.follow_up_required, "due_date": activity.follow_up_due_date}] if (activity.contact_method or activity.follow_up_required or activity.follow_up_due_date) else []),
         "quantity": activity.quantity or 1,
+        "follow_up_due_at": _follow_up_due_at(activity),
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+def _follow_up_notification(activity: ActivityLog, user_id: str) -> Optional[dict]:
+    """Follow-up reminder notification for an activity, if it asks for one"""
+    if not (activity.follow_up_required and activity.follow_up_due_date):
+        return None
+    return {
+        "user_id": user_id,
+        "type": "follow_up",
+        "title": "Follow-up required",
+        "message": f"Contact follow-up for client {activity.client_id}",
+        "metadata": {"client_id": activity.client_id, "due_date": activity.follow_up_due_date, "method": activity.contact_method},
         "created_at": datetime.utcnow().isoformat()
     }
+
+def _publish_activity(row: dict, user_id: str) -> None:
+    """Push a stored activity to feeds and queue its follow-up"""
+    event_bus.publish(activity_channels(user_id), "activity", row)
+    if row.get("follow_up_due_at"):
+        scheduler.schedule(FOLLOW_UP, row["id"], user_id, row["follow_up_due_at"])
+
+def _publish_notifications(rows: List[dict], user_id: str) -> None:
+    unread_counters.on_inserted(rows)
+    for n in rows:
+        event_bus.publish([user_channel(user_id)], "notification", n)
+
+@router.post("/activity-log")
+def log_activity(activity: ActivityLog, payload = Depends(verify_token)):
+    """
+    Log a new activity for a client
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    if activity.follow_up_required and not activity.follow_up_due_date:
+        raise HTTPException(status_code=400, detail="follow_up_due_date is required when follow_up_required is true")
     
-    result = supabase.table("activity_logs").insert(data).execute()
-    supabase.table("clients").update({
+    data = _activity_row(activity, payload["sub"])
+    
+    # Touch the client first so an activity is never logged against a deleted one
+    touched = supabase.table("clients").update({
         "last_contact_date": datetime.utcnow().isoformat(),
-        "status": "Good"
-    }).eq("id", activity.client_id).execute()
+        "status": "good"
+    }).eq("id", activity.client_id).is_("deleted_at", "null").execute()
+    if not touched.data:
+        raise HTTPException(status_code=404, detail="Client not found")
+    result = supabase.table("activity_logs").insert(data).execute()
+    bump_version("activity_logs", "clients")
+    if result.data:
+        _publish_activity(result.data[0], payload["sub"])
 
     # Create follow-up notification
     try:
-        if activity.follow_up_required and activity.follow_up_due_date:
-            supabase.table("notifications").insert({
-                "user_id": payload["sub"],
-                "type": "follow_up",
-                "title": "Follow-up required",
-                "message": f"Contact follow-up for client {activity.client_id}",
-                "metadata": {"client_id": activity.client_id, "due_date": activity.follow_up_due_date, "method": activity.contact_method},
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
+        notification = _follow_up_notification(activity, payload["sub"])
+        if notification:
+            nres = supabase.table("notifications").insert(notification).execute()
+            bump_version("notifications")
+            _publish_notifications(nres.data or [], payload["sub"])
     except Exception as e:
         logger.warning(f"follow-up notification insert failed: {e}")
     
     return {"message": "Activity logged", "id": result.data[0]["id"]}
 
+@router.post("/activity-log/bulk")
+def log_activities_bulk(body: ActivityLogBulk, payload = Depends(verify_token)):
+    """
+    Ingest many activities at once (offline sync). Each item may carry an
+    idempotency_key; re-sent keys are reported as duplicates instead of
+    inserted again. All new rows go in one insert, follow-up notifications
+    in a second, and each client's last_contact_date is advanced once to
+    its latest activity.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    if not body.activities:
+        raise HTTPException(status_code=400, detail="activities required")
+    if len(body.activities) > settings.ACTIVITY_BULK_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ACTIVITY_BULK_MAX} activities per upload")
+
+    user_id = payload["sub"]
+    now = datetime.utcnow()
+    results: List[Optional[dict]] = [None] * len(body.activities)
+    rows, items, first_index = [], {}, {}
+    for i, item in enumerate(body.activities):
+        if item.follow_up_required and not item.follow_up_due_date:
+            results[i] = {"index": i, "status": "error", "error": "follow_up_due_date is required when follow_up_required is true"}
+            continue
+        try:
+            # Validated per item: one bad date must not fail the whole upload
+            row = _activity_row(item, user_id)
+        except HTTPException as e:
+            results[i] = {"index": i, "status": "error", "error": e.detail}
+            continue
+        # Keyless items get a server key so inserted rows can be matched back
+        key = item.idempotency_key or f"srv:{uuid.uuid4()}"
+        if key in first_index:
+            results[i] = {"index": i, "status": "duplicate", "duplicate_of": first_index[key]}
+            continue
+        first_index[key] = i
+        occurred = item.occurred_at
+        if occurred and occurred.tzinfo:
+            occurred = occurred.astimezone(timezone.utc).replace(tzinfo=None)
+        row["created_at"] = min(occurred, now).isoformat() if occurred else now.isoformat()
+        row["idempotency_key"] = key
+        rows.append(row)
+        items[key] = item
+
+    inserted = []
+    if rows:
+        try:
+            # Existing (employee_id, idempotency_key) pairs are skipped, not errors
+            inserted = supabase.table("activity_logs").upsert(
+                rows, on_conflict="employee_id,idempotency_key", ignore_duplicates=True
+            ).execute().data or []
+        except Exception as e:
+            logger.error(f"ACTIVITY_BULK: insert failed for {user_id}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    by_key = {r["idempotency_key"]: r for r in inserted}
+    for key, i in first_index.items():
+        if key in by_key:
+            results[i] = {"index": i, "status": "created", "id": by_key[key]["id"]}
+    repeated = [key for key in first_index if key not in by_key]
+    for start in range(0, len(repeated), BATCH_SIZE):
+        res = supabase.table("activity_logs").select("id,idempotency_key").eq("employee_id", user_id) \
+            .in_("idempotency_key", repeated[start:start + BATCH_SIZE]).execute()
+        for r in res.data or []:
+            i = first_index[r["idempotency_key"]]
+            results[i] = {"index": i, "status": "duplicate", "id": r["id"]}
+    for key in repeated:
+        i = first_index[key]
+        if results[i] is None:
+            results[i] = {"index": i, "status": "duplicate"}
+
+    if inserted:
+        # One update per client, to its newest activity; never moves backwards
+        latest = {}
+        for r in inserted:
+            if r["created_at"] > latest.get(r["client_id"], ""):
+                latest[r["client_id"]] = r["created_at"]
+        for client_id, ts in latest.items():
+            try:
+                supabase.table("clients").update({"last_contact_date": ts, "status": recency_status(ts)}) \
+                    .eq("id", client_id).is_("deleted_at", "null").or_(f'last_contact_date.is.null,last_contact_date.lt."{ts}"').execute()
+            except Exception as e:
+                logger.warning(f"ACTIVITY_BULK: last_contact update failed for client {client_id}: {e}")
+        bump_version("activity_logs", "clients")
+        for r in inserted:
+            _publish_activity(r, user_id)
+
+        notifications = [n for n in (_follow_up_notification(items[r["idempotency_key"]], user_id) for r in inserted) if n]
+        if notifications:
+            try:
+                nres = supabase.table("notifications").insert(notifications).execute()
+                bump_version("notifications")
+                _publish_notifications(nres.data or [], user_id)
+            except Exception as e:
+                logger.warning(f"ACTIVITY_BULK: follow-up notifications insert failed: {e}")
+
+    logger.info(f"ACTIVITY_BULK: {user_id} sent {len(body.activities)}, inserted {len(inserted)}")
+    return {
+        "inserted": sum(1 for r in results if r["status"] == "created"),
+        "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+        "results": results
+    }
+
+FEED_COUNT_MODES = ("exact", "estimated", "none")
+FEED_COLUMNS = "*, clients(name)"
+
 @router.get("/activity-feed")
+@cached_read("activity_feed", "activity_logs", "clients")
 def activity_feed(
     payload = Depends(verify_token),
     category: Optional[str] = Query(None),
@@ -69,17 +234,28 @@ def activity_feed(
     date_to: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     limit: int = Query(100, le=500),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    count: str = Query("exact")
 ):
     """
-    Get activity feed with filtering
+    Get activity feed with filtering.
+    Pages by `offset`, or by `cursor` (pass `next_cursor` back) which walks
+    (created_at, id) on the index at constant cost. `count` is exact,
+    estimated (planner statistics for large results) or none.
     """
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not configured")
+    if count not in FEED_COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of: {', '.join(FEED_COUNT_MODES)}")
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    try:
-        logger.info(f"ACTIVITY_FEED: Fetching for {payload['sub']} role={payload['role']}")
-        q = supabase.table("activity_logs").select("*", count="exact")
+    def run(columns: str):
+        q = supabase.table("activity_logs").select(columns, count=None if count == "none" else count)
         if category: q = q.eq("category", category)
         if employee_id: q = q.eq("employee_id", employee_id)
         elif payload["role"] == "employee":
@@ -90,25 +266,94 @@ def activity_feed(
         if search:
             q = q.or_(f"notes.ilike.%{search}%,outcome.ilike.%{search}%")
         
-        res = q.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
-        total = res.count or 0
+        q = q.order("created_at", desc=True).order("id", desc=True)
+        if cursor:
+            # Repeated `or` params are ANDed, so this composes with the search filter
+            return q.or_(keyset_filter(cursor_created_at, cursor_id)).limit(limit).execute()
+        return q.range(offset, offset + limit - 1).execute()
+
+    try:
+        logger.info(f"ACTIVITY_FEED: Fetching for {payload['sub']} role={payload['role']}")
+        # Client names are embedded through the activity_logs.client_id foreign key
+        try:
+            res = run(FEED_COLUMNS)
+            embedded = True
+        except APIError as e:
+            logger.warning(f"ACTIVITY_FEED: embedded select failed, using batched lookup: {e}")
+            res = run("*")
+            embedded = False
+        total = (res.count or 0) if count != "none" else None
         
         data = res.data or []
-        # Enrich with client name manually to ensure reliability
-        if data:
-            client_ids = list(set([item["client_id"] for item in data if item.get("client_id")]))
-            if client_ids:
-                try:
-                    cres = supabase.table("clients").select("id, name").in_("id", client_ids).execute()
-                    cmap = {c["id"]: c["name"] for c in cres.data}
-                    for item in data:
-                        item["client_name"] = cmap.get(item["client_id"], "Unknown Client")
-                except Exception as e:
-                    logger.warning(f"Failed to enrich activities with client names: {e}")
-                    for item in data: item["client_name"] = "Unknown Client"
+        if embedded:
+            for item in data:
+                item["client_name"] = (item.pop("clients", None) or {}).get("name") or "Unknown Client"
+        elif data:
+            try:
+                cmap = load_names("clients", (item.get("client_id") for item in data))
+            except Exception as e:
+                logger.warning(f"Failed to enrich activities with client names: {e}")
+                cmap = {}
+            for item in data:
+                item["client_name"] = cmap.get(item.get("client_id")) or "Unknown Client"
         
         logger.info(f"ACTIVITY_FEED: Found {total} activities")
-        return {"data": data, "total": total, "limit": limit, "offset": offset}
+        return FastJSONResponse({
+            "data": data,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor(data, limit)
+        })
     except Exception as e:
         logger.error(f"ACTIVITY_FEED: ERROR {type(e).__name__}: {e}")
-        return {"data": [], "total": 0, "limit": limit, "offset": offset}
+        return {"data": [], "total": 0, "limit": limit, "offset": offset, "next_cursor": None, "error": str(e)}
+
+FOLLOW_UP_COLUMNS = "id,client_id,employee_id,category,outcome,notes,attachments,follow_up_due_at,follow_up_notified_at,created_at"
+
+@router.get("/follow-ups", dependencies=[Depends(conditional_get("activity_logs"))])
+def list_follow_ups(
+    payload = Depends(verify_token),
+    status: str = Query("all"),
+    employee_id: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200)
+):
+    """
+    Follow-ups ordered by due time (served by idx_activity_logs_employee_follow_up).
+    `status` is upcoming, overdue or all. Pass `next_cursor` back as `cursor`.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    if status not in ("all", "upcoming", "overdue"):
+        raise HTTPException(status_code=400, detail="status must be one of: all, upcoming, overdue")
+
+    q = supabase.table("activity_logs").select(FOLLOW_UP_COLUMNS).not_.is_("follow_up_due_at", "null")
+    if payload["role"] == "employee":
+        q = q.eq("employee_id", payload["sub"])
+    elif employee_id:
+        q = q.eq("employee_id", employee_id)
+
+    now = datetime.utcnow().isoformat()
+    if status == "upcoming": q = q.gte("follow_up_due_at", now)
+    elif status == "overdue": q = q.lt("follow_up_due_at", now)
+    if cursor:
+        try:
+            due_at, row_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        q = q.or_(keyset_filter(due_at, row_id, column="follow_up_due_at", desc=False))
+
+    try:
+        res = q.order("follow_up_due_at").order("id").limit(limit).execute()
+        rows = res.data or []
+        items = []
+        for r in rows:
+            meta = next((a for a in r.pop("attachments", None) or [] if isinstance(a, dict) and a.get("type") == "contact_meta"), {})
+            r["method"] = meta.get("method")
+            r["status"] = "overdue" if (r.get("follow_up_due_at") or "") < now else "upcoming"
+            items.append(r)
+        return {"data": items, "next_cursor": next_cursor(rows, limit, column="follow_up_due_at")}
+    except Exception as e:
+        logger.error(f"Error loading follow-ups: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,21 +1,227 @@
 """
 Analytics & Exports Router
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import PlainTextResponse
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from ..dependencies import verify_token, require_manager
+import numpy as np
+
+from ..dependencies import verify_token, require_manager, require_admin
 from ..utils.database import supabase
+from ..utils.http_cache import conditional_get
+from ..utils.cache import cached_read
+from ..utils.singleflight import coalesced_query
+from ..utils.versions import bump_version
+from ..utils.pagination import fetch_all
+from ..utils.client_status import recency_status
+from ..utils.alerts import alert_engine
+from ..utils.user_directory import user_directory
+from ..utils.timeseries import BUCKETS, truncate, bucket_edges, to_datetime64, aggregate, align, change_pct
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 # Keep prefix as /api to match old routes
 router = APIRouter(prefix="/api", tags=["analytics"])
 
-@router.get("/manager/stats")
+# Dashboard panels are polled; short private max-age plus ETag revalidation
+DASHBOARD_CACHE_CONTROL = "private, max-age=5, must-revalidate"
+
+# ============================================================================
+# Shared Dashboard Reads
+# ============================================================================
+
+# The dashboard panels load together; each read uses one query shape shared
+# by every panel so concurrent requests coalesce into a single DB call.
+EMPLOYEE_COLUMNS = "id,name,email"
+CLIENT_COLUMNS = "id,assigned_employee_id,expiry_date,last_contact_date"
+
+def _fetch_employees() -> List[dict]:
+    # Served from the process-wide user directory, no query per request
+    columns = EMPLOYEE_COLUMNS.split(",")
+    return [{k: u.get(k) for k in columns} for u in user_directory.by_role("employee")]
+
+def _fetch_clients() -> List[dict]:
+    def run():
+        return supabase.table("clients").select(CLIENT_COLUMNS).is_("deleted_at", "null").execute().data or []
+    return coalesced_query(f"clients:{CLIENT_COLUMNS}", ("clients",), run)
+
+def _rollup_from_raw(rows: List[dict]) -> List[dict]:
+    """Aggregate raw activity_logs rows into rollup-shaped (employee_id, day, count) rows"""
+    counts = {}
+    for a in rows:
+        emp_id = a.get("employee_id")
+        created_at = a.get("created_at") or ""
+        if emp_id and created_at:
+            key = (emp_id, created_at[:10])
+            counts[key] = counts.get(key, 0) + 1
+    return [{"employee_id": e, "day": d, "count": n} for (e, d), n in counts.items()]
+
+def _fetch_activity_rollup(days: int = 7) -> List[dict]:
+    """
+    Per-employee daily activity counts for the last `days` days (today included),
+    read from activity_daily_rollup. Falls back to counting raw activity_logs
+    when the rollup table is not available.
+    """
+    since = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+    def run():
+        try:
+            res = supabase.table("activity_daily_rollup").select("employee_id,day,count").gte("day", since).execute()
+            return res.data or []
+        except Exception as e:
+            logger.warning(f"Activity rollup unavailable, counting raw activity_logs: {e}")
+            res = supabase.table("activity_logs").select("employee_id,created_at").gte("created_at", since).execute()
+            return _rollup_from_raw(res.data or [])
+    # The rollup changes exactly when activity_logs does
+    return coalesced_query(f"activity_daily_rollup:employee_id,day,count:since={since}", ("activity_logs",), run)
+
+# ============================================================================
+# Panel Computations
+# ============================================================================
+
+# Panels are pure functions over fetched rows, so the individual endpoints and
+# the composite dashboard compute identical results from the same snapshot.
+
+def _is_overdue(last_contact: Optional[str], now: datetime) -> bool:
+    """Overdue if never contacted or last contacted 15+ days ago"""
+    return recency_status(last_contact, now) == "overdue"
+
+def _compute_stats(employees: List[dict], clients: List[dict]) -> dict:
+    now = datetime.utcnow()
+    total = len(clients)
+    overdue_count = sum(1 for c in clients if _is_overdue(c.get("last_contact_date"), now))
+    efficiency = round((total - overdue_count) / total * 100) if total > 0 else 0
+    return {"employees": len(employees), "clients": total, "overdue": overdue_count, "efficiency": efficiency}
+
+def _compute_performance(employees: List[dict], clients: List[dict], activities: List[dict]) -> dict:
+    assigned_map = {}
+    overdue_map = {}
+    now = datetime.utcnow()
+    
+    for c in clients:
+        emp_id = c.get("assigned_employee_id")
+        if not emp_id: continue
+        assigned_map[emp_id] = assigned_map.get(emp_id, 0) + 1
+        if _is_overdue(c.get("last_contact_date"), now):
+            overdue_map[emp_id] = overdue_map.get(emp_id, 0) + 1
+    
+    activity_map = {}
+    for a in activities:
+        emp_id = a.get("employee_id")
+        if emp_id: activity_map[emp_id] = activity_map.get(emp_id, 0) + (a.get("count") or 0)
+        
+    data = []
+    for e in employees:
+        assigned = assigned_map.get(e["id"], 0)
+        overdue_count = overdue_map.get(e["id"], 0)
+        # Efficiency: (Assigned - Overdue) / Assigned * 100
+        efficiency = round((assigned - overdue_count) / assigned * 100) if assigned > 0 else 0
+        data.append({
+            "id": e["id"],
+            "name": e.get("name", "Unknown"),
+            "email": e.get("email", ""),
+            "assigned_clients": assigned,
+            "overdue_clients": overdue_count,
+            "activities_this_week": activity_map.get(e["id"], 0),
+            "efficiency": efficiency
+        })
+    return {"data": data}
+
+def _compute_alerts() -> dict:
+    return {"data": alert_engine.evaluate()}
+
+def _compute_workload(employees: List[dict], clients: List[dict], activities: List[dict]) -> dict:
+    assigned_map = {}
+    for c in clients:
+        emp_id = c.get("assigned_employee_id")
+        if emp_id:
+            assigned_map[emp_id] = assigned_map.get(emp_id, 0) + 1
+    
+    # Today's bucket of the coalesced week rollup
+    today = datetime.utcnow().date().isoformat()
+    postings_map = {}
+    for a in activities:
+        emp_id = a.get("employee_id")
+        if emp_id and a.get("day") == today:
+            postings_map[emp_id] = postings_map.get(emp_id, 0) + (a.get("count") or 0)
+    
+    data = []
+    for e in employees:
+        data.append({
+            "employee_id": e["id"],
+            "name": e["name"],
+            "assigned_clients": assigned_map.get(e["id"], 0),
+            "postings_today": postings_map.get(e["id"], 0)
+        })
+    return {"data": data}
+
+# panel name -> (sources it reads, computation, fallback on error)
+DASHBOARD_PANELS = {
+    "stats": (("employees", "clients"), _compute_stats, {"employees": 0, "clients": 0, "overdue": 0, "efficiency": 0}),
+    "performance": (("employees", "clients", "activities"), _compute_performance, {"data": []}),
+    "alerts": ((), _compute_alerts, {"data": []}),
+    "workload": (("employees", "clients", "activities"), _compute_workload, {"data": []}),
+}
+
+DASHBOARD_SOURCES = {
+    "employees": _fetch_employees,
+    "clients": _fetch_clients,
+    "activities": _fetch_activity_rollup,
+}
+
+# Independent source reads run concurrently
+_snapshot_executor = ThreadPoolExecutor(max_workers=len(DASHBOARD_SOURCES), thread_name_prefix="dashboard")
+
+def _load_snapshot(sources) -> dict:
+    """Fetch each requested source once, concurrently"""
+    futures = {name: _snapshot_executor.submit(DASHBOARD_SOURCES[name]) for name in sources}
+    return {name: future.result() for name, future in futures.items()}
+
+# ============================================================================
+# Dashboard Endpoints
+# ============================================================================
+
+@router.get(
+    "/manager/dashboard",
+    dependencies=[Depends(conditional_get("users", "clients", "activity_logs", cache_control=DASHBOARD_CACHE_CONTROL, auth=require_manager))]
+)
+@cached_read("manager_dashboard", "users", "clients", "activity_logs")
+def manager_dashboard(panels: Optional[str] = None, payload = Depends(require_manager)):
+    """
+    Get several dashboard panels computed from one data snapshot.
+    `panels` is a comma-separated subset of stats,performance,alerts,workload (default: all).
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    requested = [p.strip() for p in panels.split(",") if p.strip()] if panels else list(DASHBOARD_PANELS)
+    unknown = [p for p in requested if p not in DASHBOARD_PANELS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown panels: {', '.join(unknown)}")
+    
+    sources = {s for p in requested for s in DASHBOARD_PANELS[p][0]}
+    try:
+        snapshot = _load_snapshot(sources)
+    except Exception as e:
+        logger.error(f"Error loading dashboard snapshot: {e}")
+        result = {p: DASHBOARD_PANELS[p][2] for p in requested}
+        result["error"] = str(e)
+        return result
+    
+    result = {}
+    for p in requested:
+        needs, compute, _ = DASHBOARD_PANELS[p]
+        result[p] = compute(*(snapshot[s] for s in needs))
+    return result
+
+@router.get(
+    "/manager/stats",
+    dependencies=[Depends(conditional_get("users", "clients", cache_control=DASHBOARD_CACHE_CONTROL, auth=require_manager))]
+)
+@cached_read("manager_stats", "users", "clients")
 def manager_stats(payload = Depends(require_manager)):
     """
     Get dashboard top-level stats
@@ -24,43 +230,16 @@ def manager_stats(payload = Depends(require_manager)):
         raise HTTPException(status_code=503, detail="Database not configured")
     
     try:
-        employees = supabase.table("users").select("id", count="exact").eq("role", "employee").execute()
-        emp_count = employees.count or 0
-        
-        clients_res = supabase.table("clients").select("id,expiry_date,last_contact_date").execute()
-        data = clients_res.data or []
-        total = len(data)
-        
-        now = datetime.utcnow()
-        overdue_count = 0
-        for c in data:
-            # New Logic: Overdue if last_contact_date is > 30 days ago or None
-            last_contact = c.get("last_contact_date")
-            is_overdue = True # Default to overdue (Never contacted)
-            
-            if last_contact:
-                try:
-                    dt = datetime.fromisoformat(last_contact.replace("Z", "+00:00")) if "+" in last_contact or "Z" in last_contact else datetime.fromisoformat(last_contact)
-                    dt = dt.replace(tzinfo=None) if dt.tzinfo else dt
-                    diff_days = (now - dt).days
-                    # Overdue if >= 15 days (User defined: > 15)
-                    # "Due soon" is 7-14.
-                    # "Good" is < 7.
-                    if diff_days < 15:
-                         is_overdue = False 
-                except:
-                    pass
-            
-            if is_overdue:
-                overdue_count += 1
-        
-        efficiency = round((total - overdue_count) / total * 100) if total > 0 else 0
-        return {"employees": emp_count, "clients": total, "overdue": overdue_count, "efficiency": efficiency}
+        return _compute_stats(_fetch_employees(), _fetch_clients())
     except Exception as e:
         logger.error(f"Error loading stats: {e}")
-        return {"employees": 0, "clients": 0, "overdue": 0, "efficiency": 0}
+        return {"employees": 0, "clients": 0, "overdue": 0, "efficiency": 0, "error": str(e)}
 
-@router.get("/manager/employee-performance")
+@router.get(
+    "/manager/employee-performance",
+    dependencies=[Depends(conditional_get("users", "clients", "activity_logs", cache_control=DASHBOARD_CACHE_CONTROL, auth=require_manager))]
+)
+@cached_read("employee_performance", "users", "clients", "activity_logs")
 def employee_performance(payload = Depends(require_manager)):
     """
     Get detailed employee performance table
@@ -69,66 +248,15 @@ def employee_performance(payload = Depends(require_manager)):
         raise HTTPException(status_code=503, detail="Database not configured")
     
     try:
-        employees_res = supabase.table("users").select("id,name,email").eq("role", "employee").execute()
-        employees = employees_res.data or []
-        
-        clients_res = supabase.table("clients").select("id,assigned_employee_id,expiry_date,last_contact_date").execute()
-        clients = clients_res.data or []
-        
-        week_ago = (datetime.utcnow() - timedelta(days=7))
-        activities_res = supabase.table("activity_logs").select("id,employee_id").gte("created_at", week_ago.isoformat()).execute()
-        activities = activities_res.data or []
-        
-        assigned_map = {}
-        overdue_map = {}
-        now = datetime.utcnow()
-        
-        for c in clients:
-            emp_id = c.get("assigned_employee_id")
-            if not emp_id: continue
-            assigned_map[emp_id] = assigned_map.get(emp_id, 0) + 1
-            
-            last_contact = c.get("last_contact_date")
-            is_overdue = True # Default overdue if never contacted
-            if last_contact:
-                try:
-                    lc_dt = datetime.fromisoformat(last_contact.replace("Z", "+00:00")) if "+" in last_contact or "Z" in last_contact else datetime.fromisoformat(last_contact)
-                    lc_dt = lc_dt.replace(tzinfo=None) if lc_dt.tzinfo else lc_dt
-                    diff = (now - lc_dt).days
-                    # Recency Thresholds: Good < 7, Due Soon 7-14, Overdue >= 15
-                    if diff < 15:
-                        is_overdue = False
-                except: pass
-            
-            if is_overdue:
-                overdue_map[emp_id] = overdue_map.get(emp_id, 0) + 1
-        
-        activity_map = {}
-        for a in activities:
-            emp_id = a.get("employee_id")
-            if emp_id: activity_map[emp_id] = activity_map.get(emp_id, 0) + 1
-            
-        data = []
-        for e in employees:
-            assigned = assigned_map.get(e["id"], 0)
-            overdue_count = overdue_map.get(e["id"], 0)
-            # Efficiency: (Assigned - Overdue) / Assigned * 100
-            efficiency = round((assigned - overdue_count) / assigned * 100) if assigned > 0 else 0
-            data.append({
-                "id": e["id"],
-                "name": e.get("name", "Unknown"),
-                "email": e.get("email", ""),
-                "assigned_clients": assigned,
-                "overdue_clients": overdue_count,
-                "activities_this_week": activity_map.get(e["id"], 0),
-                "efficiency": efficiency
-            })
-        return {"data": data}
+        return _compute_performance(_fetch_employees(), _fetch_clients(), _fetch_activity_rollup())
     except Exception as e:
         logger.error(f"Error loading performance: {e}")
-        return {"data": []}
+        return {"data": [], "error": str(e)}
 
-@router.get("/manager/alerts")
+@router.get(
+    "/manager/alerts",
+    dependencies=[Depends(conditional_get("clients", "users", "activity_logs", cache_control=DASHBOARD_CACHE_CONTROL, auth=require_manager))]
+)
 def manager_alerts(payload = Depends(require_manager)):
     """
     Get system alerts
@@ -136,36 +264,13 @@ def manager_alerts(payload = Depends(require_manager)):
     if not supabase:
         return {"data": []}
     
-    alerts = []
-    try:
-        # Check for highly overdue clients
-        clients = supabase.table("clients").select("expiry_date").execute()
-        overdue = 0
-        now = datetime.utcnow()
-        for c in clients.data or []:
-            expiry = c.get("expiry_date")
-            if expiry:
-                try:
-                    dt = datetime.fromisoformat(expiry.replace("Z", "+00:00")).replace(tzinfo=None)
-                    if (now - dt).days > 30:
-                        overdue += 1
-                except:
-                    pass
-        
-        if overdue > 0:
-            alerts.append({
-                "type": "critical" if overdue > 10 else "warning",
-                "title": f"{overdue} Long-Overdue Clients",
-                "message": "Clients overdue by more than 30 days require immediate attention."
-            })
-            
-        # Check for low activity (example)
-    except Exception as e:
-        logger.error(f"Error generating alerts: {e}")
-        
-    return {"data": alerts}
+    return _compute_alerts()
 
-@router.get("/manager/workload-distribution")
+@router.get(
+    "/manager/workload-distribution",
+    dependencies=[Depends(conditional_get("users", "clients", "activity_logs", cache_control=DASHBOARD_CACHE_CONTROL, auth=require_manager))]
+)
+@cached_read("workload_distribution", "users", "clients", "activity_logs")
 def workload_distribution(payload = Depends(require_manager)):
     """
     Get workload distribution (clients and activity) per employee
@@ -174,46 +279,217 @@ def workload_distribution(payload = Depends(require_manager)):
         raise HTTPException(status_code=503, detail="Database not configured")
     
     try:
-        logger.info(f"WORKLOAD: Fetching for {payload['sub']}")
-        employees_res = supabase.table("users").select("id,name").eq("role", "employee").execute()
-        employees = employees_res.data or []
-        logger.info(f"WORKLOAD: Found {len(employees)} employees")
-        
-        clients_res = supabase.table("clients").select("id,assigned_employee_id").execute()
-        clients = clients_res.data or []
-        logger.info(f"WORKLOAD: Found {len(clients)} clients")
-        
-        assigned_map = {}
-        for c in clients:
-            emp_id = c.get("assigned_employee_id")
-            if emp_id:
-                assigned_map[emp_id] = assigned_map.get(emp_id, 0) + 1
-        
-        today = datetime.utcnow().date().isoformat()
-        activities_res = supabase.table("activity_logs").select("id,employee_id,created_at").gte("created_at", today).execute()
-        activities = activities_res.data or []
-        logger.info(f"WORKLOAD: Found {len(activities)} activities today")
-        
-        postings_map = {}
-        for a in activities:
-            emp_id = a.get("employee_id")
-            if emp_id:
-                postings_map[emp_id] = postings_map.get(emp_id, 0) + 1
-        
-        data = []
-        for e in employees:
-            data.append({
-                "employee_id": e["id"],
-                "name": e["name"],
-                "assigned_clients": assigned_map.get(e["id"], 0),
-                "postings_today": postings_map.get(e["id"], 0)
-            })
-        
-        logger.info(f"WORKLOAD: Returning {len(data)} employees")
-        return {"data": data}
+        result = _compute_workload(_fetch_employees(), _fetch_clients(), _fetch_activity_rollup())
+        logger.info(f"WORKLOAD: Returning {len(result['data'])} employees")
+        return result
     except Exception as e:
         logger.error(f"WORKLOAD: ERROR {type(e).__name__}: {e}")
-        return {"data": []}
+        return {"data": [], "error": str(e)}
+
+# ============================================================================
+# Activity Series
+# ============================================================================
+
+SERIES_GROUP_COLUMNS = {"employee": "employee_id", "category": "category", "outcome": "outcome", "client": "client_id"}
+# Groupings the daily rollup can answer; hourly buckets and per-client series read raw rows
+ROLLUP_GROUPS = ("employee", "category", "outcome")
+RAW_SERIES_MAX_DAYS = 31
+SERIES_MAX_BUCKETS = 2000
+
+def _parse_window_bound(value: str, name: str, end: bool = False) -> datetime:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO date or timestamp")
+    if dt.tzinfo:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    # A date-only upper bound includes that whole day
+    if end and len(value) == 10:
+        dt += timedelta(days=1)
+    return dt
+
+def _series_rows(start: datetime, end: datetime, bucket: str, group_by: str, employee_id: Optional[str]):
+    """Times, group keys and value columns for activities in [start, end)"""
+    if bucket != "hour" and group_by in ROLLUP_GROUPS:
+        def build_rollup():
+            return supabase.rpc("activity_rollup_series", {
+                "p_from": start.date().isoformat(),
+                "p_to": end.date().isoformat(),
+                "p_bucket": bucket,
+                "p_group_by": group_by,
+                "p_employee_id": employee_id
+            }).order("bucket").order("group_key")
+        try:
+            rows = fetch_all(build_rollup)
+            return (
+                to_datetime64(r["bucket"] for r in rows),
+                [r.get("group_key") or "" for r in rows],
+                {
+                    "count": np.array([r.get("count") or 0 for r in rows], dtype=np.int64),
+                    "quantity": np.array([r.get("quantity_sum") or 0 for r in rows], dtype=np.int64)
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Activity rollup series unavailable, aggregating raw activity_logs: {e}")
+    
+    column = SERIES_GROUP_COLUMNS[group_by]
+    def build_raw():
+        q = supabase.table("activity_logs").select("id,employee_id,client_id,category,outcome,quantity,created_at") \
+            .gte("created_at", start.isoformat()).lt("created_at", end.isoformat())
+        if employee_id:
+            q = q.eq("employee_id", employee_id)
+        return q.order("created_at").order("id")
+    rows = fetch_all(build_raw)
+    return (
+        to_datetime64(r.get("created_at") for r in rows),
+        [r.get(column) or "" for r in rows],
+        {
+            "count": np.ones(len(rows), dtype=np.int64),
+            "quantity": np.array([r.get("quantity") or 1 for r in rows], dtype=np.int64)
+        }
+    )
+
+def _series_labels(group_by: str, keys: List[str]) -> dict:
+    """Display names for employee and client groups"""
+    if group_by == "employee":
+        return {e["id"]: e.get("name") for e in _fetch_employees()}
+    if group_by == "client":
+        labels = {}
+        ids = [k for k in keys if k]
+        for i in range(0, len(ids), 100):
+            res = supabase.table("clients").select("id,name").in_("id", ids[i:i + 100]).execute()
+            labels.update({c["id"]: c.get("name") for c in res.data or []})
+        return labels
+    return {}
+
+@router.get("/analytics/activity", dependencies=[Depends(conditional_get("activity_logs", "users"))])
+@cached_read("analytics_activity", "activity_logs", "users")
+def activity_analytics(
+    payload = Depends(verify_token),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    bucket: str = Query("day"),
+    group_by: str = Query("employee"),
+    compare: bool = Query(False),
+    employee_id: Optional[str] = Query(None)
+):
+    """
+    Activity counts over an arbitrary window, bucketed by hour/day/week/month and
+    grouped by employee/category/outcome/client. `compare=true` adds the
+    preceding window of the same length. Employees only see their own activity.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(BUCKETS)}")
+    if group_by not in SERIES_GROUP_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(SERIES_GROUP_COLUMNS)}")
+    if payload["role"] == "employee":
+        employee_id = payload["sub"]
+    
+    end = _parse_window_bound(date_to, "to", end=True) if date_to else datetime.utcnow()
+    start = _parse_window_bound(date_from, "from") if date_from else end - timedelta(days=30)
+    if bucket != "hour":
+        # Rollup buckets are whole UTC days
+        start = truncate(start, "day")
+        if end != truncate(end, "day"):
+            end = truncate(end, "day") + timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+    if (bucket == "hour" or group_by not in ROLLUP_GROUPS) and (end - start) > timedelta(days=RAW_SERIES_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Hourly and per-client series are limited to {RAW_SERIES_MAX_DAYS} days")
+    
+    edges = bucket_edges(start, end, bucket)
+    n_buckets = len(edges) - 1
+    if n_buckets > SERIES_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Window spans more than {SERIES_MAX_BUCKETS} buckets; use a larger bucket")
+    
+    prev_start = start - (end - start)
+    try:
+        current_future = _snapshot_executor.submit(_series_rows, start, end, bucket, group_by, employee_id)
+        previous_future = _snapshot_executor.submit(_series_rows, prev_start, start, bucket, group_by, employee_id) if compare else None
+        keys, current = aggregate(*current_future.result(), edges)
+        all_keys = keys
+        if previous_future:
+            prev_edges = bucket_edges(prev_start, start, bucket)
+            prev_keys, previous = aggregate(*previous_future.result(), prev_edges)
+            all_keys = sorted(set(keys) | set(prev_keys))
+            previous = {name: align(m, prev_keys, all_keys, n_buckets) for name, m in previous.items()}
+        current = {name: align(m, keys, all_keys, n_buckets) for name, m in current.items()}
+        labels = _series_labels(group_by, all_keys)
+    except Exception as e:
+        logger.error(f"Error loading activity analytics: {e}")
+        return {"buckets": [], "series": [], "totals": {"count": [], "quantity": [], "total": 0}, "error": str(e)}
+    
+    totals = current["count"].sum(axis=1)
+    series = []
+    for i in np.argsort(-totals, kind="stable"):
+        key = all_keys[i]
+        entry = {
+            "key": key,
+            "label": labels.get(key, key),
+            "counts": current["count"][i].tolist(),
+            "quantity": current["quantity"][i].tolist(),
+            "total": int(totals[i])
+        }
+        if compare:
+            previous_total = int(previous["count"][i].sum())
+            entry["previous_counts"] = previous["count"][i].tolist()
+            entry["previous_total"] = previous_total
+            entry["change_pct"] = change_pct(entry["total"], previous_total)
+        series.append(entry)
+    
+    result = {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "bucket": bucket,
+        "group_by": group_by,
+        "buckets": [str(b) for b in edges[:-1]],
+        "series": series,
+        "totals": {
+            "count": current["count"].sum(axis=0).tolist(),
+            "quantity": current["quantity"].sum(axis=0).tolist(),
+            "total": int(totals.sum())
+        }
+    }
+    if compare:
+        previous_total = int(previous["count"].sum())
+        result["compare"] = {
+            "from": prev_start.isoformat(),
+            "to": start.isoformat(),
+            "counts": previous["count"].sum(axis=0).tolist(),
+            "total": previous_total,
+            "change_pct": change_pct(result["totals"]["total"], previous_total)
+        }
+    return result
+
+# ============================================================================
+# Rollup Maintenance
+# ============================================================================
+
+@router.post("/admin/activity-rollup/rebuild")
+def rebuild_activity_rollup(from_day: Optional[str] = Query(None), payload = Depends(require_admin)):
+    """
+    Rebuild activity_daily_rollup from activity_logs (all history, or from `from_day`)
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    if from_day:
+        try:
+            from_day = datetime.fromisoformat(from_day).date().isoformat()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="from_day must be an ISO date")
+    
+    try:
+        res = supabase.rpc("rebuild_activity_daily_rollup", {"p_from_day": from_day}).execute()
+        bump_version("activity_logs")
+        logger.info(f"Activity rollup rebuilt from {from_day or 'start'} by {payload['sub']}")
+        return {"message": "Activity rollup rebuilt", "rows": res.data, "from_day": from_day}
+    except Exception as e:
+        logger.error(f"Error rebuilding activity rollup: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/export/clients")
 def export_clients(payload = Depends(require_manager)):
@@ -224,7 +500,7 @@ def export_clients(payload = Depends(require_manager)):
         raise HTTPException(status_code=503, detail="Database not configured")
     
     try:
-        res = supabase.table("clients").select("*").execute()
+        res = supabase.table("clients").select("*").is_("deleted_at", "null").execute()
         rows = ["id,name,member_id,city,products_posted,expiry_date,contact_email,contact_phone,assigned_employee_id,status,last_contact_date,created_at"]
         
         for c in res.data or []:
@@ -11,6 +11,7 @@ from ..models import LoginRequest, ProfileUpdate, PasswordChange, TokenResponse
 from ..dependencies import verify_token
 from ..utils import hash_password, verify_password, create_token
 from ..utils.database import supabase
+from ..utils.versions import bump_version
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -50,6 +51,8 @@ def login(req: LoginRequest, request: Request):
         )
     
     try:
+        # Always the database: a cached hash would keep accepting an old
+        # password (or a deleted user) on workers that missed the change
         result = supabase.table("users").select("*").eq("email", req.email).execute()
         logger.info(f"Login attempt for {req.email}: Found {len(result.data or [])} users")
 
@@ -160,6 +163,7 @@ def update_profile(profile: ProfileUpdate, payload = Depends(verify_token)):
     
     if update_data:
         supabase.table("users").update(update_data).eq("id", user_id).execute()
+        bump_version("users")
     
     return {"message": "Profile updated"}
 
@@ -0,0 +1,292 @@
+"""
+Batch Router - many mutations in one request
+"""
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
+from uuid import UUID
+from pydantic import BaseModel, Field, ValidationError
+import logging
+
+from ..models import ActivityLog, DailyReport
+from ..dependencies import verify_token
+from ..utils.database import supabase, get_pg_connection
+from ..utils.versions import bump_version
+from .activities import log_activity, _activity_row, _follow_up_notification, _publish_activity, _publish_notifications
+from .clients import update_client, _client_update_data, _parse_if_match
+from .reports import submit_report, _report_row, _flag_repeated_contacts
+from .notifications import mark_read, MarkReadRequest, _after_marked_read
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api", tags=["batch"])
+
+class BatchOperation(BaseModel):
+    op: str
+    body: dict = Field(default_factory=dict)
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    # All-or-nothing on one direct Postgres connection
+    transaction: bool = False
+    # Without a transaction: skip the remaining operations after a failure
+    stop_on_error: bool = False
+
+# ============================================================================
+# Direct Operations (one PostgREST call chain each, shared client)
+# ============================================================================
+
+def _update_client_direct(body: dict, payload: dict) -> dict:
+    if not body.get("client_id"):
+        raise HTTPException(status_code=400, detail="client_id required")
+    if_match = body.get("if_match")
+    return update_client(body["client_id"], dict(body.get("fields") or {}), payload, None, str(if_match) if if_match is not None else None)
+
+DIRECT_OPERATIONS: Dict[str, Callable[[dict, dict], dict]] = {
+    "log_activity": lambda body, payload: log_activity(ActivityLog(**body), payload),
+    "update_client": _update_client_direct,
+    "submit_report": lambda body, payload: submit_report(DailyReport(**body), payload),
+    "mark_notification_read": lambda body, payload: mark_read(MarkReadRequest(**body), payload),
+}
+
+# ============================================================================
+# Transactional Operations (SQL on a shared connection)
+# ============================================================================
+
+# Each returns (response, after_commit); after_commit runs the cache, counter
+# and push side effects once the whole batch has committed.
+SqlResult = Tuple[dict, Callable[[], None]]
+
+def _jsonable(row: dict) -> dict:
+    """psycopg2 row in the shape PostgREST would return"""
+    out = {}
+    for k, v in row.items():
+        if isinstance(v, UUID):
+            v = str(v)
+        elif isinstance(v, (datetime, date)):
+            v = v.isoformat()
+        out[k] = v
+    return out
+
+def _insert(cur, table: str, row: dict) -> dict:
+    from psycopg2.extras import Json
+
+    columns = list(row)
+    values = [Json(v) if isinstance(v, (dict, list)) else v for v in row.values()]
+    cur.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) RETURNING *",
+        values
+    )
+    return _jsonable(cur.fetchone())
+
+def _log_activity_sql(cur, body: dict, payload: dict) -> SqlResult:
+    activity = ActivityLog(**body)
+    if activity.follow_up_required and not activity.follow_up_due_date:
+        raise HTTPException(status_code=400, detail="follow_up_due_date is required when follow_up_required is true")
+    data = _activity_row(activity, payload["sub"])
+    cur.execute(
+        "UPDATE clients SET last_contact_date = %s, status = 'good' WHERE id = %s AND deleted_at IS NULL",
+        (datetime.utcnow().isoformat(), activity.client_id)
+    )
+    if cur.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Client not found")
+    row = _insert(cur, "activity_logs", data)
+    notification = _follow_up_notification(activity, payload["sub"])
+    notifications = [_insert(cur, "notifications", notification)] if notification else []
+
+    def after_commit():
+        bump_version("activity_logs", "clients", *(["notifications"] if notifications else []))
+        _publish_activity(row, payload["sub"])
+        _publish_notifications(notifications, payload["sub"])
+    return {"message": "Activity logged", "id": row["id"]}, after_commit
+
+def _update_client_sql(cur, body: dict, payload: dict) -> SqlResult:
+    role = payload.get("role", "")
+    if role not in ("employee", "manager", "admin"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not body.get("client_id"):
+        raise HTTPException(status_code=400, detail="client_id required")
+    if_match = body.get("if_match")
+    expected_version = _parse_if_match(str(if_match) if if_match is not None else None)
+    data = _client_update_data(dict(body.get("fields") or {}), role)
+    from_emp = None
+    if "assigned_employee_id" in data:
+        # Previous owner for the history row /api/sync turns into a removal
+        cur.execute("SELECT assigned_employee_id::text FROM clients WHERE id = %s FOR UPDATE", (body["client_id"],))
+        current = cur.fetchone()
+        from_emp = current["assigned_employee_id"] if current else None
+
+    sql = f"UPDATE clients SET {', '.join(f'{k} = %s' for k in data)} WHERE id = %s AND deleted_at IS NULL"
+    params = list(data.values()) + [body["client_id"]]
+    if role == "employee":
+        # Ownership check folded into the UPDATE
+        sql += " AND assigned_employee_id = %s"
+        params.append(payload["sub"])
+    if expected_version is not None:
+        sql += " AND change_seq = %s"
+        params.append(expected_version)
+    cur.execute(sql + " RETURNING *", params)
+    row = cur.fetchone()
+    if not row:
+        cur.execute("SELECT assigned_employee_id::text, change_seq FROM clients WHERE id = %s AND deleted_at IS NULL", (body["client_id"],))
+        current = cur.fetchone()
+        if not current:
+            raise HTTPException(status_code=404, detail="Client not found")
+        if role == "employee" and current["assigned_employee_id"] != payload["sub"]:
+            raise HTTPException(status_code=403, detail="Not authorized to update this client")
+        raise HTTPException(status_code=412, detail="Client was modified by someone else")
+    row = _jsonable(row)
+    if "assigned_employee_id" in data and from_emp != row.get("assigned_employee_id"):
+        _insert(cur, "client_assignment_history", {
+            "client_id": body["client_id"],
+            "assigned_from_employee_id": from_emp,
+            "assigned_to_employee_id": row.get("assigned_employee_id"),
+            "changed_by_user_id": payload["sub"],
+            "reason": "manual_update",
+            "created_at": datetime.utcnow().isoformat()
+        })
+    return {"message": "Client updated", "data": row, "version": row.get("change_seq")}, lambda: bump_version("clients")
+
+def _submit_report_sql(cur, body: dict, payload: dict) -> SqlResult:
+    report = DailyReport(**body)
+    row = _insert(cur, "daily_reports", _report_row(report, payload["sub"]))
+
+    def after_commit():
+        bump_version("daily_reports")
+        _flag_repeated_contacts(report, payload["sub"])
+    return {"message": "Report submitted", "id": row["id"]}, after_commit
+
+def _mark_read_sql(cur, body: dict, payload: dict) -> SqlResult:
+    req = MarkReadRequest(**body)
+    if not req.ids and not req.all:
+        raise HTTPException(status_code=400, detail="ids or all required")
+    sql = "UPDATE notifications SET status = 'read' WHERE user_id = %s AND status = 'unread'"
+    params: list = [payload["sub"]]
+    if req.ids:
+        sql += " AND id::text = ANY(%s)"
+        params.append(req.ids)
+    if req.type:
+        sql += " AND type = %s"
+        params.append(req.type)
+    cur.execute(sql + " RETURNING id, type", params)
+    updated = [_jsonable(r) for r in cur.fetchall()]
+    return (
+        {"message": "Notifications marked read", "count": len(updated)},
+        lambda: _after_marked_read(updated, payload["sub"])
+    )
+
+SQL_OPERATIONS: Dict[str, Callable[..., SqlResult]] = {
+    "log_activity": _log_activity_sql,
+    "update_client": _update_client_sql,
+    "submit_report": _submit_report_sql,
+    "mark_notification_read": _mark_read_sql,
+}
+
+# ============================================================================
+# Endpoint
+# ============================================================================
+
+def _error(index: int, op: str, e: Exception) -> dict:
+    if isinstance(e, HTTPException):
+        return {"index": index, "op": op, "status": e.status_code, "error": e.detail}
+    if isinstance(e, ValidationError):
+        return {"index": index, "op": op, "status": 422, "error": e.errors(include_url=False, include_context=False)}
+    logger.error(f"BATCH: {op} #{index} failed: {e}")
+    return {"index": index, "op": op, "status": 500, "error": str(e)}
+
+def _not_run(index: int, op: str, reason: str) -> dict:
+    return {"index": index, "op": op, "status": 424, "error": reason}
+
+def _run_direct(req: BatchRequest, payload: dict) -> List[dict]:
+    results = []
+    failed = False
+    for i, operation in enumerate(req.operations):
+        if failed and req.stop_on_error:
+            results.append(_not_run(i, operation.op, "Not run: an earlier operation failed"))
+            continue
+        try:
+            results.append({"index": i, "op": operation.op, "status": 200, "data": DIRECT_OPERATIONS[operation.op](operation.body, payload)})
+        except Exception as e:
+            failed = True
+            results.append(_error(i, operation.op, e))
+    return results
+
+def _run_transaction(req: BatchRequest, payload: dict) -> Tuple[List[dict], bool]:
+    from psycopg2.extras import RealDictCursor
+
+    try:
+        conn = get_pg_connection()
+    except Exception as e:
+        logger.error(f"BATCH: no direct database connection: {e}")
+        raise HTTPException(status_code=503, detail="Transactions not available")
+
+    results: List[dict] = []
+    after_commit: List[Callable[[], None]] = []
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            for i, operation in enumerate(req.operations):
+                try:
+                    data, hook = SQL_OPERATIONS[operation.op](cur, operation.body, payload)
+                except Exception as e:
+                    conn.rollback()
+                    failed = _error(i, operation.op, e)
+                    results = [
+                        _not_run(r["index"], r["op"], "Rolled back") for r in results
+                    ] + [failed] + [
+                        _not_run(j, o.op, "Not run: an earlier operation failed")
+                        for j, o in enumerate(req.operations) if j > i
+                    ]
+                    return results, False
+                results.append({"index": i, "op": operation.op, "status": 200, "data": data})
+                after_commit.append(hook)
+        try:
+            conn.commit()
+        except Exception as e:
+            # Deferred constraints and serialization failures surface here
+            logger.error(f"BATCH: commit failed for {payload['sub']}: {e}")
+            conn.rollback()
+            return [_not_run(r["index"], r["op"], "Rolled back") for r in results], False
+    finally:
+        conn.close()
+
+    for hook in after_commit:
+        try:
+            hook()
+        except Exception as e:
+            logger.warning(f"BATCH: post-commit step failed: {e}")
+    return results, True
+
+@router.post("/batch")
+def batch(req: BatchRequest, payload = Depends(verify_token)):
+    """
+    Run an ordered list of operations with one token check and one response.
+    ops: log_activity (ActivityLog body), update_client ({client_id, fields, if_match}),
+    submit_report (DailyReport body), mark_notification_read ({ids | all, type}).
+    Results are per operation and keep the order given. With `transaction`,
+    either every operation commits or none does.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    if not req.operations:
+        raise HTTPException(status_code=400, detail="operations required")
+    if len(req.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations per batch")
+    unknown = sorted({o.op for o in req.operations if o.op not in DIRECT_OPERATIONS})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown operations: {', '.join(unknown)}")
+
+    logger.info(f"BATCH: {len(req.operations)} operations for {payload['sub']} (transaction={req.transaction})")
+    committed: Optional[bool] = None
+    if req.transaction:
+        results, committed = _run_transaction(req, payload)
+    else:
+        results = _run_direct(req, payload)
+
+    response = {
+        "results": results,
+        "succeeded": sum(1 for r in results if r["status"] == 200),
+        "failed": sum(1 for r in results if r["status"] != 200)
+    }
+    if committed is not None:
+        response["committed"] = committed
+    return response
@@ -1,97 +1,86 @@
 """
 Clients Router
 """
-from fastapi import APIRouter, HTTPException, Depends, Query, File, UploadFile
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Query, File, UploadFile, Header, Response
+from typing import Optional, List, Dict
 from datetime import datetime, timedelta
-import math
+import json
 import logging
 import random
 
 from ..models import ClientCreate
 from ..dependencies import verify_token, require_manager
 from ..utils.database import supabase
+from ..utils.http_cache import conditional_get
+from ..utils.versions import bump_version
+from ..utils.responses import FastJSONResponse
+from ..utils.cache import cached_read
+from ..utils.client_status import classify_client, recency_status, RECENCY_STATUSES
+from ..utils.user_directory import user_directory
+from ..utils.loaders import BATCH_SIZE
+from ..utils.client_keys import client_keys, match_keys, find_existing
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/clients", tags=["clients"])
 
-@router.get("")
-def list_clients(payload = Depends(verify_token), employee_id: Optional[str] = Query(None)):
+@router.get("", dependencies=[Depends(conditional_get("clients"))])
+@cached_read("list_clients", "clients")
+def list_clients(
+    payload = Depends(verify_token),
+    employee_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None)
+):
     """
-    List clients with status calculation
+    List clients with status calculation, optionally filtered by the
+    materialized status (served by idx_clients_assigned_status)
     """
+    if status and status not in RECENCY_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(RECENCY_STATUSES)}")
+    
     # Production mode - use Supabase
     try:
-        query = supabase.table("clients").select("*")
+        query = supabase.table("clients").select("*").is_("deleted_at", "null")
         if payload["role"] == "employee":
             query = query.eq("assigned_employee_id", payload["sub"])    
         elif employee_id:
             query = query.eq("assigned_employee_id", employee_id)
+        if status:
+            query = query.eq("status", status)
         
         result = query.execute()
         items = result.data or []
         
-        def classify(c: dict):
-            # Calculate days since last contact
-            last_contact = c.get("last_contact_date")
-            days_since = 9999
-            if last_contact:
-                try:
-                    # Parse last_contact_date
-                    lc_dt = datetime.fromisoformat(last_contact.replace("Z", "+00:00")) if "+" in last_contact or "Z" in last_contact else datetime.fromisoformat(last_contact)
-                    lc_dt = lc_dt.replace(tzinfo=None) if lc_dt.tzinfo else lc_dt
-                    now = datetime.utcnow()
-                    diff = (now - lc_dt).total_seconds()
-                    days_since = math.floor(diff / 86400)
-                except Exception:
-                    pass
-
-            # Recency Logic (User Defined)
-            # Good: < 7 days
-            # Due Soon: 7-14 days
-            # Overdue: > 15 days (Treating as >= 15 for safety/continuity, ensuring no gap at 15)
-            
-            status = "overdue"
-            if days_since < 7:
-                status = "good" 
-            elif days_since <= 14:
-                status = "due_soon"
-            # Else (>= 15) -> Overdue
-
-            # Still calculate expiry days for display/sorting if needed, but NOT for status
-            expiry = c.get("expiry_date")
-            days_until_expiry = 9999
-            if expiry:
-                try:
-                    if isinstance(expiry, str):
-                        dt = datetime.fromisoformat(expiry.replace("Z", "+00:00")) if "+" in expiry or "Z" in expiry else datetime.fromisoformat(expiry)
-                        dt = dt.replace(tzinfo=None) if dt.tzinfo else dt
-                    else:
-                        dt = expiry
-                    now = datetime.utcnow()
-                    days_until_expiry = math.ceil((dt - now).total_seconds() / 86400)
-                except:
-                    pass
-
-            c2 = dict(c)
-            c2["days_since_contact"] = days_since
-            c2["days_until_expiry"] = days_until_expiry
-            c2["status"] = status
-            c2["is_overdue"] = (status == "overdue")
-            return c2
-
-        enriched = [classify(c) for c in items]
+        now = datetime.utcnow()
+        enriched = [classify_client(c, now) for c in items]
         # Sort by days_until_expiry ascending (Overdue negative numbers first, then small positive, then large positive)
         enriched.sort(key=lambda x: x["days_until_expiry"])
         
-        return {"data": enriched, "total": len(enriched)}
+        # Large payload: render with orjson directly, skipping jsonable_encoder
+        return FastJSONResponse({"data": enriched, "total": len(enriched)})
     except Exception as e:
         logger.error(f"Error loading clients: {e}")
         return {"data": [], "total": 0, "error": str(e)}
 
+def _row_version_etag(row: dict) -> Optional[str]:
+    """Strong ETag for a client row's change_seq (migration 010)"""
+    version = row.get("change_seq")
+    return f'"{version}"' if version is not None else None
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Row version from an If-Match header; None for absent or `*`"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a client version")
+
 @router.get("/{client_id}")
-def get_client(client_id: str, payload = Depends(verify_token)):
+def get_client(client_id: str, response: Response, payload = Depends(verify_token)):
     """
     Get single client details
     """
@@ -99,7 +88,7 @@ def get_client(client_id: str, payload = Depends(verify_token)):
         raise HTTPException(status_code=503, detail="Database not configured")
     
     try:
-        res = supabase.table("clients").select("*").eq("id", client_id).execute()
+        res = supabase.table("clients").select("*").eq("id", client_id).is_("deleted_at", "null").execute()
         if not res.data:
             raise HTTPException(status_code=404, detail="Client not found")
         
@@ -113,25 +102,10 @@ def get_client(client_id: str, payload = Depends(verify_token)):
         elif client.get("assigned_employee_id") != payload["sub"]:
              raise HTTPException(status_code=403, detail="Not authorized to view this client")
         
-        # Classify status (reuse logic if possible, or just duplicate for now to be safe)
-        last_contact = client.get("last_contact_date")
-        days_since = 9999
-        if last_contact:
-            try:
-                lc_dt = datetime.fromisoformat(last_contact.replace("Z", "+00:00")) if "+" in last_contact or "Z" in last_contact else datetime.fromisoformat(last_contact)
-                lc_dt = lc_dt.replace(tzinfo=None) if lc_dt.tzinfo else lc_dt
-                diff = (datetime.utcnow() - lc_dt).total_seconds()
-                days_since = math.floor(diff / 86400)
-            except: pass
-            
-        status = "overdue"
-        if days_since < 7: status = "good"
-        elif days_since <= 14: status = "due_soon"
-        
-        client["status"] = status
-        client["days_since_contact"] = days_since
-        
-        return client
+        etag = _row_version_etag(client)
+        if etag:
+            response.headers["ETag"] = etag
+        return classify_client(client)
     except HTTPException:
         raise
     except Exception as e:
@@ -161,13 +135,27 @@ def create_client(client: ClientCreate, payload = Depends(verify_token)):
             "expiry_date": client.expiry_date if client.expiry_date else None,
             "contact_email": client.email or None,
             "contact_phone": client.phone or None,
-            "status": "new",
+            "status": recency_status(None),
             "last_contact_date": None,
             "assigned_employee_id": assigned_id,
             "created_at": datetime.utcnow().isoformat()
         }
+
+        # Same member_id as a live client is a duplicate; shared email or
+        # phone is only reported, since different members can share them
+        keys = client_keys(data)
+        existing = find_existing(keys)
+        warnings = []
+        for kind, key in keys:
+            if (kind, key) not in existing:
+                continue
+            match_id = existing[(kind, key)]["id"]
+            if kind == "member_id":
+                raise HTTPException(status_code=409, detail=f"Client already exists: member_id matches client {match_id}")
+            warnings.append({"field": kind, "client_id": match_id})
         
         result = supabase.table("clients").insert(data).execute()
+        bump_version("clients")
         
         # Log assignment history if auto-assigned
         if assigned_id and result.data:
@@ -184,11 +172,50 @@ def create_client(client: ClientCreate, payload = Depends(verify_token)):
                  logger.warning(f"History insert failed for self-created client: {h_err}")
 
         logger.info(f"Client created: {result.data}")
-        return {"message": "Client created", "data": result.data[0] if result.data else None}
+        response = {"message": "Client created", "data": result.data[0] if result.data else None}
+        if warnings:
+            response["warnings"] = warnings
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating client: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ============================================================================
+# Assignment History
+# ============================================================================
+
+def _current_assignees(client_ids: List[str]) -> Dict[str, Optional[str]]:
+    """client id -> assigned_employee_id for live clients, one query per BATCH_SIZE ids"""
+    assignees: Dict[str, Optional[str]] = {}
+    for start in range(0, len(client_ids), BATCH_SIZE):
+        res = supabase.table("clients").select("id,assigned_employee_id").in_("id", client_ids[start:start + BATCH_SIZE]) \
+            .is_("deleted_at", "null").execute()
+        assignees.update({r["id"]: r.get("assigned_employee_id") for r in res.data or []})
+    return assignees
+
+def _record_assignments(changes: List[tuple], payload: dict, reason: str) -> None:
+    """
+    One history insert for (client_id, from_employee_id, to_employee_id)
+    changes. The previous owner is what /api/sync turns into a removal for
+    that employee, so every reassignment path must record it.
+    """
+    if not changes:
+        return
+    now = datetime.utcnow().isoformat()
+    try:
+        supabase.table("client_assignment_history").insert([{
+            "client_id": client_id,
+            "assigned_from_employee_id": from_emp,
+            "assigned_to_employee_id": to_emp,
+            "changed_by_user_id": payload["sub"],
+            "reason": reason,
+            "created_at": now
+        } for client_id, from_emp, to_emp in changes]).execute()
+    except Exception as e:
+        logger.warning(f"assignment_history insert failed ({reason}, {len(changes)} clients): {e}")
+
 @router.post("/{client_id}/assign")
 def assign_client(client_id: str, body: dict, payload = Depends(require_manager)):
     """
@@ -201,85 +228,209 @@ def assign_client(client_id: str, body: dict, payload = Depends(require_manager)
     if not employee_id:
         raise HTTPException(status_code=400, detail="employee_id required")
     
-    supabase.table("clients").update({"assigned_employee_id": employee_id}).eq("id", client_id).execute()
-    try:
-        supabase.table("client_assignment_history").insert({
-            "client_id": client_id,
-            "assigned_to_employee_id": employee_id,
-            "changed_by_user_id": payload["sub"],
-            "reason": "manual_assign",
-            "created_at": datetime.utcnow().isoformat()
-        }).execute()
-    except Exception as e:
-        logger.warning(f"assignment_history insert failed (client {client_id} -> {employee_id}): {e}")
+    from_emp = _current_assignees([client_id]).get(client_id)
+    res = supabase.table("clients").update({"assigned_employee_id": employee_id}).eq("id", client_id) \
+        .is_("deleted_at", "null").execute()
+    if not res.data:
+        raise HTTPException(status_code=404, detail="Client not found")
+    bump_version("clients")
+    _record_assignments([(client_id, from_emp, employee_id)], payload, "manual_assign")
     return {"message": "Client assigned"}
 
 @router.delete("/{client_id}")
 def delete_client(client_id: str, payload = Depends(require_manager)):
     """
-    Delete a client
+    Delete a client (soft delete: deleted_at marks the row so /api/sync can
+    send a tombstone; reads filter it out)
     """
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not configured")
     
     try:
-        result = supabase.table("clients").delete().eq("id", client_id).execute()
+        result = supabase.table("clients").update({"deleted_at": datetime.utcnow().isoformat()}).eq("id", client_id).is_("deleted_at", "null").execute()
+        bump_version("clients", "activity_logs")
         logger.info(f"Client deleted: {client_id}")
         return {"message": "Client deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting client: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.patch("/{client_id}")
-def update_client(client_id: str, client: dict, payload = Depends(verify_token)):
+# status is derived from last_contact_date, not set directly
+CLIENT_UPDATE_FIELDS = ["name", "member_id", "city", "products_posted", "expiry_date", "contact_email", "contact_phone", "last_contact_date", "assigned_employee_id"]
+
+def _client_update_data(client: dict, role: str) -> dict:
+    """Whitelisted, sanitized update for a client; 400 if nothing is left"""
+    # Restrict employees from changing assignment
+    data = {k: v for k, v in client.items() if k in CLIENT_UPDATE_FIELDS and not (role == "employee" and k == "assigned_employee_id")}
+    
+    # Sanitize data types
+    if "expiry_date" in data and data["expiry_date"] == "":
+        data["expiry_date"] = None
+    if "assigned_employee_id" in data and data["assigned_employee_id"] == "":
+        data["assigned_employee_id"] = None
+    if "last_contact_date" in data:
+        data["status"] = recency_status(data["last_contact_date"])
+    
+    if not data:
+        raise HTTPException(status_code=400, detail="No valid fields to update")
+    return data
+
+# Filters accepted by bulk PATCH: key -> (operator, column)
+BULK_FILTERS = {
+    "employee_id": ("eq", "assigned_employee_id"),
+    "status": ("eq", "status"),
+    "city": ("eq", "city"),
+    "expiry_before": ("lt", "expiry_date"),
+    "expiry_after": ("gte", "expiry_date"),
+}
+
+def _bulk_update_group(data: dict, ids: List[str]) -> List[str]:
+    """One UPDATE per id chunk for a shared field set; returns updated ids"""
+    updated = []
+    for start in range(0, len(ids), BATCH_SIZE):
+        res = supabase.table("clients").update(data).in_("id", ids[start:start + BATCH_SIZE]) \
+            .is_("deleted_at", "null").execute()
+        updated.extend(r["id"] for r in res.data or [])
+    return updated
+
+# Declared before /{client_id} so "bulk" is not taken as an id
+@router.patch("/bulk")
+def bulk_update_clients(body: dict, payload = Depends(require_manager)):
     """
-    Update client details
+    Update many clients at once. Either
+      {"updates": [{"id": ..., "fields": {...}}, ...]}  per-client field sets, or
+      {"filter": {employee_id|status|city|expiry_before|expiry_after}, "fields": {...}}.
+    Fields go through the same whitelist as PATCH /{client_id}; entries
+    sharing a field set are applied as one set-based UPDATE. Assignment is
+    changed through /bulk-assign, which keeps the assignment history.
     """
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not configured")
     
+    role = payload.get("role", "")
+    updates = body.get("updates")
+    flt = body.get("filter")
+    if bool(updates) == bool(flt):
+        raise HTTPException(status_code=400, detail="Provide either updates or filter + fields")
+    field_sets = [body.get("fields") or {}] if flt else [e.get("fields") or {} for e in updates if isinstance(e, dict)]
+    if any("assigned_employee_id" in f for f in field_sets):
+        raise HTTPException(status_code=400, detail="Use /api/clients/bulk-assign to change assigned_employee_id")
+    
+    ignored = set()
     try:
-        # Check if client exists
-        res = supabase.table("clients").select("*").eq("id", client_id).execute()
-        if not res.data:
-            raise HTTPException(status_code=404, detail="Client not found")
-        
-        current_client = res.data[0]
-        role = payload.get("role", "")
-        
-        # Access Control
-        if role == "employee":
-            # Allow employees to update if assigned to them
-            if current_client.get("assigned_employee_id") != payload["sub"]:
-                 raise HTTPException(status_code=403, detail="Not authorized to update this client")
-        elif role not in ["manager", "admin"]:
-            raise HTTPException(status_code=403, detail="Not authorized")
+        if flt:
+            unknown = sorted(set(flt) - set(BULK_FILTERS))
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown filters: {', '.join(unknown)}")
+            fields = dict(body.get("fields") or {})
+            ignored.update(k for k in fields if k not in CLIENT_UPDATE_FIELDS)
+            data = _client_update_data(fields, role)
+            query = supabase.table("clients").update(data).is_("deleted_at", "null")
+            for key, value in flt.items():
+                op, column = BULK_FILTERS[key]
+                query = getattr(query, op)(column, value)
+            res = query.execute()
+            results = [{"id": r["id"], "status": "updated"} for r in res.data or []]
+        else:
+            if len(updates) > settings.CLIENT_BULK_UPDATE_MAX:
+                raise HTTPException(status_code=400, detail=f"At most {settings.CLIENT_BULK_UPDATE_MAX} updates per request")
+            results, groups = [], {}
+            for entry in updates:
+                client_id = entry.get("id") if isinstance(entry, dict) else None
+                if not client_id:
+                    results.append({"id": None, "status": "error", "error": "id required"})
+                    continue
+                fields = dict(entry.get("fields") or {})
+                ignored.update(k for k in fields if k not in CLIENT_UPDATE_FIELDS)
+                try:
+                    data = _client_update_data(fields, role)
+                except HTTPException as e:
+                    results.append({"id": client_id, "status": "error", "error": e.detail})
+                    continue
+                key = json.dumps(data, sort_keys=True, default=str)
+                groups.setdefault(key, (data, []))[1].append(client_id)
             
-        allowed_fields = ["name", "member_id", "city", "products_posted", "expiry_date", "contact_email", "contact_phone", "status", "last_contact_date", "assigned_employee_id"]
-        
-        # Restrict employees from changing assignment
-        if role == "employee" and "assigned_employee_id" in client:
-            del client["assigned_employee_id"]
+            for data, ids in groups.values():
+                updated = set(_bulk_update_group(data, ids))
+                results.extend({"id": cid, "status": "updated" if cid in updated else "not_found"} for cid in ids)
+            logger.info(f"Bulk client update: {len(updates)} entries in {len(groups)} statements")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk client update error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    updated_count = sum(1 for r in results if r["status"] == "updated")
+    if updated_count:
+        bump_version("clients")
+    return {
+        "updated": updated_count,
+        "failed": len(results) - updated_count,
+        # Not in the update whitelist (status follows last_contact_date)
+        "ignored_fields": sorted(ignored),
+        "results": results
+    }
 
-        data = {k: v for k, v in client.items() if k in allowed_fields}
-        
-        # Sanitize data types
-        if "expiry_date" in data and data["expiry_date"] == "":
-            data["expiry_date"] = None
-        if "assigned_employee_id" in data and data["assigned_employee_id"] == "":
-             data["assigned_employee_id"] = None
-        
-        if not data:
-            raise HTTPException(status_code=400, detail="No valid fields to update")
-            
-        result = supabase.table("clients").update(data).eq("id", client_id).execute()
+@router.patch("/{client_id}")
+def update_client(
+    client_id: str,
+    client: dict,
+    payload = Depends(verify_token),
+    response: Response = None,
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Update client details in one conditional UPDATE: ownership (employees)
+    and, with If-Match, the row version are part of its filter. The new
+    version is returned in the ETag header and as `version`.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    role = payload.get("role", "")
+    if role not in ["employee", "manager", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    expected_version = _parse_if_match(if_match)
+    data = _client_update_data(client, role)
+    
+    try:
+        reassigning = "assigned_employee_id" in data
+        if reassigning:
+            from_emp = _current_assignees([client_id]).get(client_id)
+        query = supabase.table("clients").update(data).eq("id", client_id).is_("deleted_at", "null")
+        # Access Control: employees may only update clients assigned to them
+        if role == "employee":
+            query = query.eq("assigned_employee_id", payload["sub"])
+        if expected_version is not None:
+            query = query.eq("change_seq", expected_version)
+        result = query.execute()
         
         if not result.data:
+            # Nothing matched; one read to report why
+            res = supabase.table("clients").select("id,assigned_employee_id,change_seq").eq("id", client_id).is_("deleted_at", "null").execute()
+            if not res.data:
+                raise HTTPException(status_code=404, detail="Client not found")
+            current = res.data[0]
+            if role == "employee" and current.get("assigned_employee_id") != payload["sub"]:
+                raise HTTPException(status_code=403, detail="Not authorized to update this client")
+            if expected_version is not None and current.get("change_seq") != expected_version:
+                raise HTTPException(
+                    status_code=412,
+                    detail="Client was modified by someone else",
+                    headers={"ETag": _row_version_etag(current) or ""}
+                )
             logger.error(f"Update returned no data for client {client_id}. Data: {data}")
             raise HTTPException(status_code=500, detail="Update failed at database level")
-
+        
+        bump_version("clients")
+        updated = result.data[0]
+        if reassigning and from_emp != updated.get("assigned_employee_id"):
+            _record_assignments([(client_id, from_emp, updated.get("assigned_employee_id"))], payload, "manual_update")
+        etag = _row_version_etag(updated)
+        if etag and response is not None:
+            response.headers["ETag"] = etag
         logger.info(f"Client updated: {client_id}")
-        return {"message": "Client updated", "data": result.data[0]}
+        return {"message": "Client updated", "data": updated, "version": updated.get("change_seq")}
     except HTTPException:
         raise
     except Exception as e:
@@ -316,7 +467,7 @@ def bulk_create_clients(body: dict, payload = Depends(require_manager)):
                 "expiry_date": (datetime.utcnow() + timedelta(days=random.randint(30, 365))).date().isoformat(),
                 "contact_email": f"client{i}@example.com",
                 "contact_phone": f"+91-{random.randint(7000000000, 9999999999)}",
-                "status": "new",
+                "status": recency_status(None),
                 "last_contact_date": None,
                 "created_at": datetime.utcnow().isoformat()
             }
@@ -325,6 +476,7 @@ def bulk_create_clients(body: dict, payload = Depends(require_manager)):
             # Insert in batches of 50
             if len(batch_data) >= 50 or i == count:
                 result = supabase.table("clients").insert(batch_data).execute()
+                bump_version("clients")
                 if result.data:
                     clients.extend(result.data)
                     logger.info(f"Inserted batch: {len(result.data)} clients")
@@ -336,11 +488,32 @@ def bulk_create_clients(body: dict, payload = Depends(require_manager)):
         logger.error(f"Error bulk creating clients: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ?mode= for CSV import: upsert updates clients that match on a normalized
+# member_id / email / phone, skip leaves them alone, insert adds every row
+CSV_IMPORT_MODES = ("upsert", "skip", "insert")
+
+# Columns a CSV row may overwrite on a matched client; status, assignment
+# and contact history are never touched by an import. member_id is written
+# but never replaced: a match is either on it or on a row without one.
+CSV_UPDATE_FIELDS = ["name", "member_id", "city", "products_posted", "expiry_date", "contact_email", "contact_phone"]
+
+def _csv_merge(existing: dict, data: dict) -> dict:
+    """Existing client with the non-empty CSV values applied"""
+    merged = {f: existing.get(f) for f in CSV_UPDATE_FIELDS}
+    merged.update({f: data[f] for f in CSV_UPDATE_FIELDS if data[f] is not None and f != "member_id"})
+    return merged
+
 @router.post("/bulk-import-csv")
-async def bulk_import_csv(file: UploadFile = File(...), payload = Depends(require_manager)):
+async def bulk_import_csv(
+    file: UploadFile = File(...),
+    payload = Depends(require_manager),
+    mode: str = Query("upsert", description="upsert | skip | insert: what to do with rows matching an existing client")
+):
     """
     Import clients from CSV file
     """
+    if mode not in CSV_IMPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(CSV_IMPORT_MODES)}")
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not configured")
     
@@ -353,34 +526,79 @@ async def bulk_import_csv(file: UploadFile = File(...), payload = Depends(requir
         
         clients = []
         for row in reader:
+            products_posted = (row.get("products_posted") or "").strip()
             data = {
                 "name": row.get("name", "").strip(),
                 "member_id": row.get("member_id", "").strip() or None,
                 "city": row.get("city", "").strip() or None,
-                "products_posted": int(row.get("products_posted", 0) or 0),
+                "products_posted": int(products_posted) if products_posted else None,
                 "expiry_date": row.get("expiry_date", "").strip() or None,
                 "contact_email": row.get("email", "").strip() or None,
                 "contact_phone": row.get("phone", "").strip() or None,
-                "status": "new",
-                "last_contact_date": None,
-                "created_at": datetime.utcnow().isoformat()
             }
             if data["name"]:
                 clients.append(data)
         
         if not clients:
             raise HTTPException(status_code=400, detail="No valid clients found in CSV")
+
+        to_insert, to_update, skipped = clients, {}, 0
+        if mode != "insert":
+            # One lookup per key kind for the whole file; the hash set catches
+            # rows repeated within the file itself
+            existing = find_existing(
+                (k for data in clients for k in match_keys(data)),
+                columns="id," + ",".join(CSV_UPDATE_FIELDS)
+            )
+            seen = set()
+            to_insert = []
+            for data in clients:
+                keys = match_keys(data)
+                if any(k in seen for k in keys):
+                    skipped += 1
+                    continue
+                seen.update(keys)
+                match = next((existing[k] for k in keys if k in existing), None)
+                if match is None:
+                    to_insert.append(data)
+                    continue
+                merged = _csv_merge(match, data)
+                unchanged = all(merged[f] == match.get(f) for f in CSV_UPDATE_FIELDS)
+                if mode == "skip" or unchanged or match["id"] in to_update:
+                    skipped += 1
+                else:
+                    to_update[match["id"]] = dict(merged, id=match["id"])
         
-        # Insert in batches
+        # Write in batches
         batch_size = 50
+        now = datetime.utcnow().isoformat()
+        new_rows = [
+            dict(data, products_posted=data["products_posted"] or 0, status=recency_status(None), last_contact_date=None, created_at=now)
+            for data in to_insert
+        ]
         inserted = []
-        for i in range(0, len(clients), batch_size):
-            batch = clients[i:i+batch_size]
-            result = supabase.table("clients").insert(batch).execute()
+        for i in range(0, len(new_rows), batch_size):
+            result = supabase.table("clients").insert(new_rows[i:i+batch_size]).execute()
             if result.data:
                 inserted.extend(result.data)
+        updates = list(to_update.values())
+        updated = 0
+        for i in range(0, len(updates), batch_size):
+            result = supabase.table("clients").upsert(updates[i:i+batch_size], on_conflict="id").execute()
+            updated += len(result.data or [])
+        if inserted or updated:
+            bump_version("clients")
         
-        return {"message": f"Imported {len(inserted)} clients", "count": len(inserted)}
+        logger.info(f"CSV import ({mode}): {len(inserted)} inserted, {updated} updated, {skipped} skipped")
+        return {
+            "message": f"Imported {len(inserted)} clients, updated {updated}, skipped {skipped}",
+            "count": len(inserted) + updated,
+            "inserted": len(inserted),
+            "updated": updated,
+            "skipped": skipped
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"CSV import error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -398,20 +616,18 @@ def bulk_assign_clients(body: dict, payload = Depends(require_manager)):
     if not client_ids or not employee_id:
         raise HTTPException(status_code=400, detail="client_ids and employee_id required")
     
+    previous = _current_assignees(client_ids)
+    results, changes = [], []
     for cid in client_ids:
-        supabase.table("clients").update({"assigned_employee_id": employee_id}).eq("id", cid).execute()
-        try:
-            supabase.table("client_assignment_history").insert({
-                "client_id": cid,
-                "assigned_to_employee_id": employee_id,
-                "changed_by_user_id": payload["sub"],
-                "reason": "bulk_assign",
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-        except Exception as e:
-            logger.warning(f"assignment_history insert failed (bulk {cid} -> {employee_id}): {e}")
+        res = supabase.table("clients").update({"assigned_employee_id": employee_id}).eq("id", cid) \
+            .is_("deleted_at", "null").execute()
+        if res.data:
+            changes.append((cid, previous.get(cid), employee_id))
+        results.append({"id": cid, "status": "updated" if res.data else "not_found"})
+    _record_assignments(changes, payload, "bulk_assign")
     
-    return {"message": f"Assigned {len(client_ids)} clients", "count": len(client_ids)}
+    bump_version("clients")
+    return {"message": f"Assigned {len(changes)} clients", "count": len(changes), "results": results}
 
 @router.post("/assign-round-robin")
 def assign_round_robin(body: dict, payload = Depends(require_manager)):
@@ -422,32 +638,29 @@ def assign_round_robin(body: dict, payload = Depends(require_manager)):
         raise HTTPException(status_code=503, detail="Database unavailable")
 
     client_ids: List[str] = body.get("client_ids", [])
-    employees = supabase.table("users").select("id").eq("role", "employee").execute().data or []
+    employees = user_directory.ids_by_role("employee")
     if not employees:
         raise HTTPException(status_code=400, detail="No employees available")
 
     if not client_ids:
         # If no explicit list, take all unassigned
-        client_ids = [c["id"] for c in supabase.table("clients").select("id").is_('assigned_employee_id', "null").execute().data or []]
+        client_ids = [c["id"] for c in supabase.table("clients").select("id").is_('assigned_employee_id', "null").is_("deleted_at", "null").execute().data or []]
 
     assigned_count = {}
-    for i, cid in enumerate(client_ids):
-        to_emp = employees[i % len(employees)]["id"]
-        # Fetch current assignment for history
-        from_emp = (supabase.table("clients").select("assigned_employee_id").eq("id", cid).execute().data or [{}])[0].get("assigned_employee_id")
-        
-        supabase.table("clients").update({"assigned_employee_id": to_emp, "updated_at": datetime.utcnow().isoformat()}).eq("id", cid).execute()
-        try:
-            supabase.table("client_assignment_history").insert({
-                "client_id": cid,
-                "assigned_from_employee_id": from_emp,
-                "assigned_to_employee_id": to_emp,
-                "changed_by_user_id": payload["sub"],
-                "reason": body.get("reason", "round_robin"),
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-        except Exception as e:
-            logger.warning(f"assignment_history insert failed (rr {cid} {from_emp}->{to_emp}): {e}")
+    # Current assignment for history
+    previous = _current_assignees(client_ids)
+    changes, not_found = [], []
+    for cid in client_ids:
+        # Only clients that were actually assigned take a turn in the rotation
+        to_emp = employees[len(changes) % len(employees)]
+        res = supabase.table("clients").update({"assigned_employee_id": to_emp}).eq("id", cid) \
+            .is_("deleted_at", "null").execute()
+        if not res.data:
+            not_found.append(cid)
+            continue
+        changes.append((cid, previous.get(cid), to_emp))
         assigned_count[to_emp] = assigned_count.get(to_emp, 0) + 1
+    _record_assignments(changes, payload, body.get("reason", "round_robin"))
     
-    return {"message": "Assigned", "summary": assigned_count}
+    bump_version("clients")
+    return {"message": "Assigned", "summary": assigned_count, "not_found": not_found}
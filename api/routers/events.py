@@ -0,0 +1,64 @@
+"""
+Events Router - Server-Sent Events push channel
+"""
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import logging
+
+from ..dependencies import verify_stream_token
+from ..utils.events import event_bus, user_channel, role_channel
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+async def _stream(request: Request, channels: set, last_event_id: Optional[str], user_id: str):
+    # Subscribed inside the generator, so a client gone before the first read
+    # never leaves a subscription behind, and before the replay, so nothing
+    # published in between is lost
+    sub = event_bus.subscribe(channels)
+    logger.info(f"SSE: subscribed {user_id} ({event_bus.subscriber_count} open)")
+    try:
+        yield b"retry: 3000\n\n"
+        replayed_seq = 0
+        if last_event_id:
+            missed = event_bus.replay(channels, last_event_id)
+            if missed is None:
+                yield b"event: resync\ndata: {}\n\n"
+            else:
+                for event in missed:
+                    yield event.encode()
+                if missed:
+                    replayed_seq = missed[-1].seq
+
+        while not sub.lagging:
+            if await request.is_disconnected():
+                break
+            event = await sub.get(timeout=settings.SSE_HEARTBEAT_SECONDS)
+            if event is None:
+                yield b": heartbeat\n\n"
+            elif event.seq > replayed_seq:
+                # Queued events already sent by the replay are skipped
+                yield event.encode()
+    finally:
+        sub.close()
+        logger.info(f"SSE: closed {user_id}")
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    payload = Depends(verify_stream_token),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Push notifications, report flags and activity-feed entries as they are written.
+    Reconnect with Last-Event-ID to replay missed events; a `resync` event means
+    the gap could not be replayed and the client should refetch over REST.
+    """
+    channels = {user_channel(payload["sub"]), role_channel(payload.get("role", ""))}
+    return StreamingResponse(
+        _stream(request, channels, last_event_id, payload["sub"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
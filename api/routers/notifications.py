@@ -0,0 +1,121 @@
+"""
+Notifications Router - inbox, unread counters, mark-read
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional, List
+from pydantic import BaseModel
+import logging
+
+from ..dependencies import verify_token
+from ..utils.database import supabase
+from ..utils.http_cache import conditional_get
+from ..utils.versions import bump_version
+from ..utils.events import event_bus, user_channel
+from ..utils.unread import unread_counters, load_unread_counts
+from ..utils.pagination import decode_cursor, keyset_filter, next_cursor
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api", tags=["notifications"])
+
+NOTIFICATION_COLUMNS = "id,user_id,type,title,message,metadata,status,created_at"
+
+@router.get("/notifications", dependencies=[Depends(conditional_get("notifications"))])
+def get_notifications(payload = Depends(verify_token)):
+    """
+    Get user notifications
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    try:
+        # Fetch notifications for this user or 'all'
+        # Assuming table 'notifications' has 'user_id' column
+        user_id = payload["sub"]
+
+        # Simple query for now
+        res = supabase.table("notifications").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(50).execute()
+        return {"data": res.data or []}
+    except Exception as e:
+        logger.error(f"Error loading notifications: {e}")
+        return {"data": []}
+
+@router.get("/notifications/unread-count")
+def unread_count(payload = Depends(verify_token)):
+    """
+    Unread notification count for the badge, by type
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    counts = unread_counters.get(payload["sub"], load_unread_counts)
+    return {"unread": sum(counts.values()), "by_type": counts}
+
+@router.get("/notifications/inbox", dependencies=[Depends(conditional_get("notifications"))])
+def notification_inbox(
+    payload = Depends(verify_token),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None)
+):
+    """
+    Paginated inbox, newest first. Pass `next_cursor` back as `cursor`.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    q = supabase.table("notifications").select(NOTIFICATION_COLUMNS).eq("user_id", payload["sub"])
+    if type: q = q.eq("type", type)
+    if status: q = q.eq("status", status)
+    if cursor:
+        try:
+            created_at, row_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        q = q.or_(keyset_filter(created_at, row_id))
+
+    try:
+        res = q.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        rows = res.data or []
+        counts = unread_counters.get(payload["sub"], load_unread_counts)
+        return {"data": rows, "next_cursor": next_cursor(rows, limit), "unread": sum(counts.values())}
+    except Exception as e:
+        logger.error(f"Error loading inbox: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+class MarkReadRequest(BaseModel):
+    ids: Optional[List[str]] = None
+    all: bool = False
+    type: Optional[str] = None
+
+def _after_marked_read(updated: List[dict], user_id: str) -> None:
+    """Counters, versions and push for notifications just marked read"""
+    for n in updated:
+        unread_counters.adjust(user_id, n.get("type", ""), -1)
+    if updated:
+        bump_version("notifications")
+        event_bus.publish([user_channel(user_id)], "notifications_read", {"ids": [n["id"] for n in updated]})
+
+@router.post("/notifications/mark-read")
+def mark_read(req: MarkReadRequest, payload = Depends(verify_token)):
+    """
+    Bulk mark notifications read: a list of ids, or `all` (optionally one type)
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    if not req.ids and not req.all:
+        raise HTTPException(status_code=400, detail="ids or all required")
+
+    user_id = payload["sub"]
+    try:
+        q = supabase.table("notifications").update({"status": "read"}).eq("user_id", user_id).eq("status", "unread")
+        if req.ids: q = q.in_("id", req.ids)
+        if req.type: q = q.eq("type", req.type)
+        res = q.execute()
+        updated = res.data or []
+        _after_marked_read(updated, user_id)
+
+        return {"message": "Notifications marked read", "count": len(updated)}
+    except Exception as e:
+        logger.error(f"Mark read error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
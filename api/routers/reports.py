@@ -10,6 +10,12 @@ import logging
 from ..models import DailyReport
 from ..dependencies import verify_token, require_manager
 from ..utils.database import supabase
+from ..utils.http_cache import conditional_get
+from ..utils.cache import cached_read
+from ..utils.versions import bump_version
+from ..utils.events import event_bus, user_channel
+from ..utils.unread import unread_counters
+from ..utils.user_directory import user_directory
 from ..config import settings
 
 logger = logging.getLogger(__name__)
@@ -18,16 +24,10 @@ logger = logging.getLogger(__name__)
 # we'll use a base prefix /api and specify full paths or sub-prefixes.
 router = APIRouter(prefix="/api", tags=["reports"])
 
-@router.post("/daily-report")
-def submit_report(report: DailyReport, payload = Depends(verify_token)):
-    """
-    Submit a daily work report
-    """
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Database not configured")
-    
-    data = {
-        "employee_id": payload["sub"],
+def _report_row(report: DailyReport, employee_id: str) -> dict:
+    """daily_reports row for a submitted report"""
+    return {
+        "employee_id": employee_id,
         "date": datetime.utcnow().date().isoformat(),
         "tasks": "",
         # Duplicate key metrics to top-level for schema compatibility
@@ -53,12 +53,9 @@ def submit_report(report: DailyReport, payload = Depends(verify_token)):
         },
         "created_at": datetime.utcnow().isoformat()
     }
-    
-    logger.info(f"Submitting daily report for {payload['sub']}: {data}")
-    result = supabase.table("daily_reports").insert(data).execute()
-    logger.info(f"Daily report inserted successfully: {result.data}")
-    
-    # Check for repeated names in call logs (3+ days)
+
+def _flag_repeated_contacts(report: DailyReport, employee_id: str) -> None:
+    """Notify managers when a contacted name appears in 3+ reports from the last 3 days"""
     all_names = []
     if report.ta_calls_to:
         all_names.extend([n.strip() for n in report.ta_calls_to.split(',') if n.strip()])
@@ -70,7 +67,7 @@ def submit_report(report: DailyReport, payload = Depends(verify_token)):
     if all_names:
         three_days_ago = (datetime.utcnow() - timedelta(days=3)).isoformat()
         for name in set(all_names):
-            past_reports = supabase.table("daily_reports").select("id,date,metrics").eq("employee_id", payload["sub"]).gte("created_at", three_days_ago).execute()
+            past_reports = supabase.table("daily_reports").select("id,date,metrics").eq("employee_id", employee_id).gte("created_at", three_days_ago).execute()
             count = 0
             for r in past_reports.data:
                 m = r.get("metrics", {})
@@ -80,32 +77,54 @@ def submit_report(report: DailyReport, payload = Depends(verify_token)):
                 # Create notification for manager
                 # Create notification for all managers
                 try:
-                    managers_res = supabase.table("users").select("id").eq("role", "manager").execute()
-                    managers = managers_res.data or []
+                    managers = user_directory.ids_by_role("manager")
                     
                     notifications = []
-                    for mgr in managers:
+                    for mgr_id in managers:
                         notifications.append({
-                            "user_id": mgr["id"],
+                            "user_id": mgr_id,
                             "type": "repeated_contact",
                             "title": f"Repeated Contact: {name}",
-                            "message": f"Employee {payload['sub']} has contacted {name} for 3+ consecutive days",
-                            "metadata": {"employee_id": payload["sub"], "contact_name": name, "count": count},
+                            "message": f"Employee {employee_id} has contacted {name} for 3+ consecutive days",
+                            "metadata": {"employee_id": employee_id, "contact_name": name, "count": count},
                             "created_at": datetime.utcnow().isoformat()
                         })
                     
                     if notifications:
-                        supabase.table("notifications").insert(notifications).execute()
+                        nres = supabase.table("notifications").insert(notifications).execute()
+                        bump_version("notifications")
+                        unread_counters.on_inserted(nres.data or [])
+                        for n in nres.data or []:
+                            event_bus.publish([user_channel(n["user_id"])], "report_flag", n)
                         logger.info(f"Repeated contact notification sent to {len(notifications)} managers for {name}")
 
                 except Exception as notify_error:
                     logger.error(f"Failed to send manager notifications: {notify_error}")
                 logger.info(f"Repeated contact notification created for {name}")
+
+@router.post("/daily-report")
+def submit_report(report: DailyReport, payload = Depends(verify_token)):
+    """
+    Submit a daily work report
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    data = _report_row(report, payload["sub"])
+    
+    logger.info(f"Submitting daily report for {payload['sub']}: {data}")
+    result = supabase.table("daily_reports").insert(data).execute()
+    bump_version("daily_reports")
+    logger.info(f"Daily report inserted successfully: {result.data}")
+    
+    # Check for repeated names in call logs (3+ days)
+    _flag_repeated_contacts(report, payload["sub"])
     
     return {"message": "Report submitted", "id": (result.data and result.data[0].get("id"))}
 
 
-@router.get("/daily-reports")
+@router.get("/daily-reports", dependencies=[Depends(conditional_get("daily_reports", "users"))])
+@cached_read("daily_reports", "daily_reports", "users")
 def get_reports(payload = Depends(verify_token), employee_id: Optional[str] = Query(None)):
     """
     Get list of daily reports
@@ -121,19 +140,12 @@ def get_reports(payload = Depends(verify_token), employee_id: Optional[str] = Qu
         result = query.order("created_at", desc=True).limit(100).execute()
         logger.info(f"Daily reports query returned {len(result.data or [])} records")
         
-        # Get employee names
-        emp_ids = list(set([r["employee_id"] for r in result.data or []]))
-        emp_names = {}
-        if emp_ids:
-            users_res = supabase.table("users").select("id,name").in_("id", emp_ids).execute()
-            emp_names = {u["id"]: u["name"] for u in users_res.data or []}
-        
         data = []
         for r in result.data or []:
             data.append({
                 "id": r["id"],
                 "employee_id": r["employee_id"],
-                "employee_name": emp_names.get(r["employee_id"], "Unknown"),
+                "employee_name": user_directory.name(r["employee_id"]) or "Unknown",
                 "metrics": r.get("metrics", {}),
                 "date": r["date"],
                 "submitted_at": r["created_at"]
@@ -142,7 +154,7 @@ def get_reports(payload = Depends(verify_token), employee_id: Optional[str] = Qu
         return {"data": data, "total": len(data)}
     except Exception as e:
         logger.error(f"Error loading daily reports: {e}")
-        return {"data": [], "total": 0}
+        return {"data": [], "total": 0, "error": str(e)}
 
 @router.post("/daily-report/draft")
 def save_report_draft(report: DailyReport, payload = Depends(verify_token)):
@@ -169,7 +181,10 @@ def get_report_draft(payload = Depends(verify_token)):
     # Return empty if no persistence
     return {"data": None}
 
-@router.get("/manager/report-flags")
+@router.get(
+    "/manager/report-flags",
+    dependencies=[Depends(conditional_get("notifications", "users", auth=require_manager))]
+)
 def report_flags(payload = Depends(require_manager)):
     """
     Get flags for repeated contacts from notifications
@@ -178,38 +193,21 @@ def report_flags(payload = Depends(require_manager)):
         raise HTTPException(status_code=503, detail="Database not configured")
         
     try:
-        # Fetch unread repeated_contact notifications for manager
-        # We need to filter by metrics in the metadata field or rely on 'type' column if we set it
-        # Based on submit_report, type="repeated_contact", user_id="manager"
-        
-        # Note: Supabase JS/Python client syntax for JSON contains filtering might be tricky in python client depending on version
-        # But we can filter in python for now if volume is low, or use exact match on type
+        # Unread repeated_contact notifications for THIS manager; employee names
+        # come from the user directory
+        res = supabase.table("notifications").select("id,metadata,created_at").eq("user_id", payload["sub"]).eq("type", "repeated_contact").eq("status", "unread").order("created_at", desc=True).execute()
         
-        # Fetch unread repeated_contact notifications for THIS manager
-        res = supabase.table("notifications").select("*").eq("user_id", payload["sub"]).eq("type", "repeated_contact").eq("is_read", "false").order("created_at", desc=True).execute()
-        
-        notifications = res.data or []
         flags = []
-        
-        if notifications:
-            # Prefetch employee names to avoid N+1
-            emp_ids = list(set([n.get("metadata", {}).get("employee_id") for n in notifications if n.get("metadata", {}).get("employee_id")]))
-            emp_names = {}
-            if emp_ids:
-                users_res = supabase.table("users").select("id,name").in_("id", emp_ids).execute()
-                emp_names = {u["id"]: u["name"] for u in users_res.data or []}
-
-            for n in notifications:
-                meta = n.get("metadata", {})
-                emp_id = meta.get("employee_id")
-                flags.append({
-                    "id": n["id"], # Notification ID for dismissal
-                    "employee_id": emp_id,
-                    "employee_name": emp_names.get(emp_id, "Unknown"),
-                    "name": meta.get("contact_name", "Unknown Client"),
-                    "count": meta.get("count", 0),
-                    "date": n["created_at"]
-                })
+        for n in res.data or []:
+            meta = n.get("metadata") or {}
+            flags.append({
+                "id": n["id"], # Notification ID for dismissal
+                "employee_id": meta.get("employee_id"),
+                "employee_name": user_directory.name(meta.get("employee_id")) or "Unknown",
+                "name": meta.get("contact_name", "Unknown Client"),
+                "count": meta.get("count", 0),
+                "date": n["created_at"]
+            })
                 
         return {"data": flags}
     except Exception as e:
@@ -230,9 +228,13 @@ def dismiss_flag(req: DismissFlagRequest, payload = Depends(require_manager)):
         
     try:
         # Verify it's a manager notification (optional security check)
-        # Just update is_read = true
+        # Mark read via the schema's status column
         # Verify it's a manager notification for this user
-        res = supabase.table("notifications").update({"is_read": True}).eq("id", req.notification_id).eq("user_id", payload["sub"]).execute()
+        res = supabase.table("notifications").update({"status": "read"}).eq("id", req.notification_id).eq("user_id", payload["sub"]).eq("status", "unread").execute()
+        bump_version("notifications")
+        for n in res.data or []:
+            unread_counters.adjust(payload["sub"], n.get("type", ""), -1)
+        event_bus.publish([user_channel(payload["sub"])], "report_flag_dismissed", {"id": req.notification_id})
         
         return {"message": "Flag dismissed"}
     except Exception as e:
@@ -0,0 +1,168 @@
+"""
+Sync Router - delta sync and change versions for long-lived clients
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional, Dict, List, Tuple
+from datetime import datetime, timedelta
+import base64
+import json
+import logging
+
+from ..dependencies import verify_token
+from ..utils.database import supabase
+from ..utils.client_status import classify_client, parse_datetime
+from ..utils.pagination import keyset_filter
+from ..utils.responses import FastJSONResponse
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api", tags=["sync"])
+
+# ============================================================================
+# Streams
+# ============================================================================
+
+# Each stream is read in (column, id) order from its position in the cursor.
+# name -> (table, order column, owner column applied for employees)
+STREAMS = {
+    "clients": ("clients", "updated_at", "assigned_employee_id"),
+    "activities": ("activity_logs", "updated_at", "employee_id"),
+    "notifications": ("notifications", "updated_at", "user_id"),
+    # Clients reassigned away from an employee, sent to them as removals
+    "reassigned": ("client_assignment_history", "created_at", "assigned_from_employee_id"),
+}
+
+def _streams_for(role: str) -> List[str]:
+    if role == "employee":
+        return list(STREAMS)
+    return [name for name in STREAMS if name != "reassigned"]
+
+# ============================================================================
+# Cursor
+# ============================================================================
+
+# Position per stream: [timestamp, id] mid-backlog, or [timestamp, ""] once
+# the stream was caught up. A caught-up position is re-read from
+# SYNC_OVERLAP_SECONDS earlier, so rows committed late with an older
+# timestamp are still delivered; clients apply rows idempotently by id.
+
+def encode_sync_cursor(positions: Dict[str, Tuple[str, str]]) -> str:
+    raw = json.dumps(positions, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_sync_cursor(cursor: str) -> Dict[str, Tuple[str, str]]:
+    """Inverse of encode_sync_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        positions = json.loads(base64.urlsafe_b64decode(padded).decode("utf-8"))
+        return {name: (str(ts), str(row_id)) for name, (ts, row_id) in positions.items() if name in STREAMS}
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _read_stream(name: str, payload: dict, position: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+    table, column, owner = STREAMS[name]
+    query = supabase.table(table).select("*")
+    if payload["role"] == "employee" or name in ("notifications", "reassigned"):
+        query = query.eq(owner, payload["sub"])
+    if position:
+        ts, row_id = position
+        if row_id:
+            query = query.or_(keyset_filter(ts, row_id, column=column, desc=False))
+        else:
+            since = parse_datetime(ts)
+            if since is None:
+                raise ValueError("Invalid cursor")
+            query = query.gte(column, (since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)).isoformat())
+    return query.order(column).order("id").limit(limit).execute().data or []
+
+# ============================================================================
+# Endpoint
+# ============================================================================
+
+@router.get("/sync")
+def sync(
+    payload = Depends(verify_token),
+    since: Optional[str] = Query(None, description="Cursor from the previous sync; omit for a full load"),
+    limit: int = Query(500, ge=1, le=2000, description="Max rows per stream")
+):
+    """
+    Clients, activities and notifications changed since the cursor.
+    Deleted (or, for employees, reassigned) clients are returned as ids in
+    `clients.deleted`. While `has_more` is true, call again with `cursor`
+    straight away; otherwise keep `cursor` for the next sync.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    try:
+        positions = decode_sync_cursor(since) if since else {}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        rows = {}
+        for name in _streams_for(payload["role"]):
+            rows[name] = _read_stream(name, payload, positions.get(name), limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"SYNC: failed for {payload['sub']}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    has_more = False
+    next_positions = dict(positions)
+    for name, page in rows.items():
+        if not page:
+            continue
+        column = STREAMS[name][1]
+        last = page[-1]
+        if len(page) >= limit:
+            has_more = True
+            next_positions[name] = (last[column], last["id"])
+        else:
+            next_positions[name] = (last[column], "")
+
+    now = datetime.utcnow()
+    upserted, deleted = [], []
+    for c in rows["clients"]:
+        if c.get("deleted_at"):
+            deleted.append(c["id"])
+        else:
+            upserted.append(classify_client(c, now))
+    live_ids = {c["id"] for c in upserted}
+    for h in rows.get("reassigned", []):
+        if h.get("client_id") and h.get("assigned_to_employee_id") != payload["sub"] and h["client_id"] not in live_ids:
+            deleted.append(h["client_id"])
+
+    return FastJSONResponse({
+        "clients": {"upserted": upserted, "deleted": list(dict.fromkeys(deleted))},
+        "activities": {"upserted": rows["activities"]},
+        "notifications": {"upserted": rows["notifications"]},
+        "cursor": encode_sync_cursor(next_positions),
+        "has_more": has_more
+    })
+
+# ============================================================================
+# Change Versions
+# ============================================================================
+
+@router.get("/changes/versions")
+def change_versions(payload = Depends(verify_token)):
+    """
+    Version per tracked table, advanced in commit order (migration 014). A
+    cache entry, ETag or sync cursor taken at these versions is still fresh
+    while they are unchanged.
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    try:
+        rows = supabase.rpc("table_change_versions", {}).execute().data or []
+    except Exception as e:
+        logger.error(f"CHANGE_VERSIONS: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return FastJSONResponse(
+        {"versions": {r["table_name"]: r["version"] for r in rows}},
+        headers={"Cache-Control": "no-store"}
+    )
@@ -6,10 +6,16 @@ from typing import Optional, List
 from datetime import datetime
 import logging
 import math
+from concurrent.futures import ThreadPoolExecutor
 
 from ..models import EmployeeCreate
 from ..dependencies import verify_token, require_manager, require_admin
 from ..utils.database import supabase
+from ..utils.versions import bump_version
+from ..utils.cache import cached_read
+from ..utils.http_cache import conditional_get
+from ..utils.client_status import classify_client, parse_datetime
+from ..utils.unread import unread_counters, load_unread_counts
 from ..utils import hash_password
 from ..config import settings
 
@@ -58,6 +64,7 @@ def create_employee(emp: EmployeeCreate, payload = Depends(require_manager)):
         }
         
         result = supabase.table("users").insert(data).execute()
+        bump_version("users")
         logger.info(f"Employee created: {result.data}")
         return {"message": "Employee created", "data": result.data[0] if result.data else None}
     except HTTPException:
@@ -98,6 +105,7 @@ def update_user(user_id: str, user_update: dict, payload = Depends(require_manag
              raise HTTPException(status_code=400, detail="No valid fields to update")
              
         result = supabase.table("users").update(data).eq("id", user_id).execute()
+        bump_version("users")
         logger.info(f"User updated: {user_id}")
         return {"message": "User updated", "data": result.data[0]}
     except HTTPException:
@@ -120,6 +128,7 @@ def delete_user(user_id: str, payload = Depends(require_manager)):
     
     try:
         result = supabase.table("users").delete().eq("id", user_id).execute()
+        bump_version("users", "clients")
         logger.info(f"User deleted: {user_id}")
         return {"message": "User deleted successfully"}
     except Exception as e:
@@ -127,42 +136,17 @@ def delete_user(user_id: str, payload = Depends(require_manager)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/employee/stats")
-def employee_stats(payload = Depends(verify_token)):
-    """
-    Get stats for the currently logged in employee
-    """
-    if payload["role"] != "employee":
-        raise HTTPException(status_code=403, detail="Employee access only")
-    
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Database not configured")
-    
-    # Production mode - use Supabase
-    result = supabase.table("clients").select("*").eq("assigned_employee_id", payload["sub"]).execute()
-    clients = result.data or []
-    total = len(clients)
-    
-    def parse_dt(s):
-        try:
-            if isinstance(s, str):
-                dt = datetime.fromisoformat(s.replace("Z", "+00:00")) if "+" in s or "Z" in s else datetime.fromisoformat(s)
-                return dt.replace(tzinfo=None) if dt.tzinfo else dt
-            return s
-        except Exception:
-            return None
-    
+def _status_counts(clients: List[dict]) -> dict:
+    """Recency buckets for the employee dashboard cards"""
     good_count = 0
     due_soon_count = 0
     overdue_count = 0
     
     for c in clients:
-        lcd = c.get("last_contact_date")
         days = 999
-        if lcd:
-            dt = parse_dt(lcd)
-            if dt:
-                days = max(0, int((datetime.utcnow() - dt).total_seconds() / 86400))
+        dt = parse_datetime(c.get("last_contact_date"))
+        if dt:
+            days = max(0, int((datetime.utcnow() - dt).total_seconds() / 86400))
         
         if days <= 7:
             good_count += 1
@@ -172,12 +156,134 @@ def employee_stats(payload = Depends(verify_token)):
             overdue_count += 1
     
     return {
-        "total_clients": total,
+        "total_clients": len(clients),
         "good_clients": good_count,
         "due_soon_clients": due_soon_count,
         "overdue_clients": overdue_count
     }
 
+@router.get("/employee/stats")
+@cached_read("employee_stats", "clients")
+def employee_stats(payload = Depends(verify_token)):
+    """
+    Get stats for the currently logged in employee
+    """
+    if payload["role"] != "employee":
+        raise HTTPException(status_code=403, detail="Employee access only")
+    
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    # Production mode - use Supabase; only the recency column is needed to count
+    result = supabase.table("clients").select("last_contact_date").eq("assigned_employee_id", payload["sub"]).is_("deleted_at", "null").execute()
+    return _status_counts(result.data or [])
+
+# ============================================================================
+# Employee Home
+# ============================================================================
+
+HOME_CLIENT_COLUMNS = "id,name,member_id,city,contact_phone,expiry_date,last_contact_date"
+HOME_NOTIFICATION_COLUMNS = "id,type,title,message,metadata,status,created_at"
+HOME_ACTIVITY_COLUMNS = "id,client_id,category,outcome,notes,created_at"
+
+# The home sections are independent queries and run concurrently
+_home_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="employee-home")
+
+@router.get(
+    "/employee/home",
+    dependencies=[Depends(conditional_get("clients", "notifications", "activity_logs"))]
+)
+@cached_read("employee_home", "clients", "notifications", "activity_logs")
+def employee_home(
+    payload = Depends(verify_token),
+    limit: int = Query(25, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    notifications_limit: int = Query(10, ge=0, le=50),
+    activities_limit: int = Query(10, ge=0, le=50)
+):
+    """
+    Everything the employee dashboard needs for first paint in one response:
+    status counts, a page of the worklist (least recently contacted first),
+    unread notifications and recent activities
+    """
+    if payload["role"] != "employee":
+        raise HTTPException(status_code=403, detail="Employee access only")
+    
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    
+    user_id = payload["sub"]
+    
+    def load_counts():
+        res = supabase.table("clients").select("last_contact_date").eq("assigned_employee_id", user_id).is_("deleted_at", "null").execute()
+        return _status_counts(res.data or [])
+    
+    def load_worklist():
+        res = supabase.table("clients").select(HOME_CLIENT_COLUMNS) \
+            .eq("assigned_employee_id", user_id).is_("deleted_at", "null") \
+            .order("last_contact_date", desc=False, nullsfirst=True) \
+            .order("id") \
+            .range(offset, offset + limit - 1).execute()
+        now = datetime.utcnow()
+        return [classify_client(c, now) for c in res.data or []]
+    
+    def load_notifications():
+        if notifications_limit == 0:
+            return []
+        res = supabase.table("notifications").select(HOME_NOTIFICATION_COLUMNS) \
+            .eq("user_id", user_id).eq("status", "unread") \
+            .order("created_at", desc=True).limit(notifications_limit).execute()
+        return res.data or []
+    
+    def load_unread():
+        return unread_counters.get(user_id, load_unread_counts)
+    
+    def load_activities():
+        if activities_limit == 0:
+            return []
+        res = supabase.table("activity_logs").select(HOME_ACTIVITY_COLUMNS) \
+            .eq("employee_id", user_id) \
+            .order("created_at", desc=True).limit(activities_limit).execute()
+        data = res.data or []
+        client_ids = list({a["client_id"] for a in data if a.get("client_id")})
+        if client_ids:
+            cres = supabase.table("clients").select("id,name").in_("id", client_ids).execute()
+            cmap = {c["id"]: c["name"] for c in cres.data or []}
+            for a in data:
+                a["client_name"] = cmap.get(a.get("client_id"), "Unknown Client")
+        return data
+    
+    try:
+        futures = {
+            "stats": _home_executor.submit(load_counts),
+            "worklist": _home_executor.submit(load_worklist),
+            "notifications": _home_executor.submit(load_notifications),
+            "unread": _home_executor.submit(load_unread),
+            "activities": _home_executor.submit(load_activities),
+        }
+        results = {name: future.result() for name, future in futures.items()}
+    except Exception as e:
+        logger.error(f"Error loading employee home: {e}")
+        return {
+            "stats": _status_counts([]),
+            "worklist": {"data": [], "limit": limit, "offset": offset},
+            "notifications": {"data": [], "unread": 0},
+            "activities": {"data": []},
+            "error": str(e)
+        }
+    
+    return {
+        "stats": results["stats"],
+        "worklist": {
+            "data": results["worklist"],
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(results["worklist"]) == limit
+        },
+        "notifications": {"data": results["notifications"], "unread": sum(results["unread"].values())},
+        "activities": {"data": results["activities"]}
+    }
+
 @router.get("/debug/employee-clients/{employee_id}")
 def debug_employee_clients(employee_id: str, payload = Depends(verify_token)):
     """
@@ -193,23 +299,3 @@ def debug_employee_clients(employee_id: str, payload = Depends(verify_token)):
         "total_clients": len(clients),
         "clients": clients
     }
-
-@router.get("/notifications")
-def get_notifications(payload = Depends(verify_token)):
-    """
-    Get user notifications
-    """
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Database not configured")
-        
-    try:
-        # Fetch notifications for this user or 'all'
-        # Assuming table 'notifications' has 'user_id' column
-        user_id = payload["sub"]
-        
-        # Simple query for now
-        res = supabase.table("notifications").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(50).execute()
-        return {"data": res.data or []}
-    except Exception as e:
-        logger.error(f"Error loading notifications: {e}")
-        return {"data": []}
@@ -5,6 +5,7 @@ import pytest
 from fastapi.testclient import TestClient
 from typing import Generator
 import os
+from postgrest.exceptions import APIError
 
 # Set test environment
 os.environ["APP_ENV"] = "test"
@@ -14,6 +15,222 @@ os.environ["JWT_SECRET"] = "test-secret-key-for-pytest-only"
 from ..main import app
 from ..utils.security import create_token, hash_password
 
+# ============================================================================
+# Fake Supabase
+# ============================================================================
+
+class FakeResult:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class FakeCall:
+    """One executed statement: table, op, {column: value} filters, payload, selected columns"""
+
+    def __init__(self, table, op, filters, payload, columns=None):
+        self.table = table
+        self.op = op
+        self.filters = filters
+        self.payload = payload
+        self.columns = columns
+
+    def __repr__(self):
+        return f"FakeCall({self.table!r}, {self.op!r}, {self.filters!r})"
+
+def _matches(row: dict, op: str, column: str, value) -> bool:
+    current = row.get(column)
+    if op == "eq":
+        return str(current) == str(value)
+    if op == "neq":
+        return str(current) != str(value)
+    if op == "in":
+        return str(current) in {str(v) for v in value}
+    if op == "is":
+        return current is None if value == "null" else current is not None
+    if current is None:
+        return False
+    return {"lt": current < value, "lte": current <= value, "gt": current > value, "gte": current >= value}[op]
+
+class FakeQuery:
+    """Chainable PostgREST builder over FakeSupabase's in-memory tables"""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload = None
+        self.options = {}
+        self.filters = []
+        self.orders = []
+        self.row_limit = None
+        self.count = None
+        self.columns = None
+
+    def select(self, columns="*", count=None, **kwargs):
+        self.columns = columns
+        self.count = count
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.op, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict="id", ignore_duplicates=False, **kwargs):
+        self.op, self.payload = "upsert", rows
+        self.options = {"on_conflict": on_conflict, "ignore_duplicates": ignore_duplicates}
+        return self
+
+    def update(self, data, **kwargs):
+        self.op, self.payload = "update", data
+        return self
+
+    def delete(self, **kwargs):
+        self.op = "delete"
+        return self
+
+    def _filter(self, op, column, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def order(self, column, desc=False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n, **kwargs):
+        self.row_limit = n
+        return self
+
+    def __getattr__(self, name):
+        # or_, range, single, ...: accepted and ignored
+        return lambda *args, **kwargs: self
+
+    def _rows(self):
+        return [r for r in self.db.tables.setdefault(self.table, []) if all(_matches(r, *f) for f in self.filters)]
+
+    def execute(self):
+        self.db.calls.append(FakeCall(self.table, self.op, {c: v for _, c, v in self.filters}, self.payload, self.columns))
+        error = self.db.errors.get((self.table, self.op))
+        if error:
+            raise error
+        if not self.db.embedding and self.columns and "(" in self.columns:
+            raise APIError({"message": "Could not find a relationship", "code": "PGRST200"})
+        table = self.db.tables.setdefault(self.table, [])
+        if self.op == "select":
+            data = [dict(r) for r in self._rows()]
+            for column, desc in reversed(self.orders):
+                data.sort(key=lambda r: (r.get(column) is None, str(r.get(column))), reverse=desc)
+            total = len(data)
+            if self.row_limit is not None:
+                data = data[:self.row_limit]
+            return FakeResult(data, total if self.count else None)
+        if self.op == "update":
+            data = []
+            for r in self._rows():
+                r.update(self.payload)
+                if "change_seq" in r:
+                    # track_change trigger (migration 010)
+                    r["change_seq"] += 1
+                data.append(dict(r))
+            return FakeResult(data)
+        if self.op == "delete":
+            data = self._rows()
+            self.db.tables[self.table] = [r for r in table if r not in data]
+            return FakeResult(data)
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        conflict = [c.strip() for c in self.options.get("on_conflict", "id").split(",")]
+        data = []
+        for row in rows:
+            existing = next((r for r in table if all(str(r.get(c)) == str(row.get(c)) for c in conflict)), None) \
+                if self.op == "upsert" else None
+            if existing is not None:
+                if self.options["ignore_duplicates"]:
+                    continue
+                existing.update(row)
+                data.append(dict(existing))
+                continue
+            new = dict(row)
+            new.setdefault("id", f"{self.table}-{len(table) + 1}")
+            table.append(new)
+            data.append(dict(new))
+        return FakeResult(data)
+
+class FakeRpc:
+    def __init__(self, db, name, params):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.db.calls.append(FakeCall(f"rpc:{self.name}", "rpc", dict(self.params or {}), None))
+        error = self.db.errors.get((f"rpc:{self.name}", "rpc"))
+        if error:
+            raise error
+        result = self.db.rpcs.get(self.name, [])
+        return FakeResult(result(self.params or {}) if callable(result) else result)
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the Supabase client. Seed `tables`, set `rpcs`
+    (rows or a callable taking params) and `errors[(table, op)]`, then
+    check `calls` (or `calls_to(table, op)`). Embedded resources are not
+    joined: seed them on the row. With `embedding = False`, selects that
+    embed fail like PostgREST without the relationship.
+    """
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.tables = {}
+        self.rpcs = {}
+        self.errors = {}
+        self.calls = []
+        self.embedding = True
+
+    def install(self, *modules):
+        """Patch this client in as `supabase` on each module"""
+        for module in modules:
+            self.monkeypatch.setattr(module, "supabase", self)
+        return self
+
+    def seed(self, table, *rows):
+        self.tables.setdefault(table, []).extend(dict(r) for r in rows)
+        return self
+
+    def calls_to(self, table, op=None):
+        return [c for c in self.calls if c.table == table and (op is None or c.op == op)]
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
 @pytest.fixture(scope="session")
 def test_app():
     """
@@ -112,3 +329,10 @@ def auth_headers_admin(auth_token_admin):
     Authorization headers for admin
     """
     return {"Authorization": f"Bearer {auth_token_admin}"}
+
+@pytest.fixture(scope="function")
+def fake_supabase(monkeypatch):
+    """
+    Recording in-memory Supabase client; `.install(module, ...)` patches it in
+    """
+    return FakeSupabase(monkeypatch)
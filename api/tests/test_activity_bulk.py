@@ -0,0 +1,65 @@
+"""
+Tests for bulk activity ingestion with idempotency keys
+"""
+from ..routers import activities as activities_router
+
+class TestActivityBulk:
+    def test_dedupes_and_batches(self, client, auth_headers_employee, test_user, fake_supabase):
+        db = fake_supabase.install(activities_router).seed(
+            "activity_logs", {"id": "a-old", "employee_id": test_user["id"], "idempotency_key": "k-old"}
+        )
+        response = client.post("/api/activity-log/bulk", json={"activities": [
+            {"client_id": "c1", "outcome": "called", "idempotency_key": "k1", "occurred_at": "2026-01-01T09:00:00Z"},
+            {"client_id": "c1", "outcome": "called", "idempotency_key": "k2", "occurred_at": "2026-01-01T11:00:00Z"},
+            {"client_id": "c1", "outcome": "called", "idempotency_key": "k1"},
+            {"client_id": "c2", "outcome": "called", "idempotency_key": "k-old"},
+            {"client_id": "c2", "outcome": "called", "follow_up_required": True},
+        ]}, headers=auth_headers_employee)
+        assert response.status_code == 200
+        body = response.json()
+        assert [r["status"] for r in body["results"]] == ["created", "created", "duplicate", "duplicate", "error"]
+        assert body["results"][3]["id"] == "a-old"
+        assert (body["inserted"], body["duplicates"], body["failed"]) == (2, 2, 1)
+        # one insert for all new rows, one last_contact update for c1
+        assert len(db.calls_to("activity_logs", "upsert")) == 1
+        assert [c.payload["last_contact_date"] for c in db.calls_to("clients", "update")] == ["2026-01-01T11:00:00"]
+
+    def test_bad_date_is_a_per_item_error(self, client, auth_headers_employee, fake_supabase):
+        db = fake_supabase.install(activities_router)
+        response = client.post("/api/activity-log/bulk", json={"activities": [
+            {"client_id": "c1", "outcome": "called", "idempotency_key": "k1",
+             "follow_up_required": True, "follow_up_due_date": "31/01/2026"},
+            {"client_id": "c1", "outcome": "called", "idempotency_key": "k2",
+             "follow_up_required": True, "follow_up_due_date": "2026-01-31"},
+        ]}, headers=auth_headers_employee)
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == ["error", "created"]
+        assert [r["idempotency_key"] for r in db.calls_to("activity_logs", "upsert")[0].payload] == ["k2"]
+
+    def test_limit(self, client, auth_headers_employee, fake_supabase, monkeypatch):
+        fake_supabase.install(activities_router)
+        monkeypatch.setattr(activities_router.settings, "ACTIVITY_BULK_MAX", 1)
+        response = client.post("/api/activity-log/bulk", json={"activities": [
+            {"client_id": "c1", "outcome": "called"},
+            {"client_id": "c1", "outcome": "called"},
+        ]}, headers=auth_headers_employee)
+        assert response.status_code == 400
+
+class TestFollowUpDate:
+    def test_naive_date_is_utc(self, client, auth_headers_employee, fake_supabase):
+        db = fake_supabase.install(activities_router).seed("clients", {"id": "c1", "deleted_at": None})
+        response = client.post("/api/activity-log", json={
+            "client_id": "c1", "outcome": "called",
+            "follow_up_required": True, "follow_up_due_date": "2026-01-05T10:30",
+        }, headers=auth_headers_employee)
+        assert response.status_code == 200
+        assert db.calls_to("activity_logs", "insert")[0].payload["follow_up_due_at"] == "2026-01-05T10:30:00+00:00"
+
+    def test_bad_date_rejected(self, client, auth_headers_employee, fake_supabase):
+        db = fake_supabase.install(activities_router)
+        response = client.post("/api/activity-log", json={
+            "client_id": "c1", "outcome": "called",
+            "follow_up_required": True, "follow_up_due_date": "next tuesday",
+        }, headers=auth_headers_employee)
+        assert response.status_code == 400
+        assert db.calls_to("activity_logs", "insert") == []
@@ -2,8 +2,12 @@
 Tests for authentication endpoints
 """
 import pytest
+from collections import defaultdict, deque
 from fastapi import status
 
+from ..routers import auth as auth_router
+from ..utils import hash_password
+
 class TestHealthEndpoints:
     """Test health check endpoints"""
     
@@ -65,3 +69,17 @@ class TestRateLimiting:
         
         # If we get here, rate limiting didn't trigger (might need more attempts)
         pytest.skip("Rate limiting test requires more attempts")
+
+class TestLoginReadsDatabase:
+    """Login must see password and user changes made through any worker"""
+
+    def test_changed_password_applies_immediately(self, client, test_user, fake_supabase, monkeypatch):
+        monkeypatch.setattr(auth_router, "_login_attempts", defaultdict(deque))
+        db = fake_supabase.install(auth_router).seed("users", {
+            "id": test_user["id"], "name": test_user["name"], "email": test_user["email"],
+            "role": "employee", "password_hash": hash_password("OldPassword1!")
+        })
+        assert client.post("/api/auth/login", json={"email": test_user["email"], "password": "OldPassword1!"}).status_code == 200
+        db.tables["users"][0]["password_hash"] = hash_password("NewPassword1!")
+        assert client.post("/api/auth/login", json={"email": test_user["email"], "password": "OldPassword1!"}).status_code == 401
+        assert client.post("/api/auth/login", json={"email": test_user["email"], "password": "NewPassword1!"}).status_code == 200
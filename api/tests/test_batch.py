@@ -0,0 +1,125 @@
+"""
+Tests for the batch operations endpoint
+"""
+import pytest
+
+from ..routers import batch as batch_router
+from ..routers import notifications as notifications_router
+
+@pytest.fixture
+def db(fake_supabase, test_user):
+    return fake_supabase.install(batch_router, notifications_router).seed(
+        "notifications", {"id": "n1", "type": "follow_up", "user_id": test_user["id"], "status": "unread"}
+    )
+
+class TestBatch:
+    def test_requires_database(self, client, auth_headers_employee):
+        response = client.post("/api/batch", json={"operations": [{"op": "submit_report"}]}, headers=auth_headers_employee)
+        assert response.status_code == 503
+
+    def test_unknown_operation(self, client, auth_headers_employee, db):
+        response = client.post("/api/batch", json={"operations": [{"op": "drop_tables"}]}, headers=auth_headers_employee)
+        assert response.status_code == 400
+
+    def test_per_operation_results(self, client, auth_headers_employee, db):
+        response = client.post("/api/batch", json={"operations": [
+            {"op": "log_activity", "body": {"notes": "missing client_id and outcome"}},
+            {"op": "mark_notification_read", "body": {"ids": ["n1"]}},
+        ]}, headers=auth_headers_employee)
+        assert response.status_code == 200
+        body = response.json()
+        assert [r["status"] for r in body["results"]] == [422, 200]
+        assert body["results"][1]["data"]["count"] == 1
+        assert body["succeeded"] == 1 and body["failed"] == 1
+        assert "committed" not in body
+
+    def test_stop_on_error(self, client, auth_headers_employee, db):
+        response = client.post("/api/batch", json={"stop_on_error": True, "operations": [
+            {"op": "mark_notification_read", "body": {}},
+            {"op": "mark_notification_read", "body": {"ids": ["n1"]}},
+        ]}, headers=auth_headers_employee)
+        assert [r["status"] for r in response.json()["results"]] == [400, 424]
+
+    def test_transaction_needs_direct_connection(self, client, auth_headers_employee, db, monkeypatch):
+        def no_connection():
+            raise RuntimeError("DATABASE_URL not set")
+        monkeypatch.setattr(batch_router, "get_pg_connection", no_connection)
+        response = client.post("/api/batch", json={"transaction": True, "operations": [
+            {"op": "mark_notification_read", "body": {"all": True}},
+        ]}, headers=auth_headers_employee)
+        assert response.status_code == 503
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+
+    def fetchall(self):
+        return [{"id": "n1", "type": "follow_up"}]
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+        self.rolled_back = False
+        self.commit_error = None
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        if self.commit_error:
+            raise self.commit_error
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+class TestBatchTransaction:
+    def test_commits_all(self, client, auth_headers_employee, db, monkeypatch):
+        conn = FakeConnection()
+        monkeypatch.setattr(batch_router, "get_pg_connection", lambda: conn)
+        response = client.post("/api/batch", json={"transaction": True, "operations": [
+            {"op": "mark_notification_read", "body": {"ids": ["n1"]}},
+            {"op": "mark_notification_read", "body": {"all": True, "type": "follow_up"}},
+        ]}, headers=auth_headers_employee)
+        body = response.json()
+        assert body["committed"] is True and conn.committed
+        assert len(conn.statements) == 2
+
+    def test_failure_rolls_back_everything(self, client, auth_headers_employee, db, monkeypatch):
+        conn = FakeConnection()
+        monkeypatch.setattr(batch_router, "get_pg_connection", lambda: conn)
+        response = client.post("/api/batch", json={"transaction": True, "operations": [
+            {"op": "mark_notification_read", "body": {"all": True}},
+            {"op": "mark_notification_read", "body": {}},
+            {"op": "mark_notification_read", "body": {"all": True}},
+        ]}, headers=auth_headers_employee)
+        body = response.json()
+        assert body["committed"] is False
+        assert conn.rolled_back and not conn.committed
+        assert [r["status"] for r in body["results"]] == [424, 400, 424]
+
+    def test_commit_failure_rolls_back_everything(self, client, auth_headers_employee, db, monkeypatch):
+        conn = FakeConnection()
+        conn.commit_error = RuntimeError("could not serialize access")
+        monkeypatch.setattr(batch_router, "get_pg_connection", lambda: conn)
+        response = client.post("/api/batch", json={"transaction": True, "operations": [
+            {"op": "mark_notification_read", "body": {"ids": ["n1"]}},
+            {"op": "mark_notification_read", "body": {"all": True}},
+        ]}, headers=auth_headers_employee)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["committed"] is False and conn.rolled_back
+        assert [r["status"] for r in body["results"]] == [424, 424]
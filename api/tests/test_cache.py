@@ -0,0 +1,181 @@
+"""
+Tests for the read-through response cache
+"""
+import threading
+import time
+
+import pytest
+
+from ..config import settings
+from ..utils.cache import TTLCache, MISS, cached_read, app_cache
+from ..utils.versions import bump_version
+from ..utils.singleflight import SingleFlight, StaleWhileRevalidate
+
+class TestTTLCache:
+    """Test the LRU/TTL store"""
+
+    def test_get_set(self):
+        cache = TTLCache(max_entries=2)
+        assert cache.get("a") is MISS
+        cache.set("a", 1, ttl=60)
+        assert cache.get("a") == 1
+
+    def test_expired_entry_is_a_miss(self):
+        cache = TTLCache()
+        cache.set("a", 1, ttl=-1)
+        assert cache.get("a") is MISS
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is MISS
+        assert cache.get("a") == 1
+
+class TestCachedRead:
+    """Test version-keyed read-through caching"""
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, monkeypatch):
+        monkeypatch.setattr(settings, "CACHE_TTL_SECONDS", 60)
+        app_cache.clear()
+        yield
+        app_cache.clear()
+
+    def _handler(self, calls):
+        @cached_read("test_route", "test_table")
+        def handler(payload=None, page: int = 1):
+            calls.append(page)
+            return {"data": [page]}
+        return handler
+
+    def test_second_read_is_served_from_cache(self):
+        calls = []
+        handler = self._handler(calls)
+        payload = {"sub": "u1", "role": "manager"}
+        first = handler(payload=payload, page=1)
+        second = handler(payload=payload, page=1)
+        assert calls == [1]
+        assert first.body == second.body == b'{"data":[1]}'
+
+    def test_key_includes_subject_and_params(self):
+        calls = []
+        handler = self._handler(calls)
+        handler(payload={"sub": "u1", "role": "employee"}, page=1)
+        handler(payload={"sub": "u2", "role": "employee"}, page=1)
+        handler(payload={"sub": "u1", "role": "employee"}, page=2)
+        assert calls == [1, 1, 2]
+
+    def test_write_bumps_version_and_invalidates(self):
+        calls = []
+        handler = self._handler(calls)
+        payload = {"sub": "u1", "role": "manager"}
+        handler(payload=payload)
+        bump_version("test_table")
+        handler(payload=payload)
+        assert calls == [1, 1]
+
+    def test_error_payload_is_not_cached(self):
+        calls = []
+
+        @cached_read("failing_route", "test_table")
+        def handler(payload=None):
+            calls.append(1)
+            return {"data": [], "error": "db down"}
+
+        handler(payload={})
+        handler(payload={})
+        assert calls == [1, 1]
+
+    def test_disabled_when_ttl_is_zero(self, monkeypatch):
+        monkeypatch.setattr(settings, "CACHE_TTL_SECONDS", 0)
+        calls = []
+        handler = self._handler(calls)
+        result = handler(payload={}, page=1)
+        handler(payload={}, page=1)
+        assert calls == [1, 1]
+        assert result == {"data": [1]}
+
+class TestSharedCache:
+    """Test the SQLite shared tier"""
+
+    @pytest.fixture
+    def shared(self, tmp_path):
+        from ..utils.shared_cache import SharedCache
+        return SharedCache(str(tmp_path / "cache.sqlite3"), max_bytes=100)
+
+    def test_get_set_ttl(self, shared):
+        from ..utils.shared_cache import MISS as SHARED_MISS
+        shared.set("a", b"1", ttl=60)
+        shared.set("b", b"2", ttl=-1)
+        assert shared.get("a") == b"1"
+        assert shared.get("b") is SHARED_MISS
+
+    def test_size_bounded_eviction(self, shared):
+        from ..utils.shared_cache import MISS as SHARED_MISS
+        shared.set("old", b"x" * 60, ttl=60)
+        shared.set("new", b"y" * 60, ttl=60)
+        shared.evict()
+        assert shared.get("old") is SHARED_MISS
+        assert shared.get("new") == b"y" * 60
+
+    def test_versions_are_shared_between_handles(self, shared):
+        from ..utils.shared_cache import SharedCache
+        other = SharedCache(shared.path, max_bytes=100)
+        shared.bump_versions(["clients"])
+        shared.bump_versions(["clients", "users"])
+        assert other.get_versions(("clients", "users", "notifications")) == (2, 1, 0)
+
+    def test_broadcast_reaches_other_handle(self, shared):
+        from ..utils.shared_cache import SharedCache
+        other = SharedCache(shared.path, max_bytes=100)
+        received = []
+        other._handlers["invalidate"] = [received.append]
+        shared.broadcast("invalidate", "users")
+        other.poll()
+        assert received == ["users"]
+
+    def test_reset_starts_empty(self, shared):
+        from ..utils.shared_cache import SharedCache, MISS as SHARED_MISS
+        shared.set("a", b"1", ttl=60)
+        shared.bump_versions(["clients"])
+        # a new server opening the file left by the previous one
+        restarted = SharedCache(shared.path, max_bytes=100)
+        restarted.reset()
+        assert restarted.get("a") is SHARED_MISS
+        assert restarted.get_versions(("clients",)) == (0,)
+
+class TestSingleFlight:
+    """Test request coalescing and stale-while-revalidate"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return "rows"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("clients", fetch))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["rows"] * 5
+
+    def test_stale_value_served_while_refreshing(self):
+        swr = StaleWhileRevalidate(fresh_ttl=0, stale_ttl=60)
+        values = iter(["old", "new"])
+        assert swr.get("k", lambda: next(values)) == "old"
+        assert swr.get("k", lambda: next(values)) == "old"
+        swr._executor.shutdown(wait=True)
+        assert swr._entries["k"][1] == "new"
@@ -0,0 +1,67 @@
+"""
+Tests for bulk client PATCH
+"""
+import pytest
+
+from ..routers import clients as clients_router
+
+@pytest.fixture
+def db(fake_supabase):
+    return fake_supabase.install(clients_router).seed(
+        "clients", *({"id": cid, "city": "Delhi", "deleted_at": None} for cid in ("c1", "c2", "c3"))
+    )
+
+class TestBulkClientUpdate:
+    def test_groups_by_field_set(self, client, auth_headers_manager, db):
+        response = client.patch("/api/clients/bulk", json={"updates": [
+            {"id": "c1", "fields": {"city": "Pune"}},
+            {"id": "c2", "fields": {"city": "Pune", "status": "good"}},
+            {"id": "c3", "fields": {"expiry_date": "2027-01-01"}},
+            {"id": "c9", "fields": {"city": "Pune"}},
+            {"id": "c4", "fields": {"status": "good"}},
+        ]}, headers=auth_headers_manager)
+        assert response.status_code == 200
+        body = response.json()
+        # c1, c2 and c9 share one statement; c3 gets its own
+        updates = db.calls_to("clients", "update")
+        assert len(updates) == 2
+        assert (updates[0].payload, updates[0].filters["id"]) == ({"city": "Pune"}, ["c1", "c2", "c9"])
+        statuses = {r["id"]: r["status"] for r in body["results"]}
+        assert statuses == {"c1": "updated", "c2": "updated", "c3": "updated", "c9": "not_found", "c4": "error"}
+        assert body["ignored_fields"] == ["status"]
+
+    def test_filter_mode(self, client, auth_headers_manager, db):
+        response = client.patch("/api/clients/bulk", json={"filter": {"city": "Delhi"}, "fields": {"city": "Pune"}}, headers=auth_headers_manager)
+        assert response.json()["updated"] == 3
+        assert len(db.calls_to("clients", "update")) == 1
+
+    def test_requires_manager(self, client, auth_headers_employee):
+        response = client.patch("/api/clients/bulk", json={"updates": []}, headers=auth_headers_employee)
+        assert response.status_code == 403
+
+    def test_updates_or_filter(self, client, auth_headers_manager, db):
+        response = client.patch("/api/clients/bulk", json={"filter": {"city": "Pune"}, "updates": [{"id": "c1"}]}, headers=auth_headers_manager)
+        assert response.status_code == 400
+
+    def test_assignment_goes_through_bulk_assign(self, client, auth_headers_manager, db):
+        response = client.patch("/api/clients/bulk", json={"updates": [
+            {"id": "c1", "fields": {"city": "Pune"}},
+            {"id": "c2", "fields": {"assigned_employee_id": "emp-2"}},
+        ]}, headers=auth_headers_manager)
+        assert response.status_code == 400
+        assert not db.calls_to("clients", "update")
+
+class TestAssignDeletedClients:
+    def test_assign_deleted_client_is_not_found(self, client, auth_headers_manager, db):
+        db.tables["clients"][0]["deleted_at"] = "2026-01-01T00:00:00"
+        response = client.post("/api/clients/c1/assign", json={"employee_id": "emp-2"}, headers=auth_headers_manager)
+        assert response.status_code == 404
+        assert not db.calls_to("client_assignment_history", "insert")
+
+    def test_bulk_assign_reports_not_found(self, client, auth_headers_manager, db):
+        db.tables["clients"][1]["deleted_at"] = "2026-01-01T00:00:00"
+        response = client.post("/api/clients/bulk-assign", json={"client_ids": ["c1", "c2", "c9"], "employee_id": "emp-2"}, headers=auth_headers_manager)
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == ["updated", "not_found", "not_found"]
+        history = db.calls_to("client_assignment_history", "insert")[0].payload
+        assert [h["client_id"] for h in history] == ["c1"]
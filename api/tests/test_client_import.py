@@ -0,0 +1,89 @@
+"""
+Tests for duplicate detection on client create and CSV import
+"""
+import pytest
+
+from ..routers import clients as clients_router
+from ..utils import client_keys as client_keys_module
+from ..utils.client_keys import client_keys, normalize_member_id, normalize_email, normalize_phone
+
+EXISTING = {
+    "id": "c1", "name": "Acme", "member_id": "MEM001", "city": "Pune", "products_posted": 10,
+    "expiry_date": None, "contact_email": "ops@acme.in", "contact_phone": "+91-9876543210",
+    "member_key": "MEM001", "email_key": "ops@acme.in", "phone_key": "9876543210",
+}
+
+CSV = (
+    "name,member_id,city,products_posted,email,phone\n"
+    "Acme Ltd, mem 001,,25,,\n"
+    "Beta,,Delhi,5,beta@example.com,\n"
+    "Beta again,,Delhi,5,BETA@example.com ,\n"
+    "Gamma,,,,,98765-43210\n"
+)
+
+@pytest.fixture
+def db(fake_supabase):
+    return fake_supabase.install(clients_router, client_keys_module).seed("clients", dict(EXISTING, deleted_at=None))
+
+class TestNormalizedKeys:
+    def test_normalizers(self):
+        assert normalize_member_id(" mem 001") == "MEM001"
+        assert normalize_email(" Ops@Acme.IN ") == "ops@acme.in"
+        assert normalize_phone("+91-98765 43210") == normalize_phone("9876543210") == "9876543210"
+        assert normalize_phone("") is None
+        assert client_keys({"contact_phone": "000-000-0000"}) == []
+
+class TestClientImport:
+    def test_upsert_mode(self, client, auth_headers_manager, db):
+        response = client.post(
+            "/api/clients/bulk-import-csv",
+            files={"file": ("clients.csv", CSV, "text/csv")},
+            headers=auth_headers_manager
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["inserted"], body["updated"], body["skipped"]) == (1, 1, 2)
+        upsert, = db.calls_to("clients", "upsert")
+        # CSV values win, blanks keep what the client already has
+        assert upsert.payload == [dict(
+            {k: EXISTING[k] for k in clients_router.CSV_UPDATE_FIELDS}, id="c1", name="Acme Ltd", products_posted=25
+        )]
+        # one lookup per key kind for the whole file
+        assert len(db.calls_to("clients", "select")) == 3
+
+    def test_skip_and_insert_modes(self, client, auth_headers_manager, db):
+        response = client.post(
+            "/api/clients/bulk-import-csv?mode=skip",
+            files={"file": ("clients.csv", CSV, "text/csv")},
+            headers=auth_headers_manager
+        )
+        assert (response.json()["inserted"], response.json()["skipped"]) == (1, 3)
+        response = client.post(
+            "/api/clients/bulk-import-csv?mode=insert",
+            files={"file": ("clients.csv", CSV, "text/csv")},
+            headers=auth_headers_manager
+        )
+        assert response.json()["inserted"] == 4
+
+    def test_different_member_id_is_not_a_match(self, client, auth_headers_manager, db):
+        csv = "name,member_id,phone\nBeta Exports,MEM2,+91-9876543210\nGamma,MEM3,9876543210\n"
+        response = client.post(
+            "/api/clients/bulk-import-csv",
+            files={"file": ("clients.csv", csv, "text/csv")},
+            headers=auth_headers_manager
+        )
+        body = response.json()
+        assert (body["inserted"], body["updated"], body["skipped"]) == (2, 0, 0)
+        assert db.tables["clients"][0]["name"] == "Acme"
+        assert db.tables["clients"][0]["member_id"] == "MEM001"
+
+    def test_create_duplicate_member_id_conflicts(self, client, auth_headers_manager, db):
+        response = client.post("/api/clients", json={"name": "Acme", "member_id": "mem001"}, headers=auth_headers_manager)
+        assert response.status_code == 409
+        assert "c1" in response.json()["error"]["message"]
+        assert not db.calls_to("clients", "insert")
+
+    def test_create_shared_contact_is_a_warning(self, client, auth_headers_manager, db):
+        response = client.post("/api/clients", json={"name": "Acme Branch", "email": "OPS@acme.in"}, headers=auth_headers_manager)
+        assert response.status_code == 200
+        assert response.json()["warnings"] == [{"field": "email", "client_id": "c1"}]
@@ -0,0 +1,31 @@
+"""
+Tests for conditional client updates
+"""
+from ..routers import clients as clients_router
+
+def _install(fake_supabase, **row):
+    return fake_supabase.install(clients_router).seed(
+        "clients", dict({"id": "c1", "assigned_employee_id": "emp-1", "change_seq": 7, "deleted_at": None}, **row)
+    )
+
+class TestConditionalUpdate:
+    def test_single_round_trip_returns_version(self, client, auth_headers_manager, fake_supabase):
+        db = _install(fake_supabase)
+        response = client.patch("/api/clients/c1", json={"city": "Pune"}, headers={**auth_headers_manager, "If-Match": '"7"'})
+        assert response.status_code == 200
+        assert response.json()["version"] == 8
+        assert response.headers["etag"] == '"8"'
+        assert [c.op for c in db.calls] == ["update"]
+        assert db.calls[0].filters["change_seq"] == 7
+
+    def test_stale_version_is_rejected(self, client, auth_headers_manager, fake_supabase):
+        _install(fake_supabase, change_seq=9)
+        response = client.patch("/api/clients/c1", json={"city": "Pune"}, headers={**auth_headers_manager, "If-Match": '"7"'})
+        assert response.status_code == 412
+        assert response.headers["etag"] == '"9"'
+
+    def test_employee_ownership_is_in_the_filter(self, client, auth_headers_employee, fake_supabase):
+        db = _install(fake_supabase, assigned_employee_id="someone-else")
+        response = client.patch("/api/clients/c1", json={"city": "Pune"}, headers=auth_headers_employee)
+        assert response.status_code == 403
+        assert "assigned_employee_id" in db.calls[0].filters
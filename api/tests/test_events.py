@@ -0,0 +1,95 @@
+"""
+Tests for the in-process event bus behind /api/events/stream
+"""
+import asyncio
+
+from ..routers import events as events_router
+from ..utils.events import EventBus, user_channel, role_channel
+
+class TestEventBus:
+    """Test fan-out, replay and backpressure"""
+
+    def test_fan_out_by_channel(self):
+        async def scenario():
+            bus = EventBus()
+            alice = bus.subscribe({user_channel("alice")})
+            managers = bus.subscribe({role_channel("manager")})
+            bus.publish([user_channel("alice"), role_channel("manager")], "activity", {"n": 1})
+            bus.publish([user_channel("bob")], "notification", {"n": 2})
+            await asyncio.sleep(0)
+            got_alice = await alice.get(timeout=0.1)
+            got_manager = await managers.get(timeout=0.1)
+            assert got_alice.data == {"n": 1}
+            assert got_manager.type == "activity"
+            assert await alice.get(timeout=0.01) is None
+        asyncio.run(scenario())
+
+    def test_replay_after_last_event_id(self):
+        bus = EventBus()
+        first = bus.publish([user_channel("alice")], "notification", {"n": 1})
+        bus.publish([user_channel("bob")], "notification", {"n": 2})
+        third = bus.publish([user_channel("alice")], "notification", {"n": 3})
+        missed = bus.replay({user_channel("alice")}, first.id)
+        assert [e.id for e in missed] == [third.id]
+
+    def test_replay_unknown_epoch_requires_resync(self):
+        bus = EventBus()
+        bus.publish([user_channel("alice")], "notification", {})
+        assert bus.replay({user_channel("alice")}, "otherepoch-1") is None
+
+    def test_replay_evicted_requires_resync(self):
+        bus = EventBus(replay_size=2)
+        first = bus.publish([user_channel("alice")], "notification", {})
+        for _ in range(3):
+            bus.publish([user_channel("alice")], "notification", {})
+        assert bus.replay({user_channel("alice")}, first.id) is None
+
+    def test_slow_consumer_is_marked_lagging(self):
+        async def scenario():
+            bus = EventBus(queue_size=2)
+            sub = bus.subscribe({user_channel("alice")})
+            for i in range(5):
+                bus.publish([user_channel("alice")], "notification", {"n": i})
+            await asyncio.sleep(0)
+            assert sub.lagging
+        asyncio.run(scenario())
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+class TestEventStream:
+    """Replay and live delivery on one /api/events/stream connection"""
+
+    def test_event_published_during_replay_is_sent_once(self, monkeypatch):
+        async def scenario():
+            bus = EventBus()
+            monkeypatch.setattr(events_router, "event_bus", bus)
+            monkeypatch.setattr(events_router.settings, "SSE_HEARTBEAT_SECONDS", 0.01)
+            first = bus.publish([user_channel("alice")], "notification", {"n": 1})
+            replay = bus.replay
+
+            def replay_with_publish(channels, last_event_id):
+                # Lands in the subscription queue and in the replay buffer
+                bus.publish([user_channel("alice")], "notification", {"n": 2})
+                return replay(channels, last_event_id)
+            monkeypatch.setattr(bus, "replay", replay_with_publish)
+
+            request = FakeRequest()
+            stream = events_router._stream(request, {user_channel("alice")}, first.id, "alice")
+            # retry, replayed n=2, then heartbeats: the queued copy is skipped
+            chunks = [await stream.__anext__() for _ in range(4)]
+            assert sum(b'"n":2' in c for c in chunks) == 1
+            assert chunks[-1] == b": heartbeat\n\n"
+            await stream.aclose()
+            assert bus.subscriber_count == 0
+        asyncio.run(scenario())
+
+    def test_unstarted_stream_holds_no_subscription(self, monkeypatch):
+        bus = EventBus()
+        monkeypatch.setattr(events_router, "event_bus", bus)
+        events_router._stream(FakeRequest(), {user_channel("alice")}, None, "alice")
+        assert bus.subscriber_count == 0
@@ -0,0 +1,87 @@
+"""
+Tests for ETag / conditional GET handling
+"""
+import pytest
+from fastapi import status
+
+from starlette.datastructures import Headers
+
+from ..utils.http_cache import etag_matches, compute_etag
+from ..utils.static import StaticIndex
+from ..utils.versions import bump_version, get_versions
+
+class TestEtagHelpers:
+    """Test ETag comparison helpers"""
+
+    def test_etag_is_stable_for_same_payload(self):
+        assert compute_etag(b'{"data":[]}') == compute_etag(b'{"data":[]}')
+        assert compute_etag(b'{"data":[]}') != compute_etag(b'{"data":[1]}')
+
+    def test_etag_matches_list_and_weak(self):
+        etag = '"abc"'
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"zzz", W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"zzz"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_bump_version_is_monotonic(self):
+        before = get_versions("clients", "users")
+        bump_version("clients")
+        after = get_versions("clients", "users")
+        assert after[0] == before[0] + 1
+        assert after[1] == before[1]
+
+class TestConditionalGet:
+    """Test If-None-Match handling on polled endpoints"""
+
+    def test_list_clients_sets_etag(self, client, auth_headers_employee):
+        response = client.get("/api/clients", headers=auth_headers_employee)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"].startswith('"')
+        assert "no-cache" in response.headers["Cache-Control"]
+
+    def test_matching_etag_returns_304(self, client, auth_headers_employee):
+        first = client.get("/api/clients", headers=auth_headers_employee)
+        etag = first.headers["ETag"]
+        second = client.get("/api/clients", headers={**auth_headers_employee, "If-None-Match": etag})
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.headers["ETag"] == etag
+        assert second.content == b""
+
+    def test_304_after_write_revalidates_payload(self, client, auth_headers_employee):
+        etag = client.get("/api/clients", headers=auth_headers_employee).headers["ETag"]
+        bump_version("clients")
+        # Versions moved, so the handler runs again; the payload is unchanged
+        response = client.get("/api/clients", headers={**auth_headers_employee, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_stale_etag_returns_full_response(self, client, auth_headers_employee):
+        response = client.get("/api/clients", headers={**auth_headers_employee, "If-None-Match": '"stale"'})
+        assert response.status_code == status.HTTP_200_OK
+        assert "data" in response.json()
+
+    def test_manager_route_still_checks_role(self, client, auth_headers_employee):
+        response = client.get(
+            "/api/manager/alerts",
+            headers={**auth_headers_employee, "If-None-Match": "*"}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+class TestStaticVariants:
+    """Precompressed variants are separate representations"""
+
+    def test_each_encoding_has_its_own_etag(self, tmp_path):
+        (tmp_path / "app.js").write_text("console.log(1)")
+        (tmp_path / "app.js.gz").write_bytes(b"gz")
+        index = StaticIndex(str(tmp_path))
+        asset = index.lookup("app.js")
+
+        plain = index.response(asset, Headers({}))
+        gzipped = index.response(asset, Headers({"accept-encoding": "gzip"}))
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+
+        # A cached identity body does not validate the gzip representation
+        assert index.response(asset, Headers({"accept-encoding": "gzip", "if-none-match": plain.headers["etag"]})).status_code == 200
+        assert index.response(asset, Headers({"accept-encoding": "gzip", "if-none-match": gzipped.headers["etag"]})).status_code == 304
@@ -0,0 +1,109 @@
+"""
+Tests that enriched list endpoints make a single database round trip
+"""
+import pytest
+
+from ..routers import activities, reports
+from ..utils import loaders
+from ..utils import unread as unread_module
+from ..utils import user_directory as directory_module
+from ..utils.user_directory import user_directory
+from ..utils.versions import bump_version
+
+@pytest.fixture
+def db(fake_supabase, test_manager):
+    user_directory.invalidate()
+    yield fake_supabase.install(activities, reports, loaders, directory_module).seed(
+        "activity_logs", {"id": "a1", "client_id": "c1", "employee_id": "e1", "created_at": "2026-01-01T00:00:00"}
+    ).seed(
+        "clients", {"id": "c1", "name": "Acme"}
+    ).seed(
+        "daily_reports", {"id": "r1", "employee_id": "e1", "metrics": {}, "date": "2026-01-01", "created_at": "2026-01-01T00:00:00"}
+    ).seed(
+        "notifications", {
+            "id": "n1", "user_id": test_manager["id"], "type": "repeated_contact", "status": "unread",
+            "metadata": {"employee_id": "e1", "contact_name": "Acme", "count": 3}, "created_at": "2026-01-01T00:00:00",
+        }
+    ).seed(
+        "users",
+        {"id": "e1", "name": "Asha", "email": "asha@example.com", "role": "employee", "password_hash": "x"},
+        {"id": "m1", "name": "Ravi", "email": "ravi@example.com", "role": "manager", "password_hash": "y"},
+    )
+    user_directory.invalidate()
+
+class TestSingleRoundTrip:
+    """Name enrichment happens inside the primary query"""
+
+    def test_activity_feed(self, client, auth_headers_manager, db):
+        # PostgREST embeds the client through the foreign key
+        db.tables["activity_logs"][0]["clients"] = {"name": "Acme"}
+        response = client.get("/api/activity-feed", headers=auth_headers_manager)
+        assert response.status_code == 200
+        assert response.json()["data"][0]["client_name"] == "Acme"
+        assert len(db.calls) == 1
+
+    def test_daily_reports(self, client, auth_headers_manager, db):
+        user_directory.names()
+        db.calls.clear()
+        response = client.get("/api/daily-reports", headers=auth_headers_manager)
+        assert response.status_code == 200
+        assert response.json()["data"][0]["employee_name"] == "Asha"
+        assert len(db.calls) == 1
+
+    def test_report_flags(self, client, auth_headers_manager, db):
+        user_directory.names()
+        db.calls.clear()
+        response = client.get("/api/manager/report-flags", headers=auth_headers_manager)
+        assert response.status_code == 200
+        assert response.json()["data"][0]["employee_name"] == "Asha"
+        assert len(db.calls) == 1
+
+    def test_fallback_uses_one_batched_lookup(self, client, auth_headers_manager, db):
+        db.embedding = False
+        response = client.get("/api/activity-feed", headers=auth_headers_manager)
+        assert response.json()["data"][0]["client_name"] == "Acme"
+        # failed embedded select, plain select, one batched name lookup
+        assert [c.table for c in db.calls] == ["activity_logs", "activity_logs", "clients"]
+
+class TestUserDirectory:
+    """Users are loaded once and reloaded after a users write"""
+
+    def test_indexes(self, db):
+        assert user_directory.name("e1") == "Asha"
+        assert user_directory.ids_by_role("manager") == ["m1"]
+        assert user_directory.get("e1")["email"] == "asha@example.com"
+        # Credentials are never cached: login always reads the database
+        assert "password_hash" not in directory_module.DIRECTORY_COLUMNS
+
+    def test_loaded_once_until_users_change(self, db):
+        user_directory.name("e1")
+        user_directory.by_role("employee")
+        assert len(db.calls) == 1
+        bump_version("users")
+        user_directory.name("e1")
+        assert len(db.calls) == 2
+
+class TestUnreadCounts:
+    """Unread counts are grouped in the database, not counted row by row"""
+
+    def test_grouped_rpc(self, fake_supabase):
+        db = fake_supabase.install(unread_module)
+        db.rpcs["unread_notification_counts"] = [{"type": "follow_up", "count": 1200}, {"type": "reminder", "count": 3}]
+        assert unread_module.load_unread_counts("e1") == {"follow_up": 1200, "reminder": 3}
+        assert [c.table for c in db.calls] == ["rpc:unread_notification_counts"]
+
+    def test_load_racing_an_insert_is_not_cached(self):
+        counters = unread_module.UnreadCounters(ttl_seconds=60)
+        loads = []
+
+        def loader(user_id):
+            loads.append(user_id)
+            if len(loads) == 1:
+                # a notification lands between the query and the store
+                counters.adjust(user_id, "follow_up", 1)
+            return {"follow_up": len(loads)}
+
+        assert counters.get("e1", loader) == {"follow_up": 1}
+        assert counters.get("e1", loader) == {"follow_up": 2}
+        assert counters.get("e1", loader) == {"follow_up": 2}
+        assert len(loads) == 2
@@ -0,0 +1,46 @@
+"""
+Tests for the follow-up scheduler
+"""
+from datetime import datetime
+
+import pytest
+
+from ..utils import scheduler as scheduler_module
+from ..utils.scheduler import FollowUpScheduler, DueItem, FOLLOW_UP, leader_only
+
+@pytest.fixture
+def db(fake_supabase):
+    return fake_supabase.install(scheduler_module).seed(
+        "activity_logs", {"id": "a1", "client_id": "c1", "employee_id": "e1", "follow_up_notified_at": None}
+    )
+
+def _item():
+    return DueItem(datetime(2026, 1, 1, 9, 0), FOLLOW_UP, "a1", "e1")
+
+class TestFire:
+    def test_notifies_then_claims(self, db):
+        assert FollowUpScheduler(3600, 60, 30).fire(_item()) is True
+        notification, = db.tables["notifications"]
+        assert notification["metadata"]["client_id"] == "c1"
+        assert db.tables["activity_logs"][0]["follow_up_notified_at"] is not None
+
+    def test_failed_insert_leaves_item_pending(self, db):
+        db.errors[("notifications", "insert")] = RuntimeError("insert failed")
+        with pytest.raises(RuntimeError):
+            FollowUpScheduler(3600, 60, 30).fire(_item())
+        assert db.tables["activity_logs"][0]["follow_up_notified_at"] is None
+
+    def test_already_notified_is_skipped(self, db):
+        db.tables["activity_logs"][0]["follow_up_notified_at"] = "2026-01-01T09:00:00"
+        assert FollowUpScheduler(3600, 60, 30).fire(_item()) is False
+        assert not db.calls_to("notifications")
+
+class TestLeaderOnly:
+    def test_runs_only_while_holding_the_lease(self, db):
+        runs = []
+        task = leader_only("sweep", 600, lambda: runs.append(1))
+        db.rpcs["acquire_scheduler_lease"] = [True]
+        task()
+        db.rpcs["acquire_scheduler_lease"] = []
+        task()
+        assert runs == [1]
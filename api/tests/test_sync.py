@@ -0,0 +1,71 @@
+"""
+Tests for the delta sync endpoint
+"""
+import pytest
+
+from ..routers import sync as sync_router
+from ..routers import clients as clients_router
+from ..routers.sync import encode_sync_cursor, decode_sync_cursor
+
+class TestSyncCursor:
+    def test_round_trip(self):
+        positions = {"clients": ("2026-01-01T00:00:00+00:00", "c1"), "activities": ("2026-01-02T00:00:00+00:00", "")}
+        assert decode_sync_cursor(encode_sync_cursor(positions)) == positions
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            decode_sync_cursor("not-a-cursor")
+
+class TestSyncEndpoint:
+    def test_requires_database(self, client, auth_headers_employee):
+        response = client.get("/api/sync", headers=auth_headers_employee)
+        assert response.status_code == 503
+
+    def test_tombstones_and_cursor(self, client, auth_headers_manager, test_manager, fake_supabase):
+        ts = "2026-01-01T00:00:00+00:00"
+        fake_supabase.install(sync_router).seed(
+            "clients",
+            {"id": "c1", "name": "Acme", "updated_at": ts, "last_contact_date": None},
+            {"id": "c2", "name": "Gone", "updated_at": ts, "deleted_at": ts},
+        ).seed("notifications", {"id": "n1", "user_id": test_manager["id"], "updated_at": ts})
+        response = client.get("/api/sync", headers=auth_headers_manager)
+        assert response.status_code == 200
+        body = response.json()
+        assert [c["id"] for c in body["clients"]["upserted"]] == ["c1"]
+        assert body["clients"]["deleted"] == ["c2"]
+        assert [n["id"] for n in body["notifications"]["upserted"]] == ["n1"]
+        assert body["has_more"] is False
+        positions = decode_sync_cursor(body["cursor"])
+        assert positions["clients"] == (ts, "")
+        assert "activities" not in positions
+
+    def test_reassigned_client_is_removed_for_previous_owner(
+        self, client, auth_headers_employee, auth_headers_manager, test_user, fake_supabase
+    ):
+        ts = "2026-01-01T00:00:00+00:00"
+        db = fake_supabase.install(sync_router, clients_router).seed(
+            "clients", {"id": "c1", "name": "Acme", "assigned_employee_id": test_user["id"], "updated_at": ts}
+        )
+        response = client.post("/api/clients/c1/assign", json={"employee_id": "emp-2"}, headers=auth_headers_manager)
+        assert response.status_code == 200
+        history, = db.tables["client_assignment_history"]
+        assert history["assigned_from_employee_id"] == test_user["id"]
+
+        response = client.get("/api/sync", headers=auth_headers_employee)
+        assert response.json()["clients"] == {"upserted": [], "deleted": ["c1"]}
+
+    def test_invalid_cursor(self, client, auth_headers_manager, fake_supabase):
+        fake_supabase.install(sync_router)
+        response = client.get("/api/sync?since=bogus", headers=auth_headers_manager)
+        assert response.status_code == 400
+
+class TestChangeVersions:
+    def test_versions_by_table(self, client, auth_headers_employee, fake_supabase):
+        fake_supabase.install(sync_router).rpcs["table_change_versions"] = [
+            {"table_name": "clients", "version": 42},
+            {"table_name": "notifications", "version": 7},
+        ]
+        response = client.get("/api/changes/versions", headers=auth_headers_employee)
+        assert response.status_code == 200
+        assert response.json() == {"versions": {"clients": 42, "notifications": 7}}
+        assert response.headers["cache-control"] == "no-store"
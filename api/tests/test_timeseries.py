@@ -0,0 +1,34 @@
+"""
+Tests for time-bucketed analytics aggregation
+"""
+from datetime import datetime
+
+import numpy as np
+
+from ..utils.timeseries import bucket_edges, to_datetime64, aggregate, align
+
+class TestBuckets:
+    """Test bucket boundaries and aggregation"""
+
+    def test_day_edges_cover_window(self):
+        edges = bucket_edges(datetime(2026, 10, 1), datetime(2026, 10, 8), "day")
+        assert len(edges) == 8
+        assert str(edges[0]) == "2026-10-01T00:00:00"
+        assert str(edges[-1]) == "2026-10-08T00:00:00"
+
+    def test_week_and_month_edges_are_aligned(self):
+        weeks = bucket_edges(datetime(2026, 10, 1), datetime(2026, 10, 15), "week")
+        assert str(weeks[0]) == "2026-09-28T00:00:00"
+        months = bucket_edges(datetime(2026, 1, 15), datetime(2026, 3, 2), "month")
+        assert [str(m)[:10] for m in months] == ["2026-01-01", "2026-02-01", "2026-03-01", "2026-04-01"]
+
+    def test_aggregate_sums_by_group_and_bucket(self):
+        edges = bucket_edges(datetime(2026, 10, 1), datetime(2026, 10, 3), "day")
+        times = to_datetime64(["2026-10-01T09:00:00+00:00", "2026-10-02T10:00:00+00:00", "2026-10-02", "2026-10-05"])
+        keys, matrices = aggregate(times, ["a", "b", "a", "a"], {"count": np.ones(4, dtype=np.int64)}, edges)
+        assert keys == ["a", "b"]
+        assert matrices["count"].tolist() == [[1, 1], [0, 1]]
+
+    def test_align_pads_missing_groups(self):
+        matrix = np.array([[1, 2]])
+        assert align(matrix, ["b"], ["a", "b"], 3).tolist() == [[0, 0, 0], [1, 2, 0]]
@@ -0,0 +1,186 @@
+"""
+Declarative alert rules for the manager dashboard.
+
+Each rule is evaluated as an indexed range count or a grouped aggregate, never
+a client-table scan. Results are cached per rule for ALERTS_CACHE_SECONDS and
+keyed by the versions of the tables the rule reads, so writes refresh them.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from ..config import settings
+from .cache import TTLCache, MISS
+from .database import supabase
+from .pagination import fetch_all
+from .user_directory import user_directory
+from .versions import get_versions
+
+logger = logging.getLogger(__name__)
+
+Filter = Tuple[str, str, object]
+
+# ============================================================================
+# Rule Types
+# ============================================================================
+
+class CountRule:
+    """
+    Alert when the number of rows matching `filters` is at least `threshold`.
+    `filters(today)` returns (operator, column, value) triples, e.g. ("lt", "expiry_date", "2024-01-01").
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        filters: Callable[[date], Sequence[Filter]],
+        title: str,
+        message: str,
+        threshold: int = 1,
+        critical_at: Optional[int] = None,
+        severity: str = "warning"
+    ):
+        self.name = name
+        self.tables = (table,)
+        self.table = table
+        self.filters = filters
+        self.title = title
+        self.message = message
+        self.threshold = threshold
+        self.critical_at = critical_at
+        self.severity = severity
+
+    def evaluate(self, today: date) -> List[dict]:
+        q = supabase.table(self.table).select("id", count="exact")
+        for op, column, value in self.filters(today):
+            q = getattr(q, op)(column, value)
+        count = q.limit(1).execute().count or 0
+        if count < self.threshold:
+            return []
+        severity = "critical" if self.critical_at is not None and count > self.critical_at else self.severity
+        return [{
+            "rule": self.name,
+            "type": severity,
+            "title": self.title.format(count=count),
+            "message": self.message.format(count=count),
+            "count": count
+        }]
+
+class FunctionRule:
+    """Alert rule backed by a custom aggregate query"""
+
+    def __init__(self, name: str, tables: Tuple[str, ...], fn: Callable[[date], List[dict]]):
+        self.name = name
+        self.tables = tables
+        self.fn = fn
+
+    def evaluate(self, today: date) -> List[dict]:
+        return [dict(alert, rule=self.name) for alert in self.fn(today)]
+
+# ============================================================================
+# Aggregate Rules
+# ============================================================================
+
+OVERDUE_BACKLOG_THRESHOLD = 10
+IDLE_CHECK_AFTER_HOUR = 12
+
+def _employee_names() -> dict:
+    return {u["id"]: u.get("name") for u in user_directory.by_role("employee")}
+
+def _overdue_backlog(today: date) -> List[dict]:
+    """Employees holding OVERDUE_BACKLOG_THRESHOLD or more overdue clients"""
+    try:
+        rows = supabase.rpc("alert_overdue_backlog", {"p_threshold": OVERDUE_BACKLOG_THRESHOLD}).execute().data or []
+    except Exception as e:
+        logger.warning(f"alert_overdue_backlog unavailable, aggregating in process: {e}")
+        counts = {}
+        build = lambda: supabase.table("clients").select("id,assigned_employee_id").eq("status", "overdue").is_("deleted_at", "null").order("id")
+        for c in fetch_all(build):
+            emp_id = c.get("assigned_employee_id")
+            if emp_id:
+                counts[emp_id] = counts.get(emp_id, 0) + 1
+        rows = [{"employee_id": e, "overdue": n} for e, n in counts.items() if n >= OVERDUE_BACKLOG_THRESHOLD]
+    if not rows:
+        return []
+    names = _employee_names()
+    alerts = []
+    for row in sorted(rows, key=lambda r: -r["overdue"]):
+        alerts.append({
+            "type": "warning",
+            "title": f"{names.get(row['employee_id'], 'An employee')} has {row['overdue']} overdue clients",
+            "message": "Consider reassigning clients or following up with this employee.",
+            "count": row["overdue"],
+            "employee_id": row["employee_id"]
+        })
+    return alerts
+
+def _idle_employees(today: date) -> List[dict]:
+    """Employees with no activity logged today (checked from midday UTC)"""
+    if datetime.utcnow().hour < IDLE_CHECK_AFTER_HOUR:
+        return []
+    day = today.isoformat()
+    try:
+        active_rows = supabase.table("activity_daily_rollup").select("employee_id").eq("day", day).execute().data or []
+    except Exception:
+        active_rows = supabase.table("activity_logs").select("employee_id").gte("created_at", day).execute().data or []
+    active = {r["employee_id"] for r in active_rows}
+    idle = [name or "Unknown" for emp_id, name in _employee_names().items() if emp_id not in active]
+    if not idle:
+        return []
+    shown = ", ".join(sorted(idle)[:5]) + (f" and {len(idle) - 5} more" if len(idle) > 5 else "")
+    return [{
+        "type": "info",
+        "title": f"{len(idle)} Employees With No Activity Today",
+        "message": shown,
+        "count": len(idle)
+    }]
+
+# ============================================================================
+# Rule Set
+# ============================================================================
+
+RULES = [
+    CountRule(
+        "expired_clients", "clients",
+        lambda today: [("lt", "expiry_date", (today - timedelta(days=30)).isoformat()), ("is_", "deleted_at", "null")],
+        title="{count} Long-Overdue Clients",
+        message="Clients overdue by more than 30 days require immediate attention.",
+        critical_at=10
+    ),
+    CountRule(
+        "upcoming_expiries", "clients",
+        lambda today: [("gte", "expiry_date", today.isoformat()), ("lte", "expiry_date", (today + timedelta(days=14)).isoformat()), ("is_", "deleted_at", "null")],
+        title="{count} Clients Expiring Within 14 Days",
+        message="Reach out for renewals before these memberships lapse.",
+        severity="info"
+    ),
+    FunctionRule("overdue_backlog", ("clients", "users"), _overdue_backlog),
+    FunctionRule("idle_employees", ("activity_logs", "users"), _idle_employees),
+]
+
+class AlertEngine:
+    """Evaluates rules, caching each rule's alerts between evaluations"""
+
+    def __init__(self, rules: list, ttl: float):
+        self.rules = rules
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries=len(rules) * 4)
+
+    def evaluate(self) -> List[dict]:
+        today = datetime.utcnow().date()
+        alerts = []
+        for rule in self.rules:
+            key = f"{rule.name}|{today}|{'.'.join(str(v) for v in get_versions(*rule.tables))}"
+            result = self._cache.get(key)
+            if result is MISS:
+                try:
+                    result = rule.evaluate(today)
+                except Exception as e:
+                    logger.error(f"Alert rule {rule.name} failed: {e}")
+                    continue
+                self._cache.set(key, result, self.ttl)
+            alerts.extend(result)
+        return alerts
+
+alert_engine = AlertEngine(RULES, ttl=settings.ALERTS_CACHE_SECONDS)
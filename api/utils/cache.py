@@ -0,0 +1,149 @@
+"""
+Read-through response cache invalidated by table versions
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+from starlette.responses import Response
+
+from ..config import settings
+from .responses import dumps
+from .versions import get_versions
+from .shared_cache import MISS as SHARED_MISS, shared_enabled, get_shared_cache
+
+MISS = object()
+
+# ============================================================================
+# TTL / LRU Store
+# ============================================================================
+
+class TTLCache:
+    """Thread-safe LRU map whose entries also expire after a TTL"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return MISS
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TieredCache:
+    """
+    Small per-process L1 in front of the node-wide shared tier.
+    L1 entries live at most `l1_ttl` seconds; keys embed table versions, so a
+    write anywhere changes the key rather than relying on L1 invalidation.
+    """
+
+    def __init__(self, shared, l1_entries: int, l1_ttl: float = 1.0):
+        self.shared = shared
+        self.l1 = TTLCache(max_entries=l1_entries)
+        self.l1_ttl = l1_ttl
+
+    def get(self, key: str) -> Any:
+        value = self.l1.get(key)
+        if value is not MISS:
+            return value
+        value = self.shared.get(key)
+        if value is SHARED_MISS:
+            return MISS
+        self.l1.set(key, value, self.l1_ttl)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.shared.set(key, value, ttl)
+        self.l1.set(key, value, min(ttl, self.l1_ttl))
+
+    def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        self.shared.delete(key)
+
+    def clear(self) -> None:
+        self.l1.clear()
+        self.shared.clear()
+
+    def __len__(self) -> int:
+        return len(self.shared)
+
+# Global application cache
+if shared_enabled():
+    app_cache = TieredCache(get_shared_cache(), l1_entries=settings.CACHE_MAX_ENTRIES)
+else:
+    app_cache = TTLCache(max_entries=settings.CACHE_MAX_ENTRIES)
+
+# ============================================================================
+# Read-through Decorator
+# ============================================================================
+
+def cache_key(route: str, payload: dict, params: dict, versions: Tuple[int, ...]) -> str:
+    """Key from route, caller role and subject, query params and table versions"""
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] is not None)
+    version_tag = ".".join(str(v) for v in versions)
+    return f"{route}|{payload.get('role', '')}:{payload.get('sub', '')}|{query}|v{version_tag}"
+
+def cached_read(route: str, *tables: str):
+    """
+    Cache a GET handler's rendered JSON for CACHE_TTL_SECONDS.
+    `tables` are the tables the response reads; the key embeds their
+    versions, so any write that bumps one of them is never served stale.
+    Error payloads and non-200 responses are not cached.
+    """
+    def decorator(fn: Callable):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            ttl = settings.CACHE_TTL_SECONDS
+            if ttl <= 0:
+                return fn(*args, **kwargs)
+
+            payload = kwargs.get("payload") or {}
+            params = {k: v for k, v in kwargs.items() if k != "payload"}
+            key = cache_key(route, payload, params, get_versions(*tables))
+
+            body = app_cache.get(key)
+            if body is MISS:
+                result = fn(*args, **kwargs)
+                if isinstance(result, Response):
+                    if result.status_code != 200 or result.media_type != "application/json":
+                        return result
+                    body = result.body
+                elif isinstance(result, dict) and "error" not in result:
+                    body = dumps(result)
+                else:
+                    return result
+                app_cache.set(key, body, ttl)
+
+            return Response(content=body, media_type="application/json")
+        return wrapper
+    return decorator
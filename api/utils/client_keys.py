@@ -0,0 +1,83 @@
+"""
+Normalized identity keys for duplicate client detection.
+
+Each function mirrors a generated *_key column on clients (migration 012),
+so a key computed here can be looked up with a plain `in.(...)` filter.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .database import supabase
+from .loaders import BATCH_SIZE
+
+# member_id identifies a client; email and phone are shared often enough
+# (reception lines, agents) that they only match rows without a member_id
+KEY_COLUMNS = {
+    "member_id": "member_key",
+    "email": "email_key",
+    "phone": "phone_key",
+}
+
+def normalize_member_id(value) -> Optional[str]:
+    """'mem 00012' -> 'MEM00012'; mirrors member_key"""
+    key = re.sub(r"\s+", "", str(value or "")).upper()
+    return key or None
+
+def normalize_email(value) -> Optional[str]:
+    """Trimmed and lower-cased; mirrors email_key"""
+    key = str(value or "").strip().lower()
+    return key or None
+
+def normalize_phone(value) -> Optional[str]:
+    """Last 10 digits, so '+91-98765 43210' and '9876543210' match; mirrors phone_key"""
+    digits = re.sub(r"\D", "", str(value or ""))
+    return digits[-10:] or None
+
+def _is_placeholder_phone(key: str) -> bool:
+    """'0000000000', '9999999999', short fragments: never identifying"""
+    return len(key) < 7 or len(set(key)) == 1
+
+def client_keys(row: dict) -> List[Tuple[str, str]]:
+    """(kind, key) pairs for a clients row: member_id, then email, then phone"""
+    phone = normalize_phone(row.get("contact_phone"))
+    keys = [
+        ("member_id", normalize_member_id(row.get("member_id"))),
+        ("email", normalize_email(row.get("contact_email"))),
+        ("phone", None if phone and _is_placeholder_phone(phone) else phone),
+    ]
+    return [(kind, key) for kind, key in keys if key]
+
+def match_keys(row: dict) -> List[Tuple[str, str]]:
+    """
+    Keys that identify the row as an existing client: its member_id alone
+    when it has one (so a different member_id is never a match), otherwise
+    its email and phone.
+    """
+    keys = client_keys(row)
+    member = [k for k in keys if k[0] == "member_id"]
+    return member or keys
+
+def find_existing(keys: Iterable[Tuple[str, str]], columns: str = "id") -> Dict[Tuple[str, str], dict]:
+    """
+    (kind, key) -> live client row for every key that already exists.
+    One query per key kind and BATCH_SIZE keys; soft-deleted clients never match.
+    """
+    by_kind: Dict[str, set] = {}
+    for kind, key in keys:
+        by_kind.setdefault(kind, set()).add(key)
+
+    found: Dict[Tuple[str, str], dict] = {}
+    for kind, values in by_kind.items():
+        column = KEY_COLUMNS[kind]
+        values = list(values)
+        for start in range(0, len(values), BATCH_SIZE):
+            res = (
+                supabase.table("clients")
+                .select(f"{columns},{column}")
+                .in_(column, values[start:start + BATCH_SIZE])
+                .is_("deleted_at", "null")
+                .execute()
+            )
+            for r in res.data or []:
+                found.setdefault((kind, r[column]), r)
+    return found
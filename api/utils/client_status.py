@@ -0,0 +1,84 @@
+"""
+Client recency classification shared by client lists and dashboards.
+
+Status is materialized in clients.status: write paths set it, and a periodic
+sweep (sweep_client_status in migration 005) applies time-based transitions.
+"""
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Optional
+
+from .database import supabase
+from .versions import bump_version
+
+logger = logging.getLogger(__name__)
+
+RECENCY_STATUSES = ("good", "due_soon", "overdue")
+
+def parse_datetime(value) -> Optional[datetime]:
+    """Parse an ISO timestamp or date into a naive UTC datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00")) if "+" in value or "Z" in value else datetime.fromisoformat(value)
+        return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+    except Exception:
+        return None
+
+def days_since_contact(last_contact, now: Optional[datetime] = None) -> int:
+    lc_dt = parse_datetime(last_contact)
+    if not lc_dt:
+        return 9999
+    return math.floor(((now or datetime.utcnow()) - lc_dt).total_seconds() / 86400)
+
+def recency_status(last_contact, now: Optional[datetime] = None) -> str:
+    """Status for a last contact time; mirrors client_recency_status() in SQL"""
+    days_since = days_since_contact(last_contact, now)
+    # Recency Logic (User Defined)
+    # Good: < 7 days
+    # Due Soon: 7-14 days
+    # Overdue: > 15 days (Treating as >= 15 for safety/continuity, ensuring no gap at 15)
+    if days_since < 7:
+        return "good"
+    if days_since <= 14:
+        return "due_soon"
+    return "overdue"
+
+def classify_client(c: dict, now: Optional[datetime] = None) -> dict:
+    """
+    Copy of the client row with recency status and day counters added.
+    Rows carrying the materialized status (status_changed_at present) keep it.
+    """
+    now = now or datetime.utcnow()
+
+    days_since = days_since_contact(c.get("last_contact_date"), now)
+    status = c.get("status")
+    if "status_changed_at" not in c or status not in RECENCY_STATUSES:
+        status = recency_status(c.get("last_contact_date"), now)
+
+    # Still calculate expiry days for display/sorting if needed, but NOT for status
+    days_until_expiry = 9999
+    expiry_dt = parse_datetime(c.get("expiry_date"))
+    if expiry_dt:
+        days_until_expiry = math.ceil((expiry_dt - now).total_seconds() / 86400)
+
+    c2 = dict(c)
+    c2["days_since_contact"] = days_since
+    c2["days_until_expiry"] = days_until_expiry
+    c2["status"] = status
+    c2["is_overdue"] = (status == "overdue")
+    return c2
+
+def sweep_client_status() -> int:
+    """Apply time-based status transitions; returns how many clients changed"""
+    if not supabase:
+        return 0
+    res = supabase.rpc("sweep_client_status", {}).execute()
+    changed = res.data or 0
+    if changed:
+        bump_version("clients")
+        logger.info(f"Client status sweep: {changed} clients changed status")
+    return changed
@@ -0,0 +1,182 @@
+"""
+Negotiated response compression (brotli / gzip) for deployments without nginx
+"""
+import gzip
+import io
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Content types that must be streamed untouched
+_UNCOMPRESSIBLE_PREFIXES = ("text/event-stream", "image/", "video/", "audio/", "font/woff")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported coding from an Accept-Encoding header"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class _Compressor:
+    """Incremental compressor with a common interface for br and gzip"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._buffer = io.BytesIO()
+            self._gzip = gzip.GzipFile(mode="wb", fileobj=self._buffer, compresslevel=gzip_level)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        self._gzip.write(data)
+        self._gzip.flush()
+        return self._drain()
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        self._gzip.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        out = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return out
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+class CompressionMiddleware:
+    """
+    Compress HTTP responses with brotli or gzip based on Accept-Encoding.
+    Bodies smaller than `minimum_size`, already-encoded responses and event
+    streams are passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """Per-request send wrapper holding back the start message until the body is known"""
+
+    def __init__(self, send: Send, encoding: str, config: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.config = config
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.pending = b""
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or content_type.startswith(_UNCOMPRESSIBLE_PREFIXES)
+            ):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            # Buffer until the body is known to be worth compressing
+            self.pending += body
+            if len(self.pending) < self.config.minimum_size:
+                if more_body:
+                    return
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": self.pending})
+                return
+
+            self.compressor = _Compressor(self.encoding, self.config.gzip_level, self.config.brotli_quality)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The encoded bytes differ from the identity payload
+                headers["ETag"] = "W/" + etag
+
+            body, self.pending = self.pending, b""
+            if more_body:
+                del headers["Content-Length"]
+                await self._send(self.start_message)
+                await self._send({
+                    "type": "http.response.body",
+                    "body": self.compressor.compress(body),
+                    "more_body": True
+                })
+                return
+
+            compressed = self.compressor.compress(body) + self.compressor.finish()
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,143 @@
+"""
+In-process pub/sub bus feeding the Server-Sent Events stream
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import uuid
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Set
+
+from ..config import settings
+from .responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# Channels
+# ============================================================================
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def role_channel(role: str) -> str:
+    return f"role:{role}"
+
+# Activity entries go to the acting employee and to everyone watching the team feed
+def activity_channels(employee_id: str) -> List[str]:
+    return [user_channel(employee_id), role_channel("manager"), role_channel("admin")]
+
+# ============================================================================
+# Events
+# ============================================================================
+
+class Event:
+    """A published event; `id` is '<bus epoch>-<sequence>' for Last-Event-ID replay"""
+
+    __slots__ = ("id", "seq", "channels", "type", "data")
+
+    def __init__(self, seq: int, epoch: str, channels: Iterable[str], event_type: str, data: dict):
+        self.seq = seq
+        self.id = f"{epoch}-{seq}"
+        self.channels = frozenset(channels)
+        self.type = event_type
+        self.data = data
+
+    def encode(self) -> bytes:
+        """SSE wire format"""
+        return b"id: " + self.id.encode() + b"\nevent: " + self.type.encode() + b"\ndata: " + dumps(self.data) + b"\n\n"
+
+class Subscription:
+    """
+    One connected stream. Events are delivered through a bounded queue; a
+    consumer that falls behind is marked lagging and closed so it reconnects
+    and catches up from the replay buffer instead of growing memory.
+    """
+
+    def __init__(self, bus: "EventBus", channels: Set[str], loop: asyncio.AbstractEventLoop):
+        self.bus = bus
+        self.channels = channels
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=bus.queue_size)
+        self.lagging = False
+
+    def _offer(self, event: Event) -> None:
+        # Runs on the subscriber's event loop
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagging = True
+            logger.warning(f"SSE subscriber lagging on {sorted(self.channels)}; closing stream")
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event, or None when the heartbeat interval elapses"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+class EventBus:
+    """Per-user fan-out with a bounded replay buffer"""
+
+    def __init__(self, replay_size: int = 1000, queue_size: int = 100):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._seq = itertools.count(1)
+        self._replay: Deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, channels: Iterable[str], event_type: str, data: dict) -> Event:
+        """Publish from any thread (sync route handlers run in a threadpool)"""
+        with self._lock:
+            event = Event(next(self._seq), self.epoch, channels, event_type, data)
+            self._replay.append(event)
+            targets = [s for s in self._subscribers if s.channels & event.channels]
+
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # Loop already closed; the stream is gone
+                self.unsubscribe(sub)
+        return event
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        sub = Subscription(self, set(channels), asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def replay(self, channels: Set[str], last_event_id: str) -> Optional[List[Event]]:
+        """
+        Events after `last_event_id` for the given channels.
+        Returns None when the id cannot be honoured (other process/restart, or
+        already evicted), meaning the client must resync from the REST API.
+        """
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        last_seq = int(seq)
+        with self._lock:
+            buffered = list(self._replay)
+        if buffered and buffered[0].seq > last_seq + 1:
+            return None
+        return [e for e in buffered if e.seq > last_seq and e.channels & channels]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+# Global bus instance
+event_bus = EventBus(replay_size=settings.SSE_REPLAY_SIZE, queue_size=settings.SSE_QUEUE_SIZE)
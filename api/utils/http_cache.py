@@ -0,0 +1,140 @@
+"""
+Conditional GET support: ETags, If-None-Match and Cache-Control headers
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from fastapi import Depends, Request
+from starlette.responses import Response
+
+from ..config import settings
+from ..dependencies import verify_token
+from .versions import get_versions
+
+# ============================================================================
+# Validation Memo
+# ============================================================================
+
+# request key -> (version vector, etag, validated_at)
+# Lets a poll whose table versions have not moved be answered with 304 before
+# the handler runs. Entries are only trusted for ETAG_REVALIDATE_SECONDS so
+# writes made through another worker are picked up by the payload hash.
+_MEMO_MAX_ENTRIES = 10000
+_memo: "OrderedDict[str, Tuple[Tuple[int, ...], str, float]]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+class NotModified(Exception):
+    """Raised by the conditional GET dependency to short-circuit a request"""
+
+    def __init__(self, etag: str, cache_control: str):
+        self.etag = etag
+        self.cache_control = cache_control
+
+def _request_key(request: Request, payload: dict) -> str:
+    """Cache key: route, caller identity and query parameters"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.method}:{request.url.path}?{query}|{payload.get('role', '')}:{payload.get('sub', '')}"
+
+def _remember(key: str, versions: Tuple[int, ...], etag: str) -> None:
+    with _memo_lock:
+        _memo[key] = (versions, etag, time.monotonic())
+        _memo.move_to_end(key)
+        while len(_memo) > _MEMO_MAX_ENTRIES:
+            _memo.popitem(last=False)
+
+def _lookup(key: str) -> Optional[Tuple[Tuple[int, ...], str, float]]:
+    with _memo_lock:
+        return _memo.get(key)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag derived from the response payload"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+# ============================================================================
+# Route Dependency
+# ============================================================================
+
+def conditional_get(
+    *tables: str,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+    auth: Callable = verify_token
+):
+    """
+    Enable ETag / If-None-Match handling for a GET route.
+    `tables` are the tables the response is derived from; `auth` should be the
+    same auth dependency the route uses so the payload is resolved only once.
+    """
+    async def checker(request: Request, payload: dict = Depends(auth)) -> None:
+        key = _request_key(request, payload)
+        versions = get_versions(*tables)
+        request.state.conditional = {
+            "key": key,
+            "versions": versions,
+            "cache_control": cache_control
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return
+
+        entry = _lookup(key)
+        if entry is None:
+            return
+        known_versions, etag, validated_at = entry
+        fresh = (time.monotonic() - validated_at) < settings.ETAG_REVALIDATE_SECONDS
+        if known_versions == versions and fresh and etag_matches(if_none_match, etag):
+            raise NotModified(etag, cache_control)
+    return checker
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """Empty 304 response carrying the validators"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+async def conditional_response_middleware(request: Request, call_next):
+    """Attach ETag/Cache-Control to conditional routes and answer 304 on a match"""
+    response = await call_next(request)
+
+    ctx = getattr(request.state, "conditional", None)
+    if not ctx or request.method != "GET" or response.status_code != 200:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = compute_etag(body)
+    _remember(ctx["key"], ctx["versions"], etag)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag, ctx["cache_control"])
+
+    headers = dict(response.headers)
+    headers["ETag"] = etag
+    headers["Cache-Control"] = ctx["cache_control"]
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=headers,
+        background=response.background
+    )
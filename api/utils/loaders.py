@@ -0,0 +1,18 @@
+"""
+Batched lookups used when a primary query cannot embed related rows
+"""
+from typing import Dict, Iterable
+
+from .database import supabase
+
+# Keeps `in.(...)` filters well inside URL length limits
+BATCH_SIZE = 200
+
+def load_names(table: str, ids: Iterable[str], column: str = "name") -> Dict[str, str]:
+    """id -> `column` for the given ids, one query per BATCH_SIZE ids"""
+    unique = list({i for i in ids if i})
+    names: Dict[str, str] = {}
+    for start in range(0, len(unique), BATCH_SIZE):
+        res = supabase.table(table).select(f"id,{column}").in_("id", unique[start:start + BATCH_SIZE]).execute()
+        names.update({r["id"]: r.get(column) for r in res.data or []})
+    return names
@@ -0,0 +1,52 @@
+"""
+Keyset (cursor) pagination helpers for (created_at, id) ordered lists, and
+range paging for reads larger than one PostgREST page
+"""
+import base64
+from typing import Callable, Optional, Tuple
+
+def encode_cursor(created_at: str, row_id: str) -> str:
+    """Opaque cursor pointing just past the given row"""
+    raw = f"{created_at}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not created_at or not row_id:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+def keyset_filter(created_at: str, row_id: str, column: str = "created_at", desc: bool = True) -> str:
+    """
+    PostgREST `or` filter for rows strictly after the cursor in
+    (created_at DESC, id DESC) order, or ascending order with desc=False.
+    Values are quoted because timestamps contain reserved characters.
+    """
+    op = "lt" if desc else "gt"
+    return f'{column}.{op}."{created_at}",and({column}.eq."{created_at}",id.{op}."{row_id}")'
+
+def next_cursor(rows: list, limit: int, column: str = "created_at") -> Optional[str]:
+    """Cursor for the following page, or None on the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[column], last["id"])
+
+def fetch_all(build_query: Callable, page_size: int = 1000) -> list:
+    """
+    Read every row of a query past PostgREST's max-rows cap by requesting
+    consecutive ranges. `build_query` must return a fresh, ordered builder.
+    """
+    rows: list = []
+    offset = 0
+    while True:
+        page = build_query().range(offset, offset + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
@@ -0,0 +1,64 @@
+"""
+Background periodic tasks run off the request path
+"""
+import logging
+import os
+import threading
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTask:
+    """
+    Calls `fn` every `interval` seconds on a daemon thread.
+    Failures are logged and the task keeps running.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self) -> None:
+        if self.interval <= 0:
+            return
+        # Threads do not survive fork; a forked worker starts its own
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._stop.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name=f"periodic-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"Periodic task {self.name} started (every {self.interval}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> None:
+        try:
+            self.fn()
+        except Exception as e:
+            logger.warning(f"Periodic task {self.name} failed: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+# Registered tasks, started and stopped with the application
+periodic_tasks: Dict[str, PeriodicTask] = {}
+
+def register_periodic(name: str, interval: float, fn: Callable[[], None]) -> PeriodicTask:
+    task = PeriodicTask(name, interval, fn)
+    periodic_tasks[name] = task
+    return task
+
+def start_periodic_tasks() -> None:
+    for task in periodic_tasks.values():
+        task.start()
+
+def stop_periodic_tasks() -> None:
+    for task in periodic_tasks.values():
+        task.stop()
@@ -0,0 +1,279 @@
+"""
+Follow-up and reminder scheduler.
+
+Upcoming due items (activity follow-ups and reminders) are kept in an
+in-memory min-heap ordered by due time. One thread sleeps until the earliest
+item is due, then emits its notification. The heap is refilled from the
+indexed due-time columns every SCHEDULER_REFILL_SECONDS, looking
+SCHEDULER_HORIZON_SECONDS ahead; writes enqueue new items directly.
+
+Only the worker holding the database lease (acquire_scheduler_lease) fires.
+The notification is inserted first and the item is then claimed with a
+conditional UPDATE (... WHERE notified_at IS NULL); a run that loses the
+claim deletes its notification. A failure before the claim leaves the item
+pending for the next refill, so no due item is marked notified without a
+notification.
+"""
+import heapq
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Set, Tuple
+
+from ..config import settings
+from .client_status import parse_datetime
+from .database import supabase
+from .events import event_bus, user_channel
+from .shared_cache import shared_enabled, get_shared_cache
+from .unread import unread_counters
+from .versions import bump_version
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_UP = "follow_up"
+REMINDER = "reminder"
+
+LEASE_NAME = "follow-up-scheduler"
+
+def acquire_lease(name: str, holder: str, ttl_seconds: int) -> bool:
+    """Take or renew a named lease (acquire_scheduler_lease); False if another holder has it"""
+    try:
+        res = supabase.rpc("acquire_scheduler_lease", {
+            "p_name": name, "p_holder": holder, "p_ttl_seconds": ttl_seconds
+        }).execute()
+        return bool(res.data)
+    except Exception as e:
+        logger.warning(f"Lease check for {name} failed: {e}")
+        return False
+
+def leader_only(name: str, ttl_seconds: int, fn: Callable[[], object]) -> Callable[[], None]:
+    """
+    Wrap a periodic task so it runs only in the process holding the named
+    lease. ttl_seconds should exceed the task interval so the holder renews
+    before expiry; another worker takes over once a holder stops renewing.
+    """
+    def run() -> None:
+        if acquire_lease(name, f"{socket.gethostname()}:{os.getpid()}", ttl_seconds):
+            fn()
+    return run
+
+class DueItem:
+    __slots__ = ("due_at", "kind", "item_id", "user_id")
+
+    def __init__(self, due_at: datetime, kind: str, item_id: str, user_id: str):
+        self.due_at = due_at
+        self.kind = kind
+        self.item_id = item_id
+        self.user_id = user_id
+
+    def __lt__(self, other: "DueItem") -> bool:
+        return (self.due_at, self.item_id) < (other.due_at, other.item_id)
+
+class FollowUpScheduler:
+    """Due-time priority queue with leader-elected firing"""
+
+    def __init__(self, horizon_seconds: int, refill_seconds: int, lease_seconds: int):
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.refill_seconds = refill_seconds
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._heap: List[DueItem] = []
+        self._queued: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._is_leader = False
+        self._lease_checked_at: Optional[datetime] = None
+        self._refilled_at: Optional[datetime] = None
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+
+    def schedule(self, kind: str, item_id: str, user_id: str, due_at, broadcast: bool = True) -> None:
+        """Enqueue an item due within the horizon; later items are picked up by refills"""
+        due = parse_datetime(due_at)
+        if not due or not item_id or not user_id:
+            return
+        if due > datetime.utcnow() + self.horizon:
+            return
+        with self._lock:
+            if (kind, item_id) in self._queued:
+                return
+            self._queued.add((kind, item_id))
+            heapq.heappush(self._heap, DueItem(due, kind, item_id, user_id))
+        self._wakeup.set()
+        if broadcast and shared_enabled():
+            # The leader may be another worker on this node
+            get_shared_cache().broadcast("scheduler", f"{os.getpid()}|{kind}|{item_id}|{user_id}|{due.isoformat()}")
+
+    def on_broadcast(self, message: str) -> None:
+        pid, kind, item_id, user_id, due = message.split("|", 4)
+        if pid != str(os.getpid()):
+            self.schedule(kind, item_id, user_id, due, broadcast=False)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def _pop_due(self, now: datetime) -> List[DueItem]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0].due_at <= now:
+                item = heapq.heappop(self._heap)
+                self._queued.discard((item.kind, item.item_id))
+                due.append(item)
+        return due
+
+    def _next_due(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0].due_at if self._heap else None
+
+    # ------------------------------------------------------------------
+    # Database
+    # ------------------------------------------------------------------
+
+    def refill(self) -> int:
+        """Load un-notified items due before now + horizon (indexed partial scans)"""
+        until = (datetime.utcnow() + self.horizon).isoformat()
+        follow_ups = supabase.table("activity_logs").select("id,employee_id,follow_up_due_at") \
+            .is_("follow_up_notified_at", "null").lte("follow_up_due_at", until) \
+            .order("follow_up_due_at").limit(1000).execute().data or []
+        for r in follow_ups:
+            self.schedule(FOLLOW_UP, r["id"], r.get("employee_id"), r.get("follow_up_due_at"), broadcast=False)
+        reminders = supabase.table("reminders").select("id,user_id,due_date") \
+            .eq("status", "pending").is_("notified_at", "null").lte("due_date", until) \
+            .order("due_date").limit(1000).execute().data or []
+        for r in reminders:
+            self.schedule(REMINDER, r["id"], r.get("user_id"), r.get("due_date"), broadcast=False)
+        self._refilled_at = datetime.utcnow()
+        return len(follow_ups) + len(reminders)
+
+    def _renew_lease(self) -> bool:
+        leader = acquire_lease(LEASE_NAME, self.holder, self.lease_seconds)
+        if leader != self._is_leader:
+            logger.info(f"Scheduler {'acquired' if leader else 'lost'} leadership ({self.holder})")
+        self._is_leader = leader
+        self._lease_checked_at = datetime.utcnow()
+        return leader
+
+    def _pending_row(self, item: DueItem) -> Optional[dict]:
+        """The item's row while it is still un-notified"""
+        if item.kind == FOLLOW_UP:
+            res = supabase.table("activity_logs").select("id,client_id") \
+                .eq("id", item.item_id).is_("follow_up_notified_at", "null").execute()
+        else:
+            res = supabase.table("reminders").select("id,title,message") \
+                .eq("id", item.item_id).eq("status", "pending").is_("notified_at", "null").execute()
+        return res.data[0] if res.data else None
+
+    def _claim(self, item: DueItem) -> Optional[dict]:
+        """Mark the item notified and return its row; None if another run already did"""
+        now = datetime.utcnow().isoformat()
+        if item.kind == FOLLOW_UP:
+            res = supabase.table("activity_logs").update({"follow_up_notified_at": now}) \
+                .eq("id", item.item_id).is_("follow_up_notified_at", "null").execute()
+        else:
+            res = supabase.table("reminders").update({"notified_at": now}) \
+                .eq("id", item.item_id).eq("status", "pending").is_("notified_at", "null").execute()
+        return res.data[0] if res.data else None
+
+    def fire(self, item: DueItem) -> bool:
+        row = self._pending_row(item)
+        if row is None:
+            return False
+        if item.kind == FOLLOW_UP:
+            notification = {
+                "user_id": item.user_id,
+                "type": "follow_up_due",
+                "title": "Follow-up due",
+                "message": f"Follow-up with client {row.get('client_id')} is due now",
+                "metadata": {"activity_id": item.item_id, "client_id": row.get("client_id"), "due_date": item.due_at.isoformat()},
+            }
+        else:
+            notification = {
+                "user_id": item.user_id,
+                "type": "reminder",
+                "title": row.get("title") or "Reminder",
+                "message": row.get("message"),
+                "metadata": {"reminder_id": item.item_id, "due_date": item.due_at.isoformat()},
+            }
+        notification["created_at"] = datetime.utcnow().isoformat()
+        nres = supabase.table("notifications").insert(notification).execute()
+        if self._claim(item) is None:
+            # Another run announced it between our read and claim
+            ids = [n["id"] for n in nres.data or []]
+            if ids:
+                supabase.table("notifications").delete().in_("id", ids).execute()
+            return False
+        bump_version("notifications", "activity_logs" if item.kind == FOLLOW_UP else "reminders")
+        unread_counters.on_inserted(nres.data or [])
+        for n in nres.data or []:
+            event_bus.publish([user_channel(item.user_id)], "notification", n)
+        return True
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    def tick(self) -> float:
+        """One scheduler step; returns how long to sleep before the next"""
+        now = datetime.utcnow()
+        if self._lease_checked_at is None or (now - self._lease_checked_at).total_seconds() >= self.lease_seconds / 3:
+            was_leader = self._is_leader
+            if self._renew_lease() and not was_leader:
+                self._refilled_at = None
+        if not self._is_leader:
+            # Followers only keep items a new leader could still use
+            self._pop_due(now - self.horizon)
+            return self.lease_seconds / 3
+
+        if self._refilled_at is None or (now - self._refilled_at).total_seconds() >= self.refill_seconds:
+            self.refill()
+
+        for item in self._pop_due(now):
+            try:
+                self.fire(item)
+            except Exception as e:
+                logger.error(f"Scheduler failed to fire {item.kind} {item.item_id}: {e}")
+
+        sleep = min(self.refill_seconds, self.lease_seconds / 3)
+        next_due = self._next_due()
+        if next_due:
+            sleep = min(sleep, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+        return sleep
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            try:
+                sleep = self.tick()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {e}")
+                sleep = self.refill_seconds
+            self._wakeup.wait(sleep)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._thread = threading.Thread(target=self._run, name="follow-up-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Follow-up scheduler started ({self.holder})")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+
+# Global scheduler instance
+scheduler = FollowUpScheduler(
+    horizon_seconds=settings.SCHEDULER_HORIZON_SECONDS,
+    refill_seconds=settings.SCHEDULER_REFILL_SECONDS,
+    lease_seconds=settings.SCHEDULER_LEASE_SECONDS
+)
+if shared_enabled():
+    get_shared_cache().subscribe("scheduler", scheduler.on_broadcast)
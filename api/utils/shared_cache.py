@@ -0,0 +1,255 @@
+"""
+Cross-worker shared cache tier: SQLite in WAL mode on tmpfs.
+
+Every gunicorn worker on a node opens the same database file, so cached
+entries, table versions and invalidation broadcasts are shared without an
+external service. The data is disposable; durability is traded for speed.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires_at);
+CREATE TABLE IF NOT EXISTS versions (
+    tbl TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS broadcasts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Entry access times are refreshed at most this often to limit write traffic
+_TOUCH_INTERVAL_SECONDS = 1.0
+# How many sets between size checks
+_EVICTION_CHECK_EVERY = 32
+# Broadcast rows kept for late pollers
+_BROADCAST_RETENTION = 10000
+
+def default_cache_path() -> str:
+    """tmpfs when available so the WAL never touches disk; reset when gunicorn starts"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "crm-shared-cache.sqlite3")
+
+class SharedCache:
+    """
+    Size-bounded LRU cache with TTLs, shared table version counters and a
+    broadcast channel, all backed by one SQLite file.
+    Connections are per thread and per process (safe with preload_app forks).
+    """
+
+    def __init__(self, path: str, max_bytes: int, poll_interval: float = 0.5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._sets_since_check = 0
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._listener_pid: Optional[int] = None
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        self._execute_script(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            if self._handlers and self._listener_pid != os.getpid():
+                # Forked worker: listener threads do not survive fork
+                self._ensure_listener()
+        return conn
+
+    def _execute_script(self, script: str) -> None:
+        self._conn().executescript(script)
+
+    # ------------------------------------------------------------------
+    # Cache API (same surface as TTLCache)
+    # ------------------------------------------------------------------
+
+    def get(self, key: str):
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return MISS
+        value, expires_at, accessed_at = row
+        if expires_at < now:
+            self.delete(key)
+            return MISS
+        if now - accessed_at > _TOUCH_INTERVAL_SECONDS:
+            self._conn().execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl, now)
+        )
+        self._sets_since_check += 1
+        if self._sets_since_check >= _EVICTION_CHECK_EVERY:
+            self._sets_since_check = 0
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries")
+
+    def reset(self) -> None:
+        """
+        Drop entries, versions and broadcasts. The file outlives the server
+        (fixed path on tmpfs), so a new deployment must not inherit entries
+        or counters written by the previous one.
+        """
+        self._conn().executescript("DELETE FROM entries; DELETE FROM versions; DELETE FROM broadcasts;")
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return removed
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        return removed + len(victims)
+
+    # ------------------------------------------------------------------
+    # Table versions
+    # ------------------------------------------------------------------
+
+    def bump_versions(self, tables: Iterable[str]) -> None:
+        self._conn().executemany(
+            "INSERT INTO versions (tbl, version) VALUES (?, 1) "
+            "ON CONFLICT(tbl) DO UPDATE SET version = version + 1",
+            [(t,) for t in tables]
+        )
+
+    def get_versions(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        if not tables:
+            return ()
+        placeholders = ",".join("?" * len(tables))
+        rows = dict(self._conn().execute(
+            f"SELECT tbl, version FROM versions WHERE tbl IN ({placeholders})", tables
+        ).fetchall())
+        return tuple(rows.get(t, 0) for t in tables)
+
+    # ------------------------------------------------------------------
+    # Broadcast channel
+    # ------------------------------------------------------------------
+
+    def broadcast(self, channel: str, message: str = "") -> None:
+        """Deliver `message` to `channel` handlers in every worker (including this one)"""
+        conn = self._conn()
+        seq = conn.execute(
+            "INSERT INTO broadcasts (channel, message, created_at) VALUES (?, ?, ?)",
+            (channel, message, time.time())
+        ).lastrowid
+        if seq % 1000 == 0:
+            conn.execute("DELETE FROM broadcasts WHERE seq <= ?", (seq - _BROADCAST_RETENTION,))
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> None:
+        """Register a handler; a per-process listener thread dispatches broadcasts"""
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+        self._ensure_listener()
+
+    def poll(self) -> int:
+        """Dispatch broadcasts published since the last poll; returns how many"""
+        rows = self._conn().execute(
+            "SELECT seq, channel, message FROM broadcasts WHERE seq > ? ORDER BY seq", (self._last_seq,)
+        ).fetchall()
+        for seq, channel, message in rows:
+            self._last_seq = seq
+            for handler in self._handlers.get(channel, []):
+                try:
+                    handler(message)
+                except Exception as e:
+                    logger.warning(f"Shared cache broadcast handler failed on {channel}: {e}")
+        return len(rows)
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            # Only messages published after this process starts listening matter
+            self._last_seq = self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM broadcasts").fetchone()[0]
+        thread = threading.Thread(target=self._listen, name="shared-cache-listener", daemon=True)
+        thread.start()
+
+    def _listen(self) -> None:
+        pid = os.getpid()
+        while self._listener_pid == pid:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Shared cache poll failed: {e}")
+            time.sleep(self.poll_interval)
+
+# ============================================================================
+# Singleton
+# ============================================================================
+
+_shared_cache: Optional[SharedCache] = None
+_singleton_lock = threading.Lock()
+
+def shared_enabled() -> bool:
+    return settings.CACHE_BACKEND == "shared"
+
+def get_shared_cache() -> SharedCache:
+    """Process-wide handle on the node's shared cache file"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _singleton_lock:
+            if _shared_cache is None:
+                _shared_cache = SharedCache(
+                    settings.SHARED_CACHE_PATH or default_cache_path(),
+                    max_bytes=settings.SHARED_CACHE_MAX_BYTES
+                )
+                logger.info(f"Shared cache tier at {_shared_cache.path}")
+    return _shared_cache
@@ -0,0 +1,135 @@
+"""
+Single-flight request coalescing with stale-while-revalidate
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from .versions import get_versions
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# Single Flight
+# ============================================================================
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Concurrent callers with the same key share one execution of `fn`.
+    Route handlers run in a threadpool, so waiting is thread-based.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+# ============================================================================
+# Stale-While-Revalidate
+# ============================================================================
+
+class StaleWhileRevalidate:
+    """
+    Results are fresh for `fresh_ttl`; after that, and until `stale_ttl`, the
+    cached value is returned immediately while one background refresh runs.
+    Past `stale_ttl` (or on a miss) callers wait on a single shared fetch.
+    """
+
+    def __init__(self, fresh_ttl: float, stale_ttl: float, max_entries: int = 256):
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.flight = SingleFlight()
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="swr-refresh")
+
+    def get(self, key: str, fn: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None:
+            stored_at, value = entry
+            age = now - stored_at
+            if age < self.fresh_ttl:
+                return value
+            if age < self.stale_ttl:
+                if not self.flight.in_flight(key):
+                    self._executor.submit(self._refresh, key, fn)
+                return value
+
+        return self.flight.do(key, lambda: self._load(key, fn))
+
+    def _load(self, key: str, fn: Callable[[], Any]) -> Any:
+        value = fn()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+        return value
+
+    def _refresh(self, key: str, fn: Callable[[], Any]) -> None:
+        try:
+            self.flight.do(key, lambda: self._load(key, fn))
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Shared instance for expensive dashboard reads
+query_swr = StaleWhileRevalidate(
+    fresh_ttl=settings.QUERY_FRESH_SECONDS,
+    stale_ttl=settings.QUERY_STALE_SECONDS
+)
+
+def coalesced_query(shape: str, tables: Tuple[str, ...], run: Callable[[], Any]) -> Any:
+    """
+    Run a read keyed by its query shape. Identical concurrent queries share
+    one DB call; the key embeds table versions, so results are never reused
+    across a write.
+    """
+    key = f"{shape}|v{'.'.join(str(v) for v in get_versions(*tables))}"
+    return query_swr.get(key, run)
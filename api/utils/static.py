@@ -0,0 +1,198 @@
+"""
+Indexed static file serving with precompressed variants and in-memory SPA shell
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import sys
+from typing import Dict, List, Optional
+
+from starlette.datastructures import URL, Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, RedirectResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from .compression import choose_encoding
+from .http_cache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Cache policies
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ASSET_CACHE_CONTROL = "public, max-age=300"
+HTML_CACHE_CONTROL = "no-cache"
+
+# Only text-like assets are worth precompressing
+_COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".map", ".xml", ".ico"}
+_VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# ============================================================================
+# Index
+# ============================================================================
+
+class StaticAsset:
+    """A servable file plus its validators and precompressed variants"""
+
+    __slots__ = ("path", "media_type", "etag", "variants")
+
+    def __init__(self, path: str, media_type: str, etag: str, variants: Dict[str, str]):
+        self.path = path
+        self.media_type = media_type
+        self.etag = etag
+        self.variants = variants
+
+def _file_etag(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return '"' + digest.hexdigest() + '"'
+
+def _variant_etag(etag: str, encoding: str) -> str:
+    """Strong ETag of a precompressed variant: each representation needs its own"""
+    return etag[:-1] + "-" + encoding + '"'
+
+def is_safe_path(rel_path: str) -> bool:
+    """Reject traversal, absolute paths and odd separators before any lookup"""
+    if "\x00" in rel_path or "\\" in rel_path or rel_path.startswith("/"):
+        return False
+    return ".." not in rel_path.split("/")
+
+class StaticIndex:
+    """
+    In-memory index of a directory built once at startup.
+    Requests are answered from the index, so there are no per-request stat
+    calls and nothing outside the indexed files can ever be served.
+    """
+
+    def __init__(self, directory: str, cache_control: str = ASSET_CACHE_CONTROL, html: bool = False):
+        self.directory = directory
+        self.cache_control = cache_control
+        self.html = html
+        self.assets: Dict[str, StaticAsset] = {}
+        self.scan()
+
+    def scan(self) -> None:
+        assets = {}
+        variant_exts = tuple(_VARIANT_SUFFIXES.values())
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(variant_exts):
+                    continue
+                full = os.path.join(root, name)
+                rel = os.path.relpath(full, self.directory).replace(os.sep, "/")
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                variants = {
+                    encoding: full + suffix
+                    for encoding, suffix in _VARIANT_SUFFIXES.items()
+                    if os.path.isfile(full + suffix)
+                }
+                assets[rel] = StaticAsset(full, media_type, _file_etag(full), variants)
+        self.assets = assets
+        logger.info(f"Indexed {len(assets)} static files in {self.directory}")
+
+    def lookup(self, rel_path: str) -> Optional[StaticAsset]:
+        if not is_safe_path(rel_path):
+            return None
+        rel_path = rel_path.strip("/")
+        asset = self.assets.get(rel_path)
+        if asset is None and self.html:
+            asset = self.assets.get(f"{rel_path}/index.html" if rel_path else "index.html")
+        return asset
+
+    def response(self, asset: StaticAsset, request_headers: Headers) -> Response:
+        """Serve an asset, honouring If-None-Match and precompressed variants"""
+        headers = {"Cache-Control": self.cache_control}
+        path, etag = asset.path, asset.etag
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+            encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+            if encoding in asset.variants:
+                headers["Content-Encoding"] = encoding
+                path, etag = asset.variants[encoding], _variant_etag(asset.etag, encoding)
+        headers["ETag"] = etag
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+        return FileResponse(path, headers=headers, media_type=asset.media_type)
+
+class IndexedStaticFiles(StaticFiles):
+    """StaticFiles mount answered from a StaticIndex instead of the filesystem"""
+
+    def __init__(self, directory: str, cache_control: str = ASSET_CACHE_CONTROL, html: bool = False):
+        super().__init__(directory=directory, html=html)
+        self.index = StaticIndex(directory, cache_control=cache_control, html=html)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        # `path` is normpath'd by StaticFiles.get_path; any surviving '..' is rejected
+        rel_path = "" if path == "." else path.replace(os.sep, "/")
+        asset = self.index.lookup(rel_path)
+        if asset is None:
+            raise HTTPException(status_code=404)
+        if rel_path and rel_path not in self.index.assets and not scope["path"].endswith("/"):
+            # Directory index: redirect so relative links resolve, as StaticFiles does
+            url = URL(scope=scope)
+            return RedirectResponse(url=url.replace(path=url.path + "/"))
+        return self.index.response(asset, Headers(scope=scope))
+
+# ============================================================================
+# SPA Shell
+# ============================================================================
+
+class SpaShell:
+    """index.html kept in memory with a content ETag"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.body = f.read()
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+
+    def response(self, request_headers: Headers) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": HTML_CACHE_CONTROL}
+        if etag_matches(request_headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="text/html", headers=headers)
+
+# ============================================================================
+# Build-time Precompression
+# ============================================================================
+
+def precompress_directory(directory: str, min_size: int = 1024) -> int:
+    """Write .br/.gz siblings for compressible files; returns files written"""
+    written = 0
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in _COMPRESSIBLE_EXTENSIONS:
+                continue
+            full = os.path.join(root, name)
+            with open(full, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            with open(full + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9))
+            written += 1
+            if brotli is not None:
+                with open(full + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+                written += 1
+    return written
+
+if __name__ == "__main__":
+    # python -m api.utils.static frontend/dist assets static ...
+    targets: List[str] = sys.argv[1:]
+    for target in targets:
+        if os.path.isdir(target):
+            print(f"Precompressed {precompress_directory(target)} files in {target}")
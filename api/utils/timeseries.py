@@ -0,0 +1,87 @@
+"""
+Time-bucketed aggregation for analytics series (NumPy)
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+BUCKETS = ("hour", "day", "week", "month")
+
+def truncate(dt: datetime, bucket: str) -> datetime:
+    """Start of the bucket containing `dt` (weeks start on Monday, like date_trunc)"""
+    if bucket == "hour":
+        return dt.replace(minute=0, second=0, microsecond=0)
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+def bucket_edges(start: datetime, end: datetime, bucket: str) -> np.ndarray:
+    """
+    Bucket boundaries covering [start, end): every bucket start, followed by
+    the end of the last bucket, as datetime64[s]
+    """
+    first = np.datetime64(truncate(start, bucket), "s")
+    stop = np.datetime64(end, "s")
+    if bucket == "month":
+        months = np.arange(first.astype("datetime64[M]"), stop.astype("datetime64[M]") + 2, dtype="datetime64[M]")
+        edges = months.astype("datetime64[s]")
+    else:
+        step = {"hour": np.timedelta64(1, "h"), "day": np.timedelta64(1, "D"), "week": np.timedelta64(7, "D")}[bucket]
+        edges = np.arange(first, stop + step + step, step).astype("datetime64[s]")
+    # Keep the edges of buckets that overlap [start, end), plus one closing edge
+    last = int(np.searchsorted(edges, stop, side="left"))
+    return edges[:max(last, 1) + 1]
+
+def to_datetime64(values: Iterable[str]) -> np.ndarray:
+    """
+    ISO dates/timestamps (UTC, as returned by PostgREST) to datetime64[s].
+    Offsets are dropped; stored timestamps are UTC.
+    """
+    return np.array([v[:19] if v else "NaT" for v in values], dtype="datetime64[s]")
+
+def aggregate(
+    times: np.ndarray,
+    groups: List[str],
+    values: Dict[str, np.ndarray],
+    edges: np.ndarray
+) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Sum each value column into a (group x bucket) matrix.
+    Rows outside the edges are ignored. Returns the sorted group keys and
+    one matrix per value column.
+    """
+    n_buckets = len(edges) - 1
+    idx = np.searchsorted(edges, times, side="right") - 1
+    valid = (idx >= 0) & (idx < n_buckets) & ~np.isnat(times)
+
+    keys, inverse = np.unique(np.asarray(groups, dtype=str), return_inverse=True) if groups else (np.array([], dtype=str), np.array([], dtype=np.intp))
+    matrices = {}
+    for name, column in values.items():
+        matrix = np.zeros((len(keys), n_buckets), dtype=np.int64)
+        if valid.any():
+            np.add.at(matrix, (inverse[valid], idx[valid]), column[valid])
+        matrices[name] = matrix
+    return keys.tolist(), matrices
+
+def align(matrix: np.ndarray, keys: List[str], target_keys: List[str], n_buckets: int) -> np.ndarray:
+    """Reorder rows to `target_keys` and pad/truncate columns to `n_buckets` (zeros where missing)"""
+    out = np.zeros((len(target_keys), n_buckets), dtype=np.int64)
+    position = {k: i for i, k in enumerate(keys)}
+    width = min(n_buckets, matrix.shape[1]) if matrix.ndim == 2 else 0
+    for row, key in enumerate(target_keys):
+        src = position.get(key)
+        if src is not None and width:
+            out[row, :width] = matrix[src, :width]
+    return out
+
+def change_pct(current: int, previous: int):
+    """Percentage change, or None when there is no baseline"""
+    if not previous:
+        return None
+    return round((current - previous) / previous * 100, 1)
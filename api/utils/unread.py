@@ -0,0 +1,92 @@
+"""
+Per-user unread notification counters, cached and updated incrementally
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from ..config import settings
+from .database import supabase
+from .shared_cache import shared_enabled, get_shared_cache
+
+def load_unread_counts(user_id: str) -> Dict[str, int]:
+    """Unread counts by type, one grouped query (migration 015)"""
+    res = supabase.rpc("unread_notification_counts", {"p_user_id": user_id}).execute()
+    return {r["type"]: r["count"] for r in res.data or []}
+
+class UnreadCounters:
+    """
+    user_id -> {type: unread count}.
+    Loaded once from the database, then adjusted in place when notifications
+    are inserted or read. Entries expire after UNREAD_COUNTER_TTL_SECONDS so
+    changes made through another worker are picked up. A generation advanced
+    by every adjust and invalidate keeps a load that raced with a change from
+    being cached.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._generation: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, loader: Callable[[str], Dict[str, int]]) -> Dict[str, int]:
+        """Counts by type for a user, loading them on a miss"""
+        with self._lock:
+            loaded_at = self._loaded_at.get(user_id)
+            if loaded_at is not None and (time.monotonic() - loaded_at) < self.ttl_seconds:
+                return dict(self._counts[user_id])
+            generation = (self._epoch, self._generation.get(user_id, 0))
+
+        counts = loader(user_id)
+        with self._lock:
+            # A change since the load started may be missing from it; leave the
+            # entry uncached so the next read loads again
+            if (self._epoch, self._generation.get(user_id, 0)) == generation:
+                self._counts[user_id] = dict(counts)
+                self._loaded_at[user_id] = time.monotonic()
+        return dict(counts)
+
+    def adjust(self, user_id: str, notification_type: str, delta: int) -> None:
+        """Apply a change to a cached entry; uncached users load on next read"""
+        with self._lock:
+            self._generation[user_id] = self._generation.get(user_id, 0) + 1
+            counts = self._counts.get(user_id)
+            if counts is not None:
+                counts[notification_type] = max(0, counts.get(notification_type, 0) + delta)
+        self._broadcast_change(user_id)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._counts.clear()
+                self._loaded_at.clear()
+                self._epoch += 1
+            else:
+                self._counts.pop(user_id, None)
+                self._loaded_at.pop(user_id, None)
+                self._generation[user_id] = self._generation.get(user_id, 0) + 1
+
+    def on_inserted(self, rows: Iterable[dict]) -> None:
+        """Hook for write paths that insert notifications"""
+        for n in rows:
+            if n.get("user_id") and n.get("status", "unread") == "unread":
+                self.adjust(n["user_id"], n.get("type", ""), 1)
+
+    def _broadcast_change(self, user_id: str) -> None:
+        """Tell other workers their cached counts for this user are stale"""
+        if shared_enabled():
+            get_shared_cache().broadcast("unread", f"{os.getpid()}:{user_id}")
+
+    def on_broadcast(self, message: str) -> None:
+        pid, _, user_id = message.partition(":")
+        if pid != str(os.getpid()):
+            self.invalidate(user_id)
+
+# Global counters instance
+unread_counters = UnreadCounters(ttl_seconds=settings.UNREAD_COUNTER_TTL_SECONDS)
+if shared_enabled():
+    get_shared_cache().subscribe("unread", unread_counters.on_broadcast)
@@ -0,0 +1,95 @@
+"""
+Process-wide user directory: id -> user, role -> users
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from .database import supabase
+from .pagination import fetch_all
+from .versions import get_versions
+
+logger = logging.getLogger(__name__)
+
+DIRECTORY_COLUMNS = "id,name,email,role,status,created_at"
+
+class UserDirectory:
+    """
+    All users, loaded once and indexed by id and role, for names, roles and
+    ids in reads and fan-out. The snapshot is tagged with the "users" table
+    version, so write paths that call bump_version("users") invalidate it,
+    across workers when the shared cache tier is enabled; otherwise other
+    workers can lag by up to USER_DIRECTORY_TTL_SECONDS. Anything that must
+    be current (login, existence and email uniqueness checks) queries the
+    database instead.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._by_id: Dict[str, dict] = {}
+        self._by_role: Dict[str, List[dict]] = {}
+        self._version: Optional[Tuple[int, ...]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _is_current(self, version: Tuple[int, ...]) -> bool:
+        return self._version == version and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    def _ensure_loaded(self) -> None:
+        version = get_versions("users")
+        with self._lock:
+            if self._is_current(version):
+                return
+        # One loader at a time; concurrent callers wait and reuse its snapshot
+        with self._load_lock:
+            with self._lock:
+                if self._is_current(version):
+                    return
+            # Paged, so PostgREST's max-rows cap cannot truncate the directory
+            rows = fetch_all(lambda: supabase.table("users").select(DIRECTORY_COLUMNS).order("id"))
+            by_id = {u["id"]: u for u in rows}
+            by_role: Dict[str, List[dict]] = {}
+            for u in rows:
+                by_role.setdefault(u.get("role"), []).append(u)
+            with self._lock:
+                self._by_id, self._by_role = by_id, by_role
+                self._version = version
+                self._loaded_at = time.monotonic()
+            logger.info(f"User directory loaded: {len(rows)} users")
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version = None
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, user_id: str) -> Optional[dict]:
+        self._ensure_loaded()
+        user = self._by_id.get(user_id)
+        return dict(user) if user else None
+
+    def name(self, user_id: str, default: Optional[str] = None) -> Optional[str]:
+        self._ensure_loaded()
+        user = self._by_id.get(user_id)
+        return user.get("name") if user else default
+
+    def names(self) -> Dict[str, str]:
+        """id -> name for every user"""
+        self._ensure_loaded()
+        return {uid: u.get("name") for uid, u in self._by_id.items()}
+
+    def by_role(self, role: str) -> List[dict]:
+        self._ensure_loaded()
+        return [dict(u) for u in self._by_role.get(role, [])]
+
+    def ids_by_role(self, role: str) -> List[str]:
+        self._ensure_loaded()
+        return [u["id"] for u in self._by_role.get(role, [])]
+
+# Global directory instance
+user_directory = UserDirectory(ttl_seconds=settings.USER_DIRECTORY_TTL_SECONDS)
@@ -0,0 +1,36 @@
+"""
+Table change versions used to validate cached and conditional responses
+"""
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from .shared_cache import shared_enabled, get_shared_cache
+
+# ============================================================================
+# Version Counters
+# ============================================================================
+
+# Monotonic per-table counters, bumped by every write path that touches the
+# table. Readers combine the counters of the tables they depend on into a
+# version vector; an unchanged vector means the underlying rows did not change.
+# With CACHE_BACKEND=shared the counters live in the shared tier, so a write
+# in one worker invalidates reads in every worker on the node.
+_versions: Dict[str, int] = defaultdict(int)
+_lock = threading.Lock()
+
+def bump_version(*tables: str) -> None:
+    """Mark one or more tables as changed"""
+    if shared_enabled():
+        get_shared_cache().bump_versions(tables)
+        return
+    with _lock:
+        for table in tables:
+            _versions[table] += 1
+
+def get_versions(*tables: str) -> Tuple[int, ...]:
+    """Return the current version vector for the given tables"""
+    if shared_enabled():
+        return get_shared_cache().get_versions(tables)
+    with _lock:
+        return tuple(_versions[table] for table in tables)
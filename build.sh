@@ -11,4 +11,7 @@ npm install
 npm run build
 cd ..
 
+echo "Precompressing static assets..."
+python -m api.utils.static frontend/dist assets static
+
 echo "Build Complete!"
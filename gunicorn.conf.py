@@ -12,6 +12,11 @@ backlog = 2048
 workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
+
+# Share the response cache, table versions and invalidations across workers
+# (SQLite on tmpfs, see api/utils/shared_cache.py) unless configured otherwise
+if workers > 1:
+    os.environ.setdefault("CACHE_BACKEND", "shared")
 max_requests = 1000
 max_requests_jitter = 50
 timeout = 60
@@ -44,7 +49,12 @@ preload_app = True
 # Server hooks
 def on_starting(server):
     """Called just before the master process is initialized"""
-    pass
+    # The shared cache file survives restarts; start each deployment empty
+    # (workers are not forked yet, so nothing else is using it)
+    if os.environ.get("CACHE_BACKEND") == "shared":
+        from api.utils.shared_cache import get_shared_cache
+        get_shared_cache().reset()
+        server.log.info("Shared cache reset at %s", get_shared_cache().path)
 
 def on_reload(server):
     """Called to recycle workers during a reload via SIGHUP"""
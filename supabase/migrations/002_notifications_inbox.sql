@@ -0,0 +1,19 @@
+-- Notifications inbox: unread counters and keyset pagination
+-- Unread counts by type and filtered inbox pages
+CREATE INDEX IF NOT EXISTS idx_notifications_user_type_status_created
+    ON notifications(user_id, type, status, created_at DESC);
+-- Unfiltered inbox pages ordered by (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created_id
+    ON notifications(user_id, created_at DESC, id DESC);
+
+-- Flags dismissed through the old is_read column must stay dismissed
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'notifications' AND column_name = 'is_read'
+    ) THEN
+        UPDATE notifications SET status = 'read' WHERE is_read = TRUE AND status IS DISTINCT FROM 'read';
+    END IF;
+END $$;
+UPDATE notifications SET status = 'unread' WHERE status IS NULL;
@@ -0,0 +1,76 @@
+-- Per-employee daily activity rollup
+-- Activity analytics read this table instead of raw activity_logs, so their
+-- cost scales with days x employees rather than with the number of events.
+CREATE TABLE IF NOT EXISTS activity_daily_rollup (
+    employee_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    outcome TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    quantity_sum BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (employee_id, day, category, outcome)
+);
+-- Windowed reads across all employees
+CREATE INDEX IF NOT EXISTS idx_activity_daily_rollup_day ON activity_daily_rollup(day, employee_id);
+
+-- Incremental maintenance: every insert/delete/update of activity_logs adjusts
+-- the matching bucket, whichever code path wrote it. Days are UTC.
+CREATE OR REPLACE FUNCTION apply_activity_rollup(
+    p_employee_id UUID, p_created_at TIMESTAMPTZ, p_category TEXT, p_outcome TEXT,
+    p_count INTEGER, p_quantity BIGINT
+) RETURNS VOID AS $$
+BEGIN
+    IF p_employee_id IS NULL OR p_created_at IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO activity_daily_rollup (employee_id, day, category, outcome, count, quantity_sum, updated_at)
+    VALUES (p_employee_id, (p_created_at AT TIME ZONE 'UTC')::date, COALESCE(p_category, ''), COALESCE(p_outcome, ''),
+            p_count, p_quantity, NOW())
+    ON CONFLICT (employee_id, day, category, outcome) DO UPDATE
+        SET count = activity_daily_rollup.count + EXCLUDED.count,
+            quantity_sum = activity_daily_rollup.quantity_sum + EXCLUDED.quantity_sum,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION activity_logs_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_activity_rollup(OLD.employee_id, OLD.created_at, OLD.category, OLD.outcome,
+                                      -1, -COALESCE(OLD.quantity, 1));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_activity_rollup(NEW.employee_id, NEW.created_at, NEW.category, NEW.outcome,
+                                      1, COALESCE(NEW.quantity, 1));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_activity_logs_rollup ON activity_logs;
+CREATE TRIGGER trg_activity_logs_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF employee_id, created_at, category, outcome, quantity ON activity_logs
+    FOR EACH ROW EXECUTE FUNCTION activity_logs_rollup_trigger();
+
+-- Rebuild from history (all days, or from p_from_day onwards)
+CREATE OR REPLACE FUNCTION rebuild_activity_daily_rollup(p_from_day DATE DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    LOCK TABLE activity_daily_rollup IN EXCLUSIVE MODE;
+    DELETE FROM activity_daily_rollup WHERE p_from_day IS NULL OR day >= p_from_day;
+    INSERT INTO activity_daily_rollup (employee_id, day, category, outcome, count, quantity_sum, updated_at)
+    SELECT employee_id, (created_at AT TIME ZONE 'UTC')::date, COALESCE(category, ''), COALESCE(outcome, ''),
+           COUNT(*), SUM(COALESCE(quantity, 1)), NOW()
+    FROM activity_logs
+    WHERE employee_id IS NOT NULL AND created_at IS NOT NULL
+      AND (p_from_day IS NULL OR created_at >= p_from_day::timestamp AT TIME ZONE 'UTC')
+    GROUP BY 1, 2, 3, 4;
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_activity_daily_rollup();
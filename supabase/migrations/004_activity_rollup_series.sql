@@ -0,0 +1,25 @@
+-- Bucketed reads over activity_daily_rollup for /api/analytics/activity
+-- Returns one row per (bucket, group) so a year of daily data for every
+-- employee is a few thousand rows instead of every rollup row.
+CREATE OR REPLACE FUNCTION activity_rollup_series(
+    p_from DATE,
+    p_to DATE,
+    p_bucket TEXT,
+    p_group_by TEXT,
+    p_employee_id UUID DEFAULT NULL
+) RETURNS TABLE (bucket DATE, group_key TEXT, count BIGINT, quantity_sum BIGINT) AS $$
+    SELECT date_trunc(p_bucket, r.day::timestamp)::date AS bucket,
+           CASE p_group_by
+               WHEN 'employee' THEN r.employee_id::text
+               WHEN 'category' THEN r.category
+               WHEN 'outcome' THEN r.outcome
+               ELSE ''
+           END AS group_key,
+           SUM(r.count)::bigint AS count,
+           SUM(r.quantity_sum)::bigint AS quantity_sum
+    FROM activity_daily_rollup r
+    WHERE r.day >= p_from AND r.day < p_to
+      AND (p_employee_id IS NULL OR r.employee_id = p_employee_id)
+      AND p_bucket IN ('day', 'week', 'month')
+    GROUP BY 1, 2
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,55 @@
+-- Materialized client recency status
+-- good (< 7 days since last contact), due_soon (7-14 days), overdue (15+ days or never).
+-- Write paths set status directly; sweep_client_status() applies time-based
+-- transitions, so readers and filters use the stored column.
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS status_changed_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION client_recency_status(p_last_contact TIMESTAMPTZ, p_at TIMESTAMPTZ DEFAULT NOW())
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN p_last_contact IS NULL THEN 'overdue'
+        WHEN floor(extract(epoch FROM (p_at - p_last_contact)) / 86400) < 7 THEN 'good'
+        WHEN floor(extract(epoch FROM (p_at - p_last_contact)) / 86400) <= 14 THEN 'due_soon'
+        ELSE 'overdue'
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- status_changed_at follows every status change, whichever path made it
+CREATE OR REPLACE FUNCTION clients_status_changed_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status IS DISTINCT FROM OLD.status THEN
+        NEW.status_changed_at = NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_clients_status_changed ON clients;
+CREATE TRIGGER trg_clients_status_changed
+    BEFORE UPDATE OF status ON clients
+    FOR EACH ROW EXECUTE FUNCTION clients_status_changed_trigger();
+
+-- Sweep candidates are found by (status, last_contact_date) range scans
+CREATE INDEX IF NOT EXISTS idx_clients_status_last_contact ON clients(status, last_contact_date);
+
+-- Time-based transitions only ever move good -> due_soon -> overdue; anything
+-- else (legacy 'new'/'Good' values) is reclassified once.
+CREATE OR REPLACE FUNCTION sweep_client_status() RETURNS INTEGER AS $$
+DECLARE
+    changed INTEGER;
+BEGIN
+    UPDATE clients
+    SET status = client_recency_status(last_contact_date)
+    WHERE (status = 'good' AND last_contact_date < NOW() - INTERVAL '7 days')
+       OR (status = 'due_soon' AND last_contact_date < NOW() - INTERVAL '15 days')
+       OR (status <> 'overdue' AND last_contact_date IS NULL)
+       OR status IS NULL
+       OR status NOT IN ('good', 'due_soon', 'overdue');
+    GET DIAGNOSTICS changed = ROW_COUNT;
+    RETURN changed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill
+UPDATE clients SET status = client_recency_status(last_contact_date), status_changed_at = NOW()
+WHERE status IS DISTINCT FROM client_recency_status(last_contact_date);
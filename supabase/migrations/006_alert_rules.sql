@@ -0,0 +1,13 @@
+-- Alerts engine: indexed range and aggregate queries behind each rule
+-- Expired / upcoming expiry ranges
+CREATE INDEX IF NOT EXISTS idx_clients_expiry_date ON clients(expiry_date);
+
+-- Overdue backlog per employee (uses idx_clients_status_last_contact from 005)
+CREATE OR REPLACE FUNCTION alert_overdue_backlog(p_threshold INTEGER)
+RETURNS TABLE (employee_id UUID, overdue BIGINT) AS $$
+    SELECT assigned_employee_id, COUNT(*)
+    FROM clients
+    WHERE status = 'overdue' AND assigned_employee_id IS NOT NULL
+    GROUP BY assigned_employee_id
+    HAVING COUNT(*) >= p_threshold
+$$ LANGUAGE sql STABLE;
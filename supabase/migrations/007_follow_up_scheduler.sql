@@ -0,0 +1,54 @@
+-- Follow-up / reminder scheduler
+-- Follow-up due dates move out of the attachments JSON into indexed columns;
+-- *_notified_at records the single due-time notification for each item.
+ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS follow_up_due_at TIMESTAMPTZ;
+ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS follow_up_notified_at TIMESTAMPTZ;
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS notified_at TIMESTAMPTZ;
+
+-- Scheduler refill: next un-notified items by due time
+CREATE INDEX IF NOT EXISTS idx_activity_logs_follow_up_pending
+    ON activity_logs(follow_up_due_at) WHERE follow_up_due_at IS NOT NULL AND follow_up_notified_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_reminders_pending_due
+    ON reminders(due_date) WHERE status = 'pending' AND notified_at IS NULL;
+-- /api/follow-ups pages ordered by (follow_up_due_at, id)
+CREATE INDEX IF NOT EXISTS idx_activity_logs_employee_follow_up
+    ON activity_logs(employee_id, follow_up_due_at, id) WHERE follow_up_due_at IS NOT NULL;
+
+-- Backfill from contact_meta attachments. Items already past due are marked
+-- notified so the first scheduler run does not replay history.
+UPDATE activity_logs a
+SET follow_up_due_at = (meta.elem->>'due_date')::timestamptz
+FROM (
+    SELECT l.id, e.elem
+    FROM activity_logs l, jsonb_array_elements(COALESCE(l.attachments, '[]'::jsonb)) AS e(elem)
+    WHERE e.elem->>'type' = 'contact_meta'
+      AND (e.elem->>'follow_up_required')::boolean IS TRUE
+      AND e.elem->>'due_date' ~ '^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}(:?\d{2})?)?$'
+) meta
+WHERE a.id = meta.id AND a.follow_up_due_at IS NULL;
+UPDATE activity_logs SET follow_up_notified_at = NOW()
+WHERE follow_up_due_at < NOW() AND follow_up_notified_at IS NULL;
+UPDATE reminders SET notified_at = NOW()
+WHERE due_date < NOW() AND status = 'pending' AND notified_at IS NULL;
+
+-- Leader election: one scheduler instance holds a short lease and renews it
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION acquire_scheduler_lease(p_name TEXT, p_holder TEXT, p_ttl_seconds INTEGER)
+RETURNS BOOLEAN AS $$
+DECLARE
+    acquired TEXT;
+BEGIN
+    INSERT INTO scheduler_leases (name, holder, expires_at)
+    VALUES (p_name, p_holder, NOW() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (name) DO UPDATE
+        SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+        WHERE scheduler_leases.holder = EXCLUDED.holder OR scheduler_leases.expires_at < NOW()
+    RETURNING holder INTO acquired;
+    RETURN acquired IS NOT NULL;
+END;
+$$ LANGUAGE plpgsql;
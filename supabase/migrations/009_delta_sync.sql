@@ -0,0 +1,69 @@
+-- Delta sync (/api/sync)
+-- Synced tables carry an updated_at maintained by trigger; clients are soft
+-- deleted through deleted_at (001) so deletions reach clients as tombstones.
+ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ;
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ;
+UPDATE activity_logs SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+UPDATE notifications SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+ALTER TABLE activity_logs ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE notifications ALTER COLUMN updated_at SET DEFAULT NOW();
+UPDATE clients SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_clients_touch_updated_at ON clients;
+CREATE TRIGGER trg_clients_touch_updated_at
+    BEFORE UPDATE ON clients
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS trg_activity_logs_touch_updated_at ON activity_logs;
+CREATE TRIGGER trg_activity_logs_touch_updated_at
+    BEFORE UPDATE ON activity_logs
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS trg_notifications_touch_updated_at ON notifications;
+CREATE TRIGGER trg_notifications_touch_updated_at
+    BEFORE UPDATE ON notifications
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+-- Sync pages are (updated_at, id) keyset scans, per owner for employees
+CREATE INDEX IF NOT EXISTS idx_clients_updated ON clients(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_clients_assigned_updated ON clients(assigned_employee_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_activity_logs_updated ON activity_logs(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_activity_logs_employee_updated ON activity_logs(employee_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_updated ON notifications(user_id, updated_at, id);
+-- Reassignments away from an employee are sent to them as removals
+CREATE INDEX IF NOT EXISTS idx_assignment_history_from_created
+    ON client_assignment_history(assigned_from_employee_id, created_at, id);
+
+-- Soft-deleted clients drop out of the status sweep and alert aggregates
+CREATE OR REPLACE FUNCTION sweep_client_status() RETURNS INTEGER AS $$
+DECLARE
+    changed INTEGER;
+BEGIN
+    UPDATE clients
+    SET status = client_recency_status(last_contact_date)
+    WHERE deleted_at IS NULL
+      AND ((status = 'good' AND last_contact_date < NOW() - INTERVAL '7 days')
+       OR (status = 'due_soon' AND last_contact_date < NOW() - INTERVAL '15 days')
+       OR (status <> 'overdue' AND last_contact_date IS NULL)
+       OR status IS NULL
+       OR status NOT IN ('good', 'due_soon', 'overdue'));
+    GET DIAGNOSTICS changed = ROW_COUNT;
+    RETURN changed;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION alert_overdue_backlog(p_threshold INTEGER)
+RETURNS TABLE (employee_id UUID, overdue BIGINT) AS $$
+    SELECT assigned_employee_id, COUNT(*)
+    FROM clients
+    WHERE status = 'overdue' AND assigned_employee_id IS NOT NULL AND deleted_at IS NULL
+    GROUP BY assigned_employee_id
+    HAVING COUNT(*) >= p_threshold
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,118 @@
+-- Change tracking for cheap freshness checks
+-- Every insert/update on a tracked table stamps change_seq from that table's
+-- sequence (and updated_at on update), so MAX(change_seq) is a per-table
+-- version readable from the tail of one index. Deletes advance the same
+-- sequence into change_deletes, since removing a row cannot raise the MAX.
+CREATE SEQUENCE IF NOT EXISTS clients_change_seq;
+CREATE SEQUENCE IF NOT EXISTS users_change_seq;
+CREATE SEQUENCE IF NOT EXISTS activity_logs_change_seq;
+CREATE SEQUENCE IF NOT EXISTS notifications_change_seq;
+
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+
+UPDATE users SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS change_deletes (
+    table_name TEXT PRIMARY KEY,
+    change_seq BIGINT NOT NULL
+);
+
+-- track_change (below) replaces the updated_at-only triggers from 009
+DROP TRIGGER IF EXISTS trg_clients_touch_updated_at ON clients;
+DROP TRIGGER IF EXISTS trg_activity_logs_touch_updated_at ON activity_logs;
+DROP TRIGGER IF EXISTS trg_notifications_touch_updated_at ON notifications;
+DROP FUNCTION IF EXISTS touch_updated_at();
+
+-- Backfill (before the triggers exist) in updated_at order so existing rows
+-- get ascending versions
+UPDATE clients c SET change_seq = s.seq
+FROM (SELECT id, nextval('clients_change_seq') AS seq FROM (SELECT id FROM clients ORDER BY updated_at, id) o) s
+WHERE c.id = s.id AND c.change_seq IS NULL;
+UPDATE users u SET change_seq = s.seq
+FROM (SELECT id, nextval('users_change_seq') AS seq FROM (SELECT id FROM users ORDER BY updated_at, id) o) s
+WHERE u.id = s.id AND u.change_seq IS NULL;
+UPDATE activity_logs a SET change_seq = s.seq
+FROM (SELECT id, nextval('activity_logs_change_seq') AS seq FROM (SELECT id FROM activity_logs ORDER BY updated_at, id) o) s
+WHERE a.id = s.id AND a.change_seq IS NULL;
+UPDATE notifications n SET change_seq = s.seq
+FROM (SELECT id, nextval('notifications_change_seq') AS seq FROM (SELECT id FROM notifications ORDER BY updated_at, id) o) s
+WHERE n.id = s.id AND n.change_seq IS NULL;
+
+-- TG_ARGV[0]: the table's change sequence
+CREATE OR REPLACE FUNCTION track_change() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.change_seq = nextval(TG_ARGV[0]::regclass);
+    IF TG_OP = 'UPDATE' THEN
+        NEW.updated_at = NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_delete() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO change_deletes (table_name, change_seq)
+    VALUES (TG_TABLE_NAME, nextval(TG_ARGV[0]::regclass))
+    ON CONFLICT (table_name) DO UPDATE SET change_seq = EXCLUDED.change_seq;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_clients_track_change ON clients;
+CREATE TRIGGER trg_clients_track_change
+    BEFORE INSERT OR UPDATE ON clients
+    FOR EACH ROW EXECUTE FUNCTION track_change('clients_change_seq');
+DROP TRIGGER IF EXISTS trg_users_track_change ON users;
+CREATE TRIGGER trg_users_track_change
+    BEFORE INSERT OR UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION track_change('users_change_seq');
+DROP TRIGGER IF EXISTS trg_activity_logs_track_change ON activity_logs;
+CREATE TRIGGER trg_activity_logs_track_change
+    BEFORE INSERT OR UPDATE ON activity_logs
+    FOR EACH ROW EXECUTE FUNCTION track_change('activity_logs_change_seq');
+DROP TRIGGER IF EXISTS trg_notifications_track_change ON notifications;
+CREATE TRIGGER trg_notifications_track_change
+    BEFORE INSERT OR UPDATE ON notifications
+    FOR EACH ROW EXECUTE FUNCTION track_change('notifications_change_seq');
+
+DROP TRIGGER IF EXISTS trg_clients_track_delete ON clients;
+CREATE TRIGGER trg_clients_track_delete
+    AFTER DELETE ON clients
+    FOR EACH STATEMENT EXECUTE FUNCTION track_delete('clients_change_seq');
+DROP TRIGGER IF EXISTS trg_users_track_delete ON users;
+CREATE TRIGGER trg_users_track_delete
+    AFTER DELETE ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION track_delete('users_change_seq');
+DROP TRIGGER IF EXISTS trg_activity_logs_track_delete ON activity_logs;
+CREATE TRIGGER trg_activity_logs_track_delete
+    AFTER DELETE ON activity_logs
+    FOR EACH STATEMENT EXECUTE FUNCTION track_delete('activity_logs_change_seq');
+DROP TRIGGER IF EXISTS trg_notifications_track_delete ON notifications;
+CREATE TRIGGER trg_notifications_track_delete
+    AFTER DELETE ON notifications
+    FOR EACH STATEMENT EXECUTE FUNCTION track_delete('notifications_change_seq');
+
+CREATE INDEX IF NOT EXISTS idx_clients_change_seq ON clients(change_seq);
+CREATE INDEX IF NOT EXISTS idx_users_change_seq ON users(change_seq);
+CREATE INDEX IF NOT EXISTS idx_activity_logs_change_seq ON activity_logs(change_seq);
+CREATE INDEX IF NOT EXISTS idx_notifications_change_seq ON notifications(change_seq);
+-- clients/activity_logs/notifications updated_at indexes are in 009
+CREATE INDEX IF NOT EXISTS idx_users_updated ON users(updated_at, id);
+
+-- Max change sequence per tracked table: four index tail reads plus the
+-- delete markers
+CREATE OR REPLACE FUNCTION table_change_versions()
+RETURNS TABLE (table_name TEXT, version BIGINT) AS $$
+    SELECT t.name, GREATEST(COALESCE(t.seq, 0), COALESCE(d.change_seq, 0))
+    FROM (
+        VALUES
+            ('clients', (SELECT MAX(change_seq) FROM clients)),
+            ('users', (SELECT MAX(change_seq) FROM users)),
+            ('activity_logs', (SELECT MAX(change_seq) FROM activity_logs)),
+            ('notifications', (SELECT MAX(change_seq) FROM notifications))
+    ) AS t(name, seq)
+    LEFT JOIN change_deletes d ON d.table_name = t.name
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,6 @@
+-- Bulk activity ingestion: client-generated idempotency keys
+-- A retried upload carries the same keys, and the unique index turns the
+-- repeats into no-ops (NULL keys never conflict, so single logs are unaffected).
+ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_activity_logs_idempotency
+    ON activity_logs(employee_id, idempotency_key);
@@ -0,0 +1,14 @@
+-- Duplicate client detection on create and CSV import
+-- Normalized identity keys as generated columns; the expressions must stay in
+-- step with api/utils/client_keys.py. Existing data may already hold
+-- duplicates, so the indexes are lookup indexes rather than unique ones.
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS member_key TEXT
+    GENERATED ALWAYS AS (NULLIF(upper(regexp_replace(member_id, '\s+', '', 'g')), '')) STORED;
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS email_key TEXT
+    GENERATED ALWAYS AS (NULLIF(lower(regexp_replace(contact_email, '^\s+|\s+$', '', 'g')), '')) STORED;
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS phone_key TEXT
+    GENERATED ALWAYS AS (NULLIF(right(regexp_replace(contact_phone, '\D', '', 'g'), 10), '')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_clients_member_key ON clients(member_key) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_clients_email_key ON clients(email_key) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_clients_phone_key ON clients(phone_key) WHERE deleted_at IS NULL;
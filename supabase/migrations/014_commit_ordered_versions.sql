@@ -0,0 +1,66 @@
+-- Commit-ordered table versions for /api/changes/versions
+-- MAX(change_seq) from 010 cannot prove freshness: sequence values are taken
+-- at write time, so a transaction holding 10 can commit after one holding 11
+-- and a reader that already saw 11 never notices it. Here a transaction that
+-- wrote to a table bumps that table's counter row as it commits: the
+-- triggers are deferred constraint triggers, so the counter row lock is only
+-- taken at commit and held for the rest of the commit, not for the whole
+-- transaction (an /api/batch transaction included). Writers queue on it only
+-- while committing, so versions become visible in commit order.
+-- change_seq stays on each row as its version for If-Match.
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Start from the 010 values so no version goes backwards
+INSERT INTO table_versions (table_name, version)
+SELECT table_name, version FROM table_change_versions()
+ON CONFLICT (table_name) DO NOTHING;
+
+-- Constraint triggers fire per row; the transaction-local flag bumps each
+-- table once per transaction
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('table_versions.bumped_' || TG_TABLE_NAME, true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM set_config('table_versions.bumped_' || TG_TABLE_NAME, 'on', true);
+    UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_clients_table_version ON clients;
+CREATE CONSTRAINT TRIGGER trg_clients_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON clients
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS trg_users_table_version ON users;
+CREATE CONSTRAINT TRIGGER trg_users_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON users
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS trg_activity_logs_table_version ON activity_logs;
+CREATE CONSTRAINT TRIGGER trg_activity_logs_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON activity_logs
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS trg_notifications_table_version ON notifications;
+CREATE CONSTRAINT TRIGGER trg_notifications_table_version
+    AFTER INSERT OR UPDATE OR DELETE ON notifications
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+-- Deletes now advance the counter like any other write
+DROP TRIGGER IF EXISTS trg_clients_track_delete ON clients;
+DROP TRIGGER IF EXISTS trg_users_track_delete ON users;
+DROP TRIGGER IF EXISTS trg_activity_logs_track_delete ON activity_logs;
+DROP TRIGGER IF EXISTS trg_notifications_track_delete ON notifications;
+DROP FUNCTION IF EXISTS track_delete();
+DROP TABLE IF EXISTS change_deletes;
+
+CREATE OR REPLACE FUNCTION table_change_versions()
+RETURNS TABLE (table_name TEXT, version BIGINT) AS $$
+    SELECT v.table_name, v.version FROM table_versions v
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,11 @@
+-- Unread notification counts by type, grouped in the database
+-- Served by idx_notifications_user_type_status_created (002); replaces
+-- downloading every unread row, which was slow for large inboxes and
+-- undercounted past PostgREST's max-rows cap.
+CREATE OR REPLACE FUNCTION unread_notification_counts(p_user_id UUID)
+RETURNS TABLE (type TEXT, count BIGINT) AS $$
+    SELECT n.type, COUNT(*)
+    FROM notifications n
+    WHERE n.user_id = p_user_id AND n.status = 'unread'
+    GROUP BY n.type
+$$ LANGUAGE sql STABLE;